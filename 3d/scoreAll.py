@@ -1,18 +1,11 @@
 #! /usr/bin/python
 
-import os,sys,string
+import os,sys
 
-### helper function
-
-def getCommandOutput(command):
-    """run a command and return its stdout output"""
-    child = os.popen(command)
-    data = child.read()
-    err = child.close()
-    if err:
-        print '%s failed w/ exit code %d' % (command,err)
-        return None
-    return data
+# score in process with pymot instead of running MOTscore.pl per segment
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from clear3d import CLEAR3dEvaluation
+from clear3d import printResult
 
 
 ### main
@@ -82,29 +75,23 @@ def main():
                 print hypos
                 print labels
 
-                # run command
+                # score segment
 
                 print "*** SEGMENT #",file[:-3]
-                if mode == "A":
-                    flag = "yes"
-                else:
-                    flag = "no"
-                cmd = "./MOTscore.pl %s %s %s" % (labels, hypos, flag)
-                #print cmd
-                out = getCommandOutput(cmd)
-                print out
-
-                # parse command output
+                evaluation = CLEAR3dEvaluation.fromFiles(labels, hypos, mode)
+                evaluation.evaluate()
+                totals = evaluation.getAbsoluteStatistics()
+                printResult(totals, mode)
+
+                # accumulate totals
                 
-                last  = out[out.find("ABS TOTALS:"):]
-                words = last.split()
-                groundT  += int(words[3])
-                corr     += int(words[5])
-                fcorr    += int(words[7])
-                distance += int(words[9])
-                miss     += int(words[11])
-                falseP   += int(words[13])
-                mismatch += int(words[15])
+                groundT  += totals["ground truths"]
+                corr     += totals["correspondences"]
+                fcorr    += totals["failed correspondences"]
+                distance += totals["total distance"]
+                miss     += totals["misses"]
+                falseP   += totals["false positives"]
+                mismatch += totals["mismatches"]
 
     ### calculate accumulated results
 
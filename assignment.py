@@ -0,0 +1,587 @@
+#!/usr/bin/env python
+
+import sys
+import heapq
+import numpy
+import logging
+LOG = logging.getLogger(__name__)
+
+try:
+    from scipy.optimize import linear_sum_assignment
+except ImportError:
+    linear_sum_assignment = None
+
+
+class Munkres:
+    """Munkres algorithm (also known as Hungarian algorithm) for square and rectangular cost matrices.
+
+    Performs the same steps in the same order as the munkres package formerly used by pymot,
+    so ties are resolved the same way."""
+
+    def compute(self, cost_matrix):
+        """List of (row, column) tuples of the lowest cost assignment. Rectangular matrices are padded with zeros."""
+
+        rows = len(cost_matrix)
+        columns = len(cost_matrix[0]) if rows > 0 else 0
+        n = max(rows, columns)
+        if n == 0:
+            return []
+
+        # Padded copy of the cost matrix
+        C = [list(row) + [0] * (n - columns) for row in cost_matrix]
+        C += [[0] * n for i in range(n - rows)]
+
+        self.C_ = C
+        self.n_ = n
+        self.marked_ = [[0] * n for i in range(n)] # 1: starred zero, 2: primed zero
+        self.row_covered_ = [False] * n
+        self.col_covered_ = [False] * n
+
+        # STEP 1: Subtract row minimum from each row
+        for row in C:
+            minval = min(row)
+            for j in range(n):
+                row[j] -= minval
+
+        # STEP 2: Star zeros, which have no other starred zero in their row or column
+        for i in range(n):
+            for j in range(n):
+                if C[i][j] == 0 and not self.col_covered_[j] and not self.row_covered_[i]:
+                    self.marked_[i][j] = 1
+                    self.col_covered_[j] = True
+                    self.row_covered_[i] = True
+                    break
+        self._clearCovers()
+
+        # STEP 3: Cover columns with starred zeros, until all columns are covered
+        while self._coverStarredColumns() < n:
+
+            # STEP 4: Prime uncovered zeros, STEP 6 creates new zeros if there are none
+            while True:
+                zero = self._primeZeros()
+                if zero is not None:
+                    break
+                self._adjust()
+
+            # STEP 5: Augment along alternating path of primed and starred zeros
+            self._augment(zero)
+            self._clearCovers()
+            self._erasePrimes()
+
+        return [(i, j) for i in range(rows) for j in range(columns) if self.marked_[i][j] == 1]
+
+    def _coverStarredColumns(self):
+        count = 0
+        for i in range(self.n_):
+            for j in range(self.n_):
+                if self.marked_[i][j] == 1 and not self.col_covered_[j]:
+                    self.col_covered_[j] = True
+                    count += 1
+        return count
+
+    def _primeZeros(self):
+        """Prime uncovered zeros. Return primed zero without starred zero in its row, or None if no uncovered zero is left."""
+
+        row, col = 0, 0
+        while True:
+            row, col = self._findZero(row, col)
+            if row < 0:
+                return None
+
+            self.marked_[row][col] = 2
+            star_col = self._findInRow(row, 1)
+            if star_col < 0:
+                return (row, col)
+
+            col = star_col
+            self.row_covered_[row] = True
+            self.col_covered_[col] = False
+
+    def _findZero(self, i0, j0):
+        """Find uncovered zero, scanning rows and columns cyclically from (i0, j0). Last zero found in the first row with a zero wins."""
+
+        C = self.C_
+        n = self.n_
+        for k in range(n):
+            i = (i0 + k) % n
+            if self.row_covered_[i]:
+                continue
+
+            col = -1
+            for l in range(n):
+                j = (j0 + l) % n
+                if C[i][j] == 0 and not self.col_covered_[j]:
+                    col = j
+            if col >= 0:
+                return (i, col)
+
+        return (-1, -1)
+
+    def _findInRow(self, row, mark):
+        for j in range(self.n_):
+            if self.marked_[row][j] == mark:
+                return j
+        return -1
+
+    def _findStarInColumn(self, col):
+        for i in range(self.n_):
+            if self.marked_[i][col] == 1:
+                return i
+        return -1
+
+    def _augment(self, zero):
+        """Construct series of alternating primed and starred zeros, star the primed and unstar the starred ones"""
+
+        path = [zero]
+        while True:
+            row = self._findStarInColumn(path[-1][1])
+            if row < 0:
+                break
+            path.append((row, path[-1][1]))
+            path.append((row, self._findInRow(row, 2)))
+
+        for i, j in path:
+            self.marked_[i][j] = 0 if self.marked_[i][j] == 1 else 1
+
+    def _adjust(self):
+        """Add smallest uncovered value to covered rows, subtract it from uncovered columns"""
+
+        C = self.C_
+        n = self.n_
+        minval = sys.maxsize
+        for i in range(n):
+            if self.row_covered_[i]:
+                continue
+            for j in range(n):
+                if not self.col_covered_[j] and minval > C[i][j]:
+                    minval = C[i][j]
+
+        for i in range(n):
+            for j in range(n):
+                if self.row_covered_[i]:
+                    C[i][j] += minval
+                if not self.col_covered_[j]:
+                    C[i][j] -= minval
+
+    def _clearCovers(self):
+        self.row_covered_ = [False] * self.n_
+        self.col_covered_ = [False] * self.n_
+
+    def _erasePrimes(self):
+        for row in self.marked_:
+            for j in range(self.n_):
+                if row[j] == 2:
+                    row[j] = 0
+
+
+class AssignmentSolver:
+    """Common class for solvers of rectangular assignment problems with forbidden entries"""
+
+    name = None
+
+    decomposable = True
+    """Whether connected components of the candidate graph may be solved separately, see solve_pairs"""
+
+    def solve(self, costs, candidates):
+        """List of (row, column) candidate pairs with lowest total cost among all assignments with a maximal number of candidate pairs.
+
+        costs and candidates are arrays of equal shape. Costs of non-candidates are ignored."""
+
+        pairs = self._assign(costs, candidates)
+
+        # Optimal assignment is ambiguous. Resolve ties as the Munkres algorithm does.
+        if not has_unique_optimum(costs, candidates, pairs):
+            LOG.debug("Ambiguous assignment, falling back to Munkres algorithm")
+            munkres_pairs = MunkresSolver().solve(costs, candidates)
+
+            # Munkres may lose precision due to its not quite infinite number. Only use its assignment, if optimal.
+            if is_equivalent(costs, munkres_pairs, pairs):
+                pairs = munkres_pairs
+
+        return pairs
+
+    def _assign(self, costs, candidates):
+        raise NotImplementedError
+
+
+class MunkresSolver(AssignmentSolver):
+    """Munkres algorithm on the dense cost matrix. Forbidden entries are filled with a not quite infinite number.
+
+    Its assignment is not always optimal and depends on all rows and columns of the matrix, so it is run on whole frames
+    to reproduce the results of previous versions."""
+
+    name = "munkres"
+
+    decomposable = False
+
+    def __init__(self, inf=sys.maxsize):
+        self.inf_ = inf
+
+    def solve(self, costs, candidates):
+        return self._assign(costs, candidates)
+
+    def _assign(self, costs, candidates):
+        if costs.size == 0:
+            return []
+
+        matrix = numpy.empty(costs.shape, dtype=object)
+        matrix.fill(self.inf_)
+        matrix[candidates] = costs[candidates].tolist()
+
+        indices = Munkres().compute(matrix.tolist())
+
+        # Munkres returns a complete assignment, including forbidden pairs
+        return [(i, j) for i, j in indices if candidates[i, j]]
+
+
+class JonkerVolgenantSolver(AssignmentSolver):
+    """Shortest augmenting path algorithm (Jonker-Volgenant) on the sparse graph of candidate pairs. Pure python."""
+
+    name = "jv"
+
+    def _assign(self, costs, candidates):
+        rows, columns = candidates.shape
+        if rows == 0 or columns == 0:
+            return []
+
+        # Adjacency lists with non-negative costs. Shifting all costs keeps the optimum for a fixed number of pairs.
+        candidate_rows, candidate_columns = numpy.nonzero(candidates)
+        if len(candidate_rows) == 0:
+            return []
+        edge_costs = costs[candidate_rows, candidate_columns]
+        edge_costs = (edge_costs - edge_costs.min()).tolist()
+        adjacency = [[] for i in range(rows)]
+        for i, j, c in zip(candidate_rows.tolist(), candidate_columns.tolist(), edge_costs):
+            adjacency[i].append((j, c))
+        matched_cost = {}
+
+        row_match = [-1] * rows
+        col_match = [-1] * columns
+        row_potential = [0.0] * rows
+        col_potential = [0.0] * columns
+        inf = float("inf")
+
+        # Augment along shortest path from any free row to any free column, until there is none
+        while True:
+            row_dist = [inf] * rows
+            col_dist = [inf] * columns
+            row_done = [False] * rows
+            col_done = [False] * columns
+            predecessor = [-1] * columns
+
+            heap = []
+            for i in range(rows):
+                if row_match[i] < 0 and adjacency[i]:
+                    row_dist[i] = -row_potential[i]
+                    heap.append((row_dist[i], 0, i))
+            heapq.heapify(heap)
+
+            sink = -1
+            sink_dist = inf
+            while heap:
+                d, is_column, k = heapq.heappop(heap)
+                if is_column:
+                    if col_done[k] or d > col_dist[k]:
+                        continue
+                    col_done[k] = True
+                    i = col_match[k]
+                    if i < 0:
+                        sink, sink_dist = k, d
+                        break
+                    # Residual edge back to the matched row
+                    nd = d - matched_cost[i] + col_potential[k] - row_potential[i]
+                    if not row_done[i] and nd < row_dist[i]:
+                        row_dist[i] = nd
+                        heapq.heappush(heap, (nd, 0, i))
+                else:
+                    if row_done[k] or d > row_dist[k]:
+                        continue
+                    row_done[k] = True
+                    for j, c in adjacency[k]:
+                        if j == row_match[k] or col_done[j]:
+                            continue
+                        nd = d + c + row_potential[k] - col_potential[j]
+                        if nd < col_dist[j]:
+                            col_dist[j] = nd
+                            predecessor[j] = k
+                            heapq.heappush(heap, (nd, 1, j))
+
+            if sink < 0:
+                break
+
+            # Update potentials, keeping reduced costs non-negative
+            for i in range(rows):
+                row_potential[i] += min(row_dist[i], sink_dist)
+            for j in range(columns):
+                col_potential[j] += min(col_dist[j], sink_dist)
+
+            # Flip matching along augmenting path
+            j = sink
+            while j >= 0:
+                i = predecessor[j]
+                next_j = row_match[i]
+                row_match[i] = j
+                col_match[j] = i
+                matched_cost[i] = dict(adjacency[i])[j]
+                j = next_j
+
+        return [(i, j) for i, j in enumerate(row_match) if j >= 0]
+
+
+class ScipySolver(AssignmentSolver):
+    """scipy.optimize.linear_sum_assignment on the dense cost matrix. Forbidden entries are filled with a sufficiently large cost."""
+
+    name = "scipy"
+
+    def __init__(self):
+        if linear_sum_assignment is None:
+            raise Exception, "Assignment solver \"scipy\" requires scipy"
+
+    def _assign(self, costs, candidates):
+        if not candidates.any():
+            return []
+
+        # Any pair more is cheaper than all candidate costs together
+        candidate_costs = costs[candidates]
+        candidate_costs = candidate_costs - candidate_costs.min()
+        forbidden = candidate_costs.sum() + 1.0
+
+        matrix = numpy.where(candidates, costs - costs[candidates].min(), forbidden)
+        rows, columns = linear_sum_assignment(matrix)
+
+        return [(i, j) for i, j in zip(rows.tolist(), columns.tolist()) if candidates[i, j]]
+
+
+SOLVERS = {
+    MunkresSolver.name: MunkresSolver,
+    JonkerVolgenantSolver.name: JonkerVolgenantSolver,
+    ScipySolver.name: ScipySolver,
+}
+
+
+def make_solver(name):
+    """Assignment solver by name. "auto" selects scipy, if available, and the pure python solver otherwise."""
+
+    if name == "auto":
+        name = ScipySolver.name if linear_sum_assignment is not None else JonkerVolgenantSolver.name
+
+    if name not in SOLVERS:
+        raise Exception, "Unknown assignment solver \"%s\". Choose one of: auto, %s" % (name, ", ".join(sorted(SOLVERS.keys())))
+
+    return SOLVERS[name]()
+
+
+def connected_components(candidates):
+    """Connected components of the bipartite graph of candidate pairs as list of (rows, columns) index lists.
+
+    Rows and columns without any candidate pair are left out."""
+
+    candidate_rows, candidate_columns = numpy.nonzero(candidates)
+    return pair_components(candidates.shape, candidate_rows, candidate_columns)
+
+
+def pair_components(shape, candidate_rows, candidate_columns):
+    """Connected components of the bipartite graph of candidate pairs, given as arrays of rows and columns in a matrix of shape.
+
+    Returns list of (rows, columns) index lists. Rows and columns without any candidate pair are left out."""
+
+    rows, columns = shape
+
+    # Union find on rows 0..rows-1 and columns rows..rows+columns-1
+    parent = range(rows + columns)
+
+    def find(node):
+        root = node
+        while parent[root] != root:
+            root = parent[root]
+        while parent[node] != root:
+            parent[node], node = root, parent[node]
+        return root
+
+    for i, j in zip(candidate_rows.tolist(), candidate_columns.tolist()):
+        root_i, root_j = find(i), find(rows + j)
+        if root_i != root_j:
+            parent[root_j] = root_i
+
+    components = {}
+    for i in sorted(set(candidate_rows.tolist())):
+        components.setdefault(find(i), ([], []))[0].append(i)
+    for j in sorted(set(candidate_columns.tolist())):
+        components.setdefault(find(rows + j), ([], []))[1].append(j)
+
+    return components.values()
+
+
+def solve_by_components(solver, costs, candidates, shapes=None):
+    """Solve each connected component of the candidate graph independently, unless the solver is not decomposable.
+
+    Components with a single row or column are resolved without calling the solver. If a component has several optimal
+    assignments, the assignment of the Munkres algorithm on the whole matrix is used, if it is optimal for the component, too.
+    Munkres is only run if there are any such components. If shapes is a list, (rows, columns) of each component are appended to it."""
+
+    candidate_rows, candidate_columns = numpy.nonzero(candidates)
+    return solve_pairs(solver, candidates.shape, candidate_rows, candidate_columns, costs[candidate_rows, candidate_columns], shapes)
+
+
+def solve_pairs(solver, shape, candidate_rows, candidate_columns, candidate_costs, shapes=None):
+    """solve_by_components for candidate pairs given as arrays of rows, columns and costs, sorted by row and column, in a matrix of shape.
+
+    Dense cost matrices are only created per component, and for the whole matrix if ties have to be resolved."""
+
+    if not solver.decomposable:
+        if shapes is not None:
+            shapes.append(shape)
+        costs = numpy.empty(shape)
+        costs.fill(numpy.inf)
+        costs[candidate_rows, candidate_columns] = candidate_costs
+        candidates = numpy.zeros(shape, dtype=bool)
+        candidates[candidate_rows, candidate_columns] = True
+        return sorted(solver.solve(costs, candidates))
+
+    components = pair_components(shape, candidate_rows, candidate_columns)
+
+    # Component and position within component of each row and column
+    component_of_row = numpy.zeros(shape[0], dtype=numpy.int64)
+    local_row = numpy.zeros(shape[0], dtype=numpy.int64)
+    local_column = numpy.zeros(shape[1], dtype=numpy.int64)
+    for c, (rows, columns) in enumerate(components):
+        component_of_row[rows] = c
+        local_row[rows] = numpy.arange(len(rows))
+        local_column[columns] = numpy.arange(len(columns))
+
+    # Candidate pairs grouped by component
+    pair_component = component_of_row[candidate_rows]
+    pair_order = numpy.argsort(pair_component, kind="mergesort")
+    bounds = numpy.searchsorted(pair_component[pair_order], numpy.arange(len(components) + 1))
+
+    pairs = []
+    ambiguous = []
+    for c, (rows, columns) in enumerate(components):
+        if shapes is not None:
+            shapes.append((len(rows), len(columns)))
+
+        component_pairs = pair_order[bounds[c]:bounds[c + 1]]
+        component_costs = numpy.empty((len(rows), len(columns)))
+        component_costs.fill(numpy.inf)
+        component_costs[local_row[candidate_rows[component_pairs]], local_column[candidate_columns[component_pairs]]] = candidate_costs[component_pairs]
+
+        # Single row or column: pick cheapest pair
+        if len(rows) == 1 or len(columns) == 1:
+            cheapest = numpy.unravel_index(component_costs.argmin(), component_costs.shape)
+            component_pairs = [cheapest]
+            unique = numpy.count_nonzero(component_costs == component_costs[cheapest]) == 1
+        else:
+            component_candidates = numpy.zeros(component_costs.shape, dtype=bool)
+            component_candidates[local_row[candidate_rows[component_pairs]], local_column[candidate_columns[component_pairs]]] = True
+            component_pairs = solver._assign(component_costs, component_candidates)
+            unique = has_unique_optimum(component_costs, component_candidates, component_pairs)
+
+        component_pairs = [(rows[i], columns[j]) for i, j in component_pairs]
+        if unique:
+            pairs.extend(component_pairs)
+        else:
+            ambiguous.append((set(rows), component_pairs))
+
+    if ambiguous:
+        LOG.debug("Ambiguous assignment, falling back to Munkres algorithm")
+        costs = numpy.empty(shape)
+        costs.fill(numpy.inf)
+        costs[candidate_rows, candidate_columns] = candidate_costs
+        candidates = numpy.zeros(shape, dtype=bool)
+        candidates[candidate_rows, candidate_columns] = True
+        munkres_pairs = MunkresSolver().solve(costs, candidates)
+
+        for rows, component_pairs in ambiguous:
+            munkres_component_pairs = [(i, j) for i, j in munkres_pairs if i in rows]
+
+            # Munkres may lose precision due to its not quite infinite number. Only use its assignment, if optimal.
+            if is_equivalent(costs, munkres_component_pairs, component_pairs):
+                component_pairs = munkres_component_pairs
+            pairs.extend(component_pairs)
+
+    return sorted(pairs)
+
+
+def is_equivalent(costs, pairs, other_pairs):
+    """Check, if both assignments have the same number of pairs and the same total cost"""
+
+    if len(pairs) != len(other_pairs):
+        return False
+
+    cost = sum(costs[i, j] for i, j in pairs)
+    other_cost = sum(costs[i, j] for i, j in other_pairs)
+    return abs(cost - other_cost) <= 1e-10 * max(1.0, abs(cost), abs(other_cost))
+
+
+def has_unique_optimum(costs, candidates, pairs):
+    """Check, if no other assignment with the same number of pairs has the same total cost as the optimal assignment pairs.
+
+    Another optimum exists iff the residual graph of the assignment contains a cycle of zero cost."""
+
+    rows, columns = candidates.shape
+    candidate_rows, candidate_columns = numpy.nonzero(candidates)
+    if len(candidate_rows) <= 1:
+        return True
+
+    # Nodes: rows, columns, source and sink
+    source = rows + columns
+    sink = source + 1
+
+    matched = numpy.zeros(candidates.shape, dtype=bool)
+    row_matched = numpy.zeros(rows, dtype=bool)
+    col_matched = numpy.zeros(columns, dtype=bool)
+    for i, j in pairs:
+        matched[i, j] = True
+        row_matched[i] = True
+        col_matched[j] = True
+
+    # Residual edges. Unmatched pairs: row -> column, matched pairs: column -> row with negative cost.
+    is_matched = matched[candidate_rows, candidate_columns]
+    edge_costs = costs[candidate_rows, candidate_columns].astype(numpy.float64)
+    tails = numpy.where(is_matched, rows + candidate_columns, candidate_rows)
+    heads = numpy.where(is_matched, candidate_rows, rows + candidate_columns)
+    weights = numpy.where(is_matched, -edge_costs, edge_costs)
+
+    # Source -> free rows, matched rows -> source, free columns -> sink, sink -> matched columns
+    row_indices = numpy.arange(rows)
+    col_indices = rows + numpy.arange(columns)
+    tails = numpy.concatenate([tails, numpy.where(row_matched, row_indices, source), numpy.where(col_matched, sink, col_indices)])
+    heads = numpy.concatenate([heads, numpy.where(row_matched, source, row_indices), numpy.where(col_matched, col_indices, sink)])
+    weights = numpy.concatenate([weights, numpy.zeros(rows + columns)])
+
+    # Potentials by Bellman-Ford from a virtual root connected to all nodes
+    nodes = sink + 1
+    potentials = numpy.zeros(nodes)
+    for iteration in range(nodes + 1):
+        relaxed = potentials.copy()
+        numpy.minimum.at(relaxed, heads, potentials[tails] + weights)
+        if numpy.array_equal(relaxed, potentials):
+            break
+        potentials = relaxed
+    else:
+        return False # negative cycle, assignment is not optimal
+
+    # Zero cost cycles consist of edges with zero reduced cost only
+    tolerance = 1e-10 * nodes * max(1.0, numpy.abs(weights).max())
+    tight = weights + potentials[tails] - potentials[heads] <= tolerance
+
+    # Topological sort of tight subgraph fails iff it contains a cycle
+    tight_tails = tails[tight].tolist()
+    tight_heads = heads[tight].tolist()
+    successors = [[] for n in range(nodes)]
+    in_degree = [0] * nodes
+    for u, v in zip(tight_tails, tight_heads):
+        successors[u].append(v)
+        in_degree[v] += 1
+
+    stack = [n for n in range(nodes) if in_degree[n] == 0]
+    removed = 0
+    while stack:
+        u = stack.pop()
+        removed += 1
+        for v in successors[u]:
+            in_degree[v] -= 1
+            if in_degree[v] == 0:
+                stack.append(v)
+
+    return removed == nodes
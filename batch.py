@@ -0,0 +1,236 @@
+#!/usr/bin/env python
+
+import os
+import json
+import argparse
+from multiprocessing import Pool
+from pymot import MOTEvaluation
+from formatchecker import FormatChecker
+from importers import groundtruth_import
+from importers import hypo_import
+from framecache import default_cache_dir
+
+
+def evaluateSequence(job):
+    """Evaluate one sequence, given as tuple of name, ground truth file, hypotheses file, solver and cache directory.
+
+    Returns name and absolute statistics. Module level function, so it can be run by pool processes."""
+
+    name, groundtruth_file, hypotheses_file, solver, cache_dir = job
+
+    evaluator = MOTEvaluation(groundtruth_import(groundtruth_file, cache_dir=cache_dir), hypo_import(hypotheses_file, cache_dir=cache_dir), solver)
+    evaluator.evaluate()
+    return name, evaluator.getAbsoluteStatistics()
+
+
+def sumAbsoluteStatistics(statistics):
+    """Sum of absolute statistics of multiple sequences"""
+
+    total = {}
+    for abs_stats in statistics:
+        for key, value in abs_stats.items():
+            total[key] = total.get(key, 0) + value
+    return total
+
+
+def findSequences(groundtruth_dir, hypotheses_dir):
+    """List of (name, ground truth file, hypotheses file) for all files in hypotheses_dir with a ground truth file of the same name"""
+
+    sequences = []
+    for name in sorted(os.listdir(hypotheses_dir)):
+        groundtruth_file = os.path.join(groundtruth_dir, name)
+        if os.path.isfile(groundtruth_file):
+            sequences.append((name, groundtruth_file, os.path.join(hypotheses_dir, name)))
+    return sequences
+
+
+def evaluateTrackers(groundtruth, hypotheses, solver="auto", kernel=None, threshold=None):
+    """Evaluate hypotheses of several trackers against the same ground truth, interleaved frame by frame.
+
+    groundtruth is a framestore.FrameStore, hypotheses a list of FrameStores. Returns one MOTEvaluation per tracker.
+    Each ground truth frame and its ground truth data are only prepared once for all trackers.
+    With kernel, trackers are evaluated by this kernels.CostKernel, see MOTEvaluation.setCostKernel."""
+
+    evaluations = [MOTEvaluation(groundtruth, tracker_hypotheses, solver) for tracker_hypotheses in hypotheses]
+    if not evaluations:
+        return evaluations
+    if kernel is not None:
+        for evaluation in evaluations:
+            evaluation.setCostKernel(kernel, threshold)
+
+    merge_join = evaluations[0].mergeJoin()
+    for frame in groundtruth:
+        geometry = None
+        for evaluation in evaluations:
+            geometry = evaluation.makeGeometry(frame, evaluation.get_hypotheses_frame(frame.timestamp_, merge_join), geometry)
+            evaluation.evaluateGeometry(geometry)
+
+    return evaluations
+
+
+# Ground truth of TrackerEvaluation, loaded before starting pool processes, which inherit it
+shared_groundtruth = None
+
+
+def evaluateTracker(job):
+    """Evaluate one tracker against the shared ground truth, given as tuple of name, hypotheses file, solver, cache directory, cost kernel and threshold.
+
+    Returns name, absolute statistics and format report of hypotheses. Module level function, so it can be run by pool processes."""
+
+    name, hypotheses_file, solver, cache_dir, kernel, threshold = job
+
+    hypotheses = hypo_import(hypotheses_file, cache_dir=cache_dir)
+    report = FormatChecker(None, hypotheses).check()["hypotheses"]
+
+    evaluator = MOTEvaluation(shared_groundtruth, hypotheses, solver)
+    if kernel is not None:
+        evaluator.setCostKernel(kernel, threshold)
+    evaluator.evaluate()
+    return name, evaluator.getAbsoluteStatistics(), report
+
+
+class TrackerEvaluation:
+    """Evaluate hypotheses of many trackers against a single ground truth, which is loaded and checked only once"""
+
+    def __init__(self, groundtruth_file, hypotheses_files, processes=1, solver="auto", cache_dir=None, kernel=None, threshold=None):
+        """Constructor from ground truth file and list of hypotheses files.
+
+        With 1 process, trackers are evaluated interleaved frame by frame in this process.
+        Otherwise, trackers are evaluated by a pool of processes (default: number of cores), which inherit the ground truth.
+        kernel and threshold are passed to MOTEvaluation.setCostKernel, if kernel is given."""
+
+        self.groundtruth_file_ = groundtruth_file
+        self.hypotheses_files_ = list(hypotheses_files)
+        self.processes_ = processes
+        self.solver_ = solver
+        self.cache_dir_ = cache_dir
+        self.kernel_ = kernel
+        self.threshold_ = threshold
+
+        # Ground truth and its format report, see checkGroundTruth
+        self.groundtruth_ = None
+        self.groundtruth_report_ = None
+
+        # List of (hypotheses file, absolute statistics, format report of hypotheses), in order of hypotheses files
+        self.tracker_statistics_ = []
+
+
+    def checkGroundTruth(self):
+        """Load and check the ground truth, unless already done. Returns its format report, see getGroundTruthReport"""
+
+        if self.groundtruth_ is None:
+            self.groundtruth_ = groundtruth_import(self.groundtruth_file_, cache_dir=self.cache_dir_)
+            self.groundtruth_report_ = FormatChecker(self.groundtruth_, None).check()["groundtruth"]
+        return self.groundtruth_report_
+
+
+    def evaluate(self):
+        """Evaluate all trackers"""
+
+        global shared_groundtruth
+
+        self.checkGroundTruth()
+        groundtruth = self.groundtruth_
+
+        if self.processes_ == 1:
+            hypotheses = [hypo_import(hypotheses_file, cache_dir=self.cache_dir_) for hypotheses_file in self.hypotheses_files_]
+            evaluations = evaluateTrackers(groundtruth, hypotheses, self.solver_, self.kernel_, self.threshold_)
+            self.tracker_statistics_ = [
+                (hypotheses_file, evaluation.getAbsoluteStatistics(), FormatChecker(None, tracker_hypotheses).check()["hypotheses"])
+                for hypotheses_file, tracker_hypotheses, evaluation in zip(self.hypotheses_files_, hypotheses, evaluations)
+            ]
+            return
+
+        jobs = [(hypotheses_file, hypotheses_file, self.solver_, self.cache_dir_, self.kernel_, self.threshold_) for hypotheses_file in self.hypotheses_files_]
+
+        shared_groundtruth = groundtruth
+        pool = Pool(self.processes_)
+        try:
+            self.tracker_statistics_ = pool.map(evaluateTracker, jobs, chunksize=1)
+        finally:
+            pool.close()
+            pool.join()
+            shared_groundtruth = None
+
+
+    def getGroundTruthReport(self):
+        """Format report of ground truth, see formatchecker.FormatChecker.check"""
+        return self.groundtruth_report_
+
+
+    def getTrackerStatistics(self):
+        """List of (hypotheses file, absolute statistics, format report of hypotheses) of each tracker"""
+        return self.tracker_statistics_
+
+
+class BatchEvaluation:
+    """Evaluate many sequences in parallel and accumulate their statistics"""
+
+    def __init__(self, sequences, processes=None, solver="auto", cache_dir=None):
+        """Constructor from list of (name, ground truth file, hypotheses file).
+
+        processes defaults to the number of cores. With 1 process, sequences are evaluated in this process.
+        With cache_dir, imported files are cached, see framecache.FrameCache."""
+
+        self.sequences_ = list(sequences)
+        self.processes_ = processes
+        self.solver_ = solver
+        self.cache_dir_ = cache_dir
+
+        # List of (name, absolute statistics), in order of sequences
+        self.sequence_statistics_ = []
+
+
+    def evaluate(self):
+        """Evaluate all sequences"""
+
+        jobs = [(name, groundtruth_file, hypotheses_file, self.solver_, self.cache_dir_) for name, groundtruth_file, hypotheses_file in self.sequences_]
+
+        if self.processes_ == 1:
+            self.sequence_statistics_ = map(evaluateSequence, jobs)
+            return
+
+        pool = Pool(self.processes_)
+        try:
+            self.sequence_statistics_ = pool.map(evaluateSequence, jobs, chunksize=1)
+        finally:
+            pool.close()
+            pool.join()
+
+
+    def getSequenceStatistics(self):
+        """List of (name, absolute statistics) of each sequence"""
+        return self.sequence_statistics_
+
+
+    def getAbsoluteStatistics(self):
+        """Absolute statistics summed over all sequences"""
+        return sumAbsoluteStatistics(abs_stats for name, abs_stats in self.sequence_statistics_)
+
+
+    def getRelativeStatistics(self):
+        """Relative statistics of all sequences together"""
+        return MOTEvaluation.calcRelativeStatistics(self.getAbsoluteStatistics())
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Evaluate all hypotheses files, which have a ground truth file of the same name")
+    parser.add_argument('-a', '--groundtruth_dir', required=True)
+    parser.add_argument('-b', '--hypothesis_dir', required=True)
+    parser.add_argument('-p', '--processes', type=int, help="Number of processes, defaults to number of cores")
+    parser.add_argument('--solver', default="auto")
+    parser.add_argument('--cache_dir', default=default_cache_dir(), help="Cache imported files in this directory and map them on later runs. Defaults to environment variable PYMOT_CACHE_DIR")
+    args = parser.parse_args()
+
+    batch = BatchEvaluation(findSequences(args.groundtruth_dir, args.hypothesis_dir), args.processes, args.solver, args.cache_dir)
+    batch.evaluate()
+
+    for name, abs_stats in batch.getSequenceStatistics():
+        print "%-40s MOTA %.4f  MOTP %.4f" % (name, MOTEvaluation.calcMOTA(abs_stats), MOTEvaluation.calcMOTP(abs_stats))
+
+    print
+    print "Absolute statistics"
+    print json.dumps(batch.getAbsoluteStatistics(), indent=4, sort_keys=True)
+    print "Relative statistics"
+    print json.dumps(batch.getRelativeStatistics(), indent=4, sort_keys=True)
@@ -0,0 +1,180 @@
+#!/usr/bin/env python
+
+import sys
+import json
+import time
+import platform
+import argparse
+import subprocess
+from StringIO import StringIO
+import numpy
+from pymot import MOTEvaluation
+from importers import MOT_groundtruth_import
+from importers import MOT_hypo_import
+from importers import JSON_groundtruth_import
+from importers import JSON_hypo_import
+from profiling import PHASES
+import synthetic
+
+
+def benchmarkImporters(groundtruth, hypotheses):
+    """Seconds of importers, for MOT text format and json"""
+
+    gt_lines = synthetic.MOT_groundtruth_lines(groundtruth)
+    hypo_lines = synthetic.MOT_hypo_lines(hypotheses)
+    gt_json = json.dumps([groundtruth])
+    hypo_json = json.dumps([hypotheses])
+
+    timings = {}
+
+    start = time.time()
+    MOT_groundtruth_import(gt_lines, columnar=True)
+    timings["import MOT ground truth"] = time.time() - start
+
+    start = time.time()
+    MOT_hypo_import(hypo_lines, columnar=True)
+    timings["import MOT hypotheses"] = time.time() - start
+
+    start = time.time()
+    JSON_groundtruth_import(StringIO(gt_json), columnar=True)
+    JSON_hypo_import(StringIO(hypo_json), columnar=True)
+    timings["import json"] = time.time() - start
+
+    return timings
+
+
+def benchmarkLookup(groundtruth, hypotheses):
+    """Seconds of get_hypotheses_frame for all ground truth timestamps, with merge join and binary search"""
+
+    evaluation = MOTEvaluation(groundtruth, hypotheses)
+    timestamps = evaluation.groundtruth_.timestamps_.tolist()
+
+    timings = {}
+    for name, merge_join in (("lookup merge join", True), ("lookup binary search", False)):
+        evaluation.hypotheses_index_.cursor_ = 0
+        start = time.time()
+        for timestamp in timestamps:
+            evaluation.get_hypotheses_frame(timestamp, merge_join)
+        timings[name] = time.time() - start
+
+    return timings
+
+
+def benchmarkPhases(groundtruth, hypotheses, solver):
+    """Seconds of frame matching, overlaps and the phases of evaluateGeometry, see MOTEvaluation.enableProfiling"""
+
+    evaluation = MOTEvaluation(groundtruth, hypotheses, solver)
+    evaluation.enableProfiling()
+    evaluation.evaluate()
+    return evaluation.getProfile()["seconds"]
+
+
+def benchmarkEvaluate(groundtruth, hypotheses, solver):
+    """Seconds of a whole evaluation, including conversion of dicts"""
+
+    start = time.time()
+    evaluation = MOTEvaluation(groundtruth, hypotheses, solver)
+    evaluation.evaluate()
+    return {"evaluate": time.time() - start}
+
+
+def benchmark(workload, repeat=3, solver="auto"):
+    """Best of repeat timings of all benchmarks for one workload, given as keyword arguments of synthetic.generate"""
+
+    groundtruth, hypotheses = synthetic.generate(**workload)
+
+    best = {}
+    for k in range(repeat):
+        timings = {}
+        timings.update(benchmarkImporters(groundtruth, hypotheses))
+        timings.update(benchmarkLookup(groundtruth, hypotheses))
+        timings.update(benchmarkPhases(groundtruth, hypotheses, solver))
+        timings.update(benchmarkEvaluate(groundtruth, hypotheses, solver))
+        for name, seconds in timings.items():
+            best[name] = min(best.get(name, seconds), seconds)
+
+    return {
+        "workload": workload,
+        "ground truths": sum(len(frame["annotations"]) for frame in groundtruth["frames"]),
+        "hypotheses": sum(len(frame["hypotheses"]) for frame in hypotheses["frames"]),
+        "seconds": best,
+    }
+
+
+def compare(report, baseline):
+    """Print ratio of timings of report and baseline report, for workloads found in both"""
+
+    baseline_results = dict((json.dumps(result["workload"], sort_keys=True), result["seconds"]) for result in baseline["results"])
+    print "Timings relative to revision %s (< 1.0 is faster)" % baseline.get("revision")
+
+    for result in report["results"]:
+        baseline_seconds = baseline_results.get(json.dumps(result["workload"], sort_keys=True))
+        if baseline_seconds is None:
+            continue
+        print "frames %d, objects %d" % (result["workload"]["frames"], result["workload"]["objects"])
+        for name in sorted(result["seconds"]):
+            if baseline_seconds.get(name):
+                print "    %-25s %6.2f" % (name, result["seconds"][name] / baseline_seconds[name])
+
+
+def revision():
+    """Git revision of the working directory, if available"""
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], stderr=subprocess.STDOUT).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Time importers, frame lookup, evaluation phases and whole evaluations on synthetic workloads. The objects and frames arguments take multiple values for scaling curves.")
+    parser.add_argument('--frames', type=int, nargs='+', default=[1000])
+    parser.add_argument('--objects', type=int, nargs='+', default=[5, 10, 20, 40, 80])
+    parser.add_argument('--density', type=float, default=0.2, help="Fraction of scene area covered by boxes")
+    parser.add_argument('--switch_rate', type=float, default=0.01)
+    parser.add_argument('--dco_fraction', type=float, default=0.1)
+    parser.add_argument('--jitter', type=float, default=0.0003, help="Maximum hypotheses timestamp offset in seconds")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3, help="Report best of repeated runs")
+    parser.add_argument('--solver', default="auto")
+    parser.add_argument('-o', '--output', help="Write results as json to file, - for stdout")
+    parser.add_argument('-c', '--compare', help="Compare with json results of a previous run")
+    args = parser.parse_args()
+
+    results = []
+    for frames in args.frames:
+        for objects in args.objects:
+            workload = {
+                "seed": args.seed,
+                "frames": frames,
+                "objects": objects,
+                "density": args.density,
+                "switch_rate": args.switch_rate,
+                "dco_fraction": args.dco_fraction,
+                "jitter": args.jitter,
+            }
+            result = benchmark(workload, args.repeat, args.solver)
+            results.append(result)
+
+            seconds = result["seconds"]
+            sys.stderr.write("frames %6d  objects %4d  evaluate %8.3fs  " % (frames, objects, seconds["evaluate"]))
+            sys.stderr.write("  ".join("%s %.3fs" % (phase, seconds[phase]) for phase in PHASES) + "\n")
+
+    report = {
+        "revision": revision(),
+        "python": platform.python_version(),
+        "numpy": numpy.__version__,
+        "solver": args.solver,
+        "repeat": args.repeat,
+        "results": results,
+    }
+
+    if args.output == "-":
+        print json.dumps(report, indent=4, sort_keys=True)
+    elif args.output:
+        with open(args.output, 'w') as fp:
+            json.dump(report, fp, indent=4, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as fp:
+            compare(report, json.load(fp))
@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+
+import numpy
+
+
+# Statistics counted per frame by MOTEvaluation, in order of the columns of its per-frame array
+FRAME_STATISTICS = [
+    "misses",
+    "false positives",
+    "mismatches",
+    "ground truths",
+    "correspondences",
+    "total overlap",
+]
+
+
+def defaultBlockLength(frames):
+    """Block length for a sequence of frames, about the cube root of the number of frames"""
+    return max(1, int(round(frames ** (1.0 / 3))))
+
+
+def blockBootstrap(frame_statistics, samples=1000, block_length=None, seed=None):
+    """Sums of statistics of resampled sequences, drawn by moving block bootstrap.
+
+    frame_statistics is an array of shape (frames, len(FRAME_STATISTICS)). Each resampled sequence consists of blocks of
+    block_length consecutive frames (default: see defaultBlockLength) at random positions, with the same number of frames in total.
+    All samples are drawn at once: block sums are differences of cumulative sums. Returns array of shape (samples, len(FRAME_STATISTICS))."""
+
+    frame_statistics = numpy.asarray(frame_statistics, dtype=numpy.float64)
+    frames = len(frame_statistics)
+    if frames == 0:
+        raise Exception, "No frames to resample"
+
+    if block_length is None:
+        block_length = defaultBlockLength(frames)
+    block_length = min(block_length, frames)
+
+    # The last block is shortened to the number of frames
+    blocks = -(-frames // block_length)
+    lengths = numpy.empty(blocks, dtype=numpy.int64)
+    lengths.fill(block_length)
+    lengths[-1] = frames - (blocks - 1) * block_length
+
+    cumulative = numpy.zeros((frames + 1, frame_statistics.shape[1]))
+    numpy.cumsum(frame_statistics, axis=0, out=cumulative[1:])
+
+    random = numpy.random.RandomState(seed)
+    starts = (random.random_sample((samples, blocks)) * (frames - lengths + 1)).astype(numpy.int64)
+
+    return (cumulative[starts + lengths] - cumulative[starts]).sum(axis=1)
+
+
+def bootstrapIntervals(frame_statistics, samples=1000, block_length=None, confidence=0.95, seed=None):
+    """Percentile confidence intervals of MOTA and MOTP from per-frame statistics, see blockBootstrap.
+
+    Returns dict of (lower bound, upper bound) of "MOTA" and "MOTP". Samples without ground truths or correspondences are ignored."""
+
+    sums = blockBootstrap(frame_statistics, samples, block_length, seed)
+    column = dict((name, sums[:, k]) for k, name in enumerate(FRAME_STATISTICS))
+
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        mota = 1.0 - (column["misses"] + column["false positives"] + column["mismatches"]) / column["ground truths"]
+        motp = column["total overlap"] / column["correspondences"]
+
+    percentiles = [50.0 * (1.0 - confidence), 50.0 * (1.0 + confidence)]
+    intervals = {}
+    for name, values in (("MOTA", mota), ("MOTP", motp)):
+        values = values[numpy.isfinite(values)]
+        intervals[name] = tuple(numpy.percentile(values, percentiles).tolist()) if len(values) else (None, None)
+    return intervals
@@ -0,0 +1,139 @@
+#!/usr/bin/env python2
+
+import sys
+import argparse
+from pymot import MOTEvaluation
+from framestore import Frame
+from kernels import PointDistanceKernel
+from importers import CLEAR_3d_import
+import logging
+LOG = logging.getLogger(__name__)
+
+
+# Scoring modes of the CLEAR person tracking tasks: visual, acoustic and multimodal.
+# Mismatches are ignored for the acoustic task, which scores A-MOTA instead of MOTA.
+MODES = ["V", "A", "M"]
+
+# Maximum distance of corresponding ground truth and hypothesis in mm
+DISTANCE_THRESHOLD = 500.0
+
+# Maximum offset of matching ground truth and hypotheses frames in seconds. Of several hypotheses frames, the closest is matched.
+SYNC_DELTA = 0.5
+
+
+class CLEAR3dEvaluation:
+    """Evaluation of 3D person tracks in CHIL CLEAR format by the distance of ground truth and hypotheses points.
+
+    Replaces MOTscore.pl, using the correspondence and mismatch counting of MOTEvaluation."""
+
+    def __init__(self, groundtruth, hypotheses, mode="V", distance_threshold=DISTANCE_THRESHOLD, solver="auto"):
+        """Constructor from ground truth and hypotheses FrameStores, see importers.CLEAR_3d_import, and scoring mode, see MODES"""
+
+        if mode not in MODES:
+            raise Exception, "Unknown mode %s, expected one of %s" % (mode, ", ".join(MODES))
+        self.mode_ = mode
+
+        # Distances are measured on the floor plane (x and y), like MOTscore.pl does
+        self.evaluation_ = MOTEvaluation(groundtruth, hypotheses, solver)
+        self.evaluation_.setCostKernel(PointDistanceKernel(2), distance_threshold)
+        self.evaluation_.sync_delta_ = SYNC_DELTA
+
+        # Sum of min(ground truths, hypotheses) per frame minus correspondences, i.e. misses and false positives due to localization errors
+        self.failed_correspondences_ = 0
+
+
+    @staticmethod
+    def fromFiles(groundtruth_file, hypotheses_file, mode="V", distance_threshold=DISTANCE_THRESHOLD):
+        """Evaluation of ground truth and hypotheses label files"""
+        with open(groundtruth_file) as fp:
+            groundtruth = CLEAR_3d_import(fp.readlines(), "annotations")
+        with open(hypotheses_file) as fp:
+            hypotheses = CLEAR_3d_import(fp.readlines(), "hypotheses")
+        return CLEAR3dEvaluation(groundtruth, hypotheses, mode, distance_threshold)
+
+
+    def framePairs(self):
+        """Iterate over pairs of ground truth frame and closest hypotheses frame within SYNC_DELTA, like MOTscore.pl.
+
+        Of two equally close hypotheses frames, the earlier one is matched."""
+
+        evaluation = self.evaluation_
+        hypotheses = evaluation.hypotheses_
+        timestamps = hypotheses.timestamps_.tolist()
+        for frame in evaluation.groundtruth_:
+            positions = evaluation.hypotheses_index_.find(frame.timestamp_, evaluation.sync_delta_)
+            if not positions:
+                yield frame, Frame.empty("hypotheses")
+                continue
+            closest = min(positions, key=lambda k: (abs(timestamps[k] - frame.timestamp_), timestamps[k]))
+            yield frame, hypotheses.frame(closest)
+
+
+    def evaluate(self):
+        evaluation = self.evaluation_
+        possible_correspondences = 0
+        for frame, hypotheses_frame in self.framePairs():
+            evaluation.evaluateFrame(frame, hypotheses_frame)
+            possible_correspondences += min(len(frame), len(hypotheses_frame))
+        self.failed_correspondences_ = possible_correspondences - evaluation.total_correspondences_
+
+
+    def getAbsoluteStatistics(self):
+        """Absolute totals of MOTscore.pl: ground truths, correspondences, failed correspondences, total distance in mm, misses, false positives and mismatches"""
+
+        evaluation = self.evaluation_
+        return {
+            "ground truths": evaluation.total_groundtruths_,
+            "correspondences": evaluation.total_correspondences_,
+            "failed correspondences": self.failed_correspondences_,
+            "total distance": evaluation.total_overlap_,
+            "misses": evaluation.misses_,
+            "false positives": evaluation.false_positives_,
+            "mismatches": evaluation.mismatches_,
+        }
+
+
+    def getRelativeStatistics(self):
+        """MOTP in mm, rates of misses, false positives, mismatches and failed correspondences, and MOTA. For mode "A", MOTA is A-MOTA, which ignores mismatches."""
+        return relativeStatistics(self.getAbsoluteStatistics(), self.mode_)
+
+
+def relativeStatistics(absolute, mode):
+    """Relative statistics of absolute statistics, see CLEAR3dEvaluation.getRelativeStatistics. Absolute statistics may be summed over segments."""
+
+    ground_truths = float(absolute["ground truths"])
+    errors = absolute["misses"] + absolute["false positives"]
+    if mode != "A":
+        errors += absolute["mismatches"]
+    return {
+        "MOTP": absolute["total distance"] / absolute["correspondences"] if absolute["correspondences"] else -1,
+        "miss rate": absolute["misses"] / ground_truths,
+        "false positive rate": absolute["false positives"] / ground_truths,
+        "mismatch rate": absolute["mismatches"] / ground_truths,
+        "failed correspondence rate": absolute["failed correspondences"] / ground_truths,
+        "MOTA": 1.0 - errors / ground_truths,
+    }
+
+
+def printResult(absolute, mode, fp=sys.stdout):
+    """Print result and absolute totals in the format of MOTscore.pl"""
+
+    relative = relativeStatistics(absolute, mode)
+    if mode == "A":
+        fp.write("RESULT: MOTP %3.0fmm\t miss %2.1f%%\t fp %2.1f%%\t failed Corr %2.1f%%\t A-MOTA %2.1f%%\n" % (relative["MOTP"], 100 * relative["miss rate"], 100 * relative["false positive rate"], 100 * relative["failed correspondence rate"], 100 * relative["MOTA"]))
+    else:
+        fp.write("RESULT: MOTP %3.0fmm\t miss %2.1f%%\t fp %2.1f%%\t mismatches %d\t MOTA %2.1f%%\n" % (relative["MOTP"], 100 * relative["miss rate"], 100 * relative["false positive rate"], absolute["mismatches"], 100 * relative["MOTA"]))
+    fp.write("ABS TOTALS: groundT %(ground truths).0f\t corr %(correspondences).0f\t failedCorr %(failed correspondences).0f\t distance %(total distance).0f\t miss %(misses).0f\t falseP %(false positives).0f\t mismatch %(mismatches).0f\n" % absolute)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score 3D person tracks in CHIL CLEAR format by distance")
+    parser.add_argument('-a', '--groundtruth', required=True, help="3D label file, e.g. 3d/GroundTruth_A.txt")
+    parser.add_argument('-b', '--hypothesis', required=True, help="Hypotheses file, e.g. 3d/Hypos_A.txt")
+    parser.add_argument('-m', '--mode', choices=MODES, default="V", help="Visual, acoustic or multimodal task. A ignores mismatches and scores A-MOTA")
+    parser.add_argument('--threshold', type=float, default=DISTANCE_THRESHOLD, help="Maximum distance of corresponding points in mm")
+    args = parser.parse_args()
+
+    evaluation = CLEAR3dEvaluation.fromFiles(args.groundtruth, args.hypothesis, args.mode, args.threshold)
+    evaluation.evaluate()
+    printResult(evaluation.getAbsoluteStatistics(), args.mode)
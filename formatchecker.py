@@ -1,98 +1,233 @@
+import numpy
+from framestore import FrameStore
+from framestore import Frame
 from utilities import write_stderr_red
 
-class FormatChecker:
-
-    def __init__(self, groundtruth, hypotheses):
-        """Constructor """
 
-        self.groundtruth_ = groundtruth
-        self.hypotheses_ = hypotheses
+# Keys every box must have, besides its id
+EXPECTED_KEYS = ("x", "y", "width", "height")
+
+# Placeholder id of ground truths without id, see framestore.FrameStoreBuilder
+MISSING_ID = "__missing_id__"
+
+
+class DocumentReport:
+    """Problems found in ground truth or hypotheses: counts per problem and the first few occurences"""
+
+    max_examples = 10
+
+    def __init__(self, name):
+        self.name_ = name # "ground truth" or "hypotheses"
+        self.frames_ = 0
+        self.boxes_ = 0
+        self.counts_ = {} # problem -> number of boxes
+        self.examples_ = [] # (problem, timestamp, frame number, id)
+
+    def add(self, problem, frame, id=None, count=1):
+        self.counts_[problem] = self.counts_.get(problem, 0) + count
+        if len(self.examples_) < self.max_examples:
+            num = frame["num"] if "num" in frame else -1
+            self.examples_.append((problem, frame["timestamp"], num, id))
+
+    def ok(self, problems=None):
+        """True, if none of problems (default: any problem) was found"""
+        if problems is None:
+            return not self.counts_
+        return not any(self.counts_.get(problem) for problem in problems)
+
+    def toDict(self):
+        return {
+            "frames": self.frames_,
+            "boxes": self.boxes_,
+            "problems": dict(self.counts_),
+            "examples": [{"problem": problem, "timestamp": timestamp, "num": num, "id": id} for problem, timestamp, num, id in self.examples_],
+        }
+
+    def printReport(self, problems=None):
+        """One warning per problem with its count and first occurence"""
+        for problem in sorted(self.counts_):
+            if problems is not None and problem not in problems:
+                continue
+            problem_examples = [example for example in self.examples_ if example[0] == problem]
+            message = "%d boxes with %s in %s" % (self.counts_[problem], problem, self.name_)
+            if problem_examples:
+                problem, timestamp, num, id = problem_examples[0]
+                message += ", first at timestamp %f, frame %d" % (timestamp, num)
+                if id is not None:
+                    message += ", id \"%s\"" % id
+            write_stderr_red("Warning:", message + "!")
 
 
-    def checkForAmbiguousIDs(self):
-        """Check ground truth and hypotheses for multiple use of the same id per frame"""
+class FormatChecker:
+    """Check ground truth and hypotheses for missing, empty and ambiguous ids and for incomplete boxes.
 
-        result = True
-        
-        for frame in self.groundtruth_["frames"]:
-            ids = set()
-            for groundtruth in frame["annotations"]:
-                if not "id" in groundtruth:
-                    # We should have already warned about a missing ID in checkForExistingIDs
-                    # no need to raise an exception in this function by trying to access missing IDs
-                    continue
+    All checks are done in a single pass over each document, see check. Streamed frames are checked while being read, see checkedFrames."""
 
-                if groundtruth["id"] in ids:
-                    result &= False
-                    write_stderr_red("Warning:", "Ambiguous id (%s) found in ground truth, timestamp %f, frame %d!" % (str(groundtruth["id"]), frame["timestamp"], frame["num"] if "num" in frame else -1))
-                else:
-                    ids.add(groundtruth["id"])
-        
-        for frame in self.hypotheses_["frames"]:
-            ids = set()
-            for hypothesis in frame["hypotheses"]:
-                if hypothesis["id"] in ids:
-                    result &= False
-                    write_stderr_red("Warning:", "Ambiguous hypothesis (%s) found in hypotheses, timestamp %f, frame %d!" % (str(hypothesis["id"]), frame["timestamp"], frame["num"] if "num" in frame else -1))
-                else:
-                    ids.add(hypothesis["id"])
+    def __init__(self, groundtruth=None, hypotheses=None):
+        """Constructor from dicts of class video or framestore.FrameStore. Both may be None, when only checking streamed frames."""
 
-        return result # true: OK, false: ambiguous id found
+        self.groundtruth_ = groundtruth
+        self.hypotheses_ = hypotheses
 
+        self.reports_ = {
+            "annotations": DocumentReport("ground truth"),
+            "hypotheses": DocumentReport("hypotheses"),
+        }
+        self.checked_ = False
 
-    def checkForExistingIDs(self):
-        """Check ground truth and hypotheses for having a valid id. Valid: existing and non-empty."""
 
-        result = True
+    def check(self):
+        """Check ground truth and hypotheses once. Returns dict of report of ground truth and hypotheses, see DocumentReport.toDict"""
 
-        for f in self.groundtruth_["frames"]:
-            for g in f["annotations"]:
-                
-                if not "id" in g.keys():
-                    write_stderr_red("Warning:", "Groundtruth without ID found, timestamp %f, frame %d!" % (f["timestamp"], f["num"] if "num" in f else -1))
-                    result &= False
+        if not self.checked_:
+            for document, key in ((self.groundtruth_, "annotations"), (self.hypotheses_, "hypotheses")):
+                if document is None:
                     continue
+                if isinstance(document, FrameStore):
+                    self.checkFrameStore(document, key)
+                else:
+                    for frame in document["frames"]:
+                        self.checkFrame(frame, key)
+            self.checked_ = True
+
+        return self.getReport()
+
 
-                if g["id"] == "":
-                    write_stderr_red("Warning:", "Groundtruth with empty ID found, timestamp %f, frame %d!" % (f["timestamp"], f["num"] if "num" in f else -1))
-                    result &= False
-                    continue
+    def getReport(self):
+        return {
+            "groundtruth": self.reports_["annotations"].toDict(),
+            "hypotheses": self.reports_["hypotheses"].toDict(),
+        }
+
+
+    def ok(self, problems=None):
+        """True, if none of problems (default: any problem) was found in checked frames"""
+        return all(report.ok(problems) for report in self.reports_.values())
+
+
+    def printReport(self, problems=None):
+        for key in ("annotations", "hypotheses"):
+            self.reports_[key].printReport(problems)
+
+
+    def checkFrame(self, frame, key):
+        """Check a single frame dict or framestore.Frame. key is "annotations" for ground truth and "hypotheses" for hypotheses."""
+
+        if isinstance(frame, Frame):
+            self.checkIds(frame, frame.ids(), key)
+            for problem, id in frame.problems_:
+                self.reports_[key].add(problem, frame, id)
+            return
+
+        report = self.reports_[key]
+        boxes = frame[key]
+        report.frames_ += 1
+        report.boxes_ += len(boxes)
+
+        ids = set()
+        for box in boxes:
+            for expected_key in EXPECTED_KEYS:
+                if expected_key not in box:
+                    report.add("missing " + expected_key, frame, box.get("id"))
+
+            if "id" not in box:
+                report.add("missing id", frame)
+                continue
+            id = box["id"]
+            if id == "":
+                report.add("empty id", frame, id)
+            if id in ids:
+                report.add("ambiguous id", frame, id)
+            else:
+                ids.add(id)
+
+
+    def checkIds(self, frame, ids, key):
+        """Check ids of a framestore.Frame, whose boxes are complete by construction"""
+
+        report = self.reports_[key]
+        report.frames_ += 1
+        report.boxes_ += len(ids)
+
+        if "" in ids:
+            report.add("empty id", frame, "", ids.count(""))
+        if key == "annotations" and MISSING_ID in ids:
+            report.add("missing id", frame, None, ids.count(MISSING_ID))
+        if len(set(ids)) != len(ids):
+            seen = set()
+            for id in ids:
+                if id in seen and id != MISSING_ID:
+                    report.add("ambiguous id", frame, id)
+                seen.add(id)
+
+
+    def checkFrameStore(self, store, key):
+        """Check all frames of a framestore.FrameStore at once"""
+
+        report = self.reports_[key]
+        report.frames_ += len(store)
+        report.boxes_ += store.numBoxes()
+
+        # Boxes left out while importing
+        for problem, k, id in store.problems_:
+            report.add(problem, store.frame(k), id)
+
+        if store.numBoxes() == 0:
+            return
+
+        # Same code for equal id strings
+        first_code = {}
+        canonical = numpy.array([first_code.setdefault(id, code) for code, id in enumerate(store.ids_)], dtype=numpy.int64)
+        codes = canonical[store.id_codes_]
+        frame_of_box = numpy.repeat(numpy.arange(len(store)), numpy.diff(store.offsets_))
+
+        def addBoxes(problem, box_indices, with_id=True):
+            report.counts_[problem] = report.counts_.get(problem, 0) + len(box_indices)
+            for b in box_indices[:report.max_examples].tolist():
+                frame = store.frame(int(frame_of_box[b]))
+                report.examples_.append((problem, frame.timestamp_, frame.num_ if frame.num_ is not None else -1, store.ids_[store.id_codes_[b]] if with_id else None))
+            del report.examples_[report.max_examples:]
+
+        if "" in first_code:
+            addBoxes("empty id", numpy.nonzero(codes == first_code[""])[0])
+        if key == "annotations" and MISSING_ID in first_code:
+            addBoxes("missing id", numpy.nonzero(codes == first_code[MISSING_ID])[0], False)
+
+        # Boxes with the same id as the previous box of the same frame, after sorting by frame and id
+        keys = frame_of_box * len(store.ids_) + codes
+        order = numpy.argsort(keys, kind="mergesort")
+        sorted_keys = keys[order]
+        ambiguous = order[1:][sorted_keys[1:] == sorted_keys[:-1]]
+        if key == "annotations" and MISSING_ID in first_code:
+            ambiguous = ambiguous[codes[ambiguous] != first_code[MISSING_ID]]
+        if len(ambiguous) > 0:
+            addBoxes("ambiguous id", numpy.sort(ambiguous))
+
+
+    def checkedFrames(self, frames, key):
+        """Iterate over frames, checking each frame as it is read. The report is complete after the last frame."""
+        for frame in frames:
+            self.checkFrame(frame, key)
+            yield frame
 
-        # Hypotheses without ids or with empty ids
-        for f in self.hypotheses_["frames"]:
-            for h in f["hypotheses"]:
-                if not "id" in h.keys():
-                    write_stderr_red("Warning:", "Hypothesis without ID found, timestamp %f, frame %d!" % (f["timestamp"], f["num"] if "num" in f else -1))
-                    result &= False
-                    continue
 
-                if h["id"] == "":
-                    write_stderr_red("Warning:", "Hypothesis with empty ID found, timestamp %f, frame %d!" % (f["timestamp"], f["num"] if "num" in f else -1))
-                    result &= False
-                    continue
+    def checkForAmbiguousIDs(self):
+        """Check ground truth and hypotheses for multiple use of the same id per frame"""
+        return self.checkFor(["ambiguous id"]) # true: OK, false: ambiguous id found
+
 
-        return result # true: OK, false: missing id found
+    def checkForExistingIDs(self):
+        """Check ground truth and hypotheses for having a valid id. Valid: existing and non-empty."""
+        return self.checkFor(["missing id", "empty id"]) # true: OK, false: missing id found
 
 
     def checkForCompleteness(self):
         """Check ground truth and hypotheses for containing width, height, x and y"""
+        return self.checkFor(["missing " + key for key in EXPECTED_KEYS]) # true: OK, false: missing key found
+
 
-        result = True
-        expectedKeys = ("x", "y", "width", "height")
-
-        for f in self.groundtruth_["frames"]:
-            for g in f["annotations"]:
-                for key in expectedKeys:
-                    if not key in g.keys():
-                        write_stderr_red("Warning:", "Groundtruth without key %s found, timestamp %f, frame %d!" % (key, f["timestamp"], f["num"] if "num" in f else -1))
-                        result &= False
-
-        # Hypotheses without ids or with empty ids
-        for f in self.hypotheses_["frames"]:
-            for h in f["hypotheses"]:
-                for key in expectedKeys:
-                    if not key in h.keys():
-                        write_stderr_red("Warning:", "Hypothesis without key %s found, timestamp %f, frame %d!" % (key, f["timestamp"], f["num"] if "num" in f else -1))
-                        result &= False
-
-        return result # true: OK, false: missing id found
+    def checkFor(self, problems):
+        """Warn about problems found by check. Returns True, if none was found."""
+        self.check()
+        self.printReport(problems)
+        return self.ok(problems)
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+import numpy
+from framestore import FrameStore
+import logging
+LOG = logging.getLogger(__name__)
+
+
+# Arrays of a FrameStore, saved as one .npy file each
+ARRAYS = ["timestamps", "offsets", "boxes", "dco", "id_codes", "nums"]
+
+
+def default_cache_dir():
+    """Cache directory from environment variable PYMOT_CACHE_DIR, None if not set"""
+    return os.environ.get("PYMOT_CACHE_DIR")
+
+
+def file_hash(filename, chunk_size=1 << 20):
+    """SHA-1 hex digest of file content"""
+    digest = hashlib.sha1()
+    with open(filename, "rb") as fp:
+        while True:
+            chunk = fp.read(chunk_size)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class FrameCache:
+    """On-disk cache of imported ground truth and hypotheses files.
+
+    Each entry is a directory of .npy files with the arrays of a FrameStore and a json file with the id strings.
+    Entries are keyed by the content hash of the source file, the kind of boxes, the file format and the importer version,
+    so changed files and importers never hit stale entries. Cached arrays are memory-mapped read-only instead of being parsed again."""
+
+    def __init__(self, directory, version):
+        """Constructor from cache directory, which is created if missing, and version of the importers"""
+        self.directory_ = directory
+        self.version_ = version
+        if not os.path.isdir(directory):
+            try:
+                os.makedirs(directory)
+            except OSError:
+                if not os.path.isdir(directory): # not created by another process meanwhile
+                    raise
+
+    def entryPath(self, filename, key, format):
+        """Path of the cache entry of file. key is "annotations" for ground truth and "hypotheses" for hypotheses.
+        format is the format the file is imported as, e.g. "json" or "mot"."""
+        return os.path.join(self.directory_, "%s-%s-%s-v%s" % (file_hash(filename), key, format, self.version_))
+
+    def load(self, filename, key, format, importer):
+        """FrameStore of file from cache. On a miss, the file is imported by importer(filename) and added to the cache."""
+
+        path = self.entryPath(filename, key, format)
+        if os.path.isdir(path):
+            LOG.info("Loading %s from cache %s", filename, path)
+            return self.read(path)
+
+        store = importer(filename)
+        self.write(path, store)
+        return store
+
+    def read(self, path):
+        """Memory-mapped FrameStore of cache entry"""
+
+        with open(os.path.join(path, "meta.json")) as fp:
+            meta = json.load(fp)
+        arrays = dict((name, numpy.load(os.path.join(path, name + ".npy"), mmap_mode="r")) for name in ARRAYS)
+
+        # json decodes strings as unicode, ids are byte strings as created by the importers
+        ids = [id.encode("utf-8") for id in meta["ids"]]
+        filename = meta["filename"].encode("utf-8") if meta["filename"] is not None else None
+        problems = [(str(problem), k, id.encode("utf-8") if id is not None else None) for problem, k, id in meta.get("problems", [])]
+        return FrameStore(str(meta["key"]), arrays["timestamps"], arrays["offsets"], arrays["boxes"], arrays["dco"], arrays["id_codes"], ids, arrays["nums"], filename, problems)
+
+    def write(self, path, store):
+        """Add FrameStore as cache entry. Concurrent writers of the same entry are safe, the first one wins."""
+
+        temp = tempfile.mkdtemp(dir=self.directory_, prefix=".tmp-")
+        try:
+            for name in ARRAYS:
+                numpy.save(os.path.join(temp, name + ".npy"), getattr(store, name + "_"))
+            with open(os.path.join(temp, "meta.json"), "w") as fp:
+                json.dump({"key": store.key_, "filename": store.filename_, "ids": store.ids_, "problems": store.problems_}, fp)
+            os.rename(temp, path)
+        except OSError:
+            if not os.path.isdir(path):
+                raise
+        finally:
+            if os.path.isdir(temp):
+                shutil.rmtree(temp)
@@ -0,0 +1,259 @@
+#!/usr/bin/env python
+
+import numpy
+
+
+class FrameStore:
+    """Columnar storage of all boxes of a video, either ground truth annotations or hypotheses.
+
+    Boxes of frame k are rows offsets_[k] to offsets_[k + 1] of the box arrays."""
+
+    def __init__(self, key, timestamps, offsets, boxes, dco, id_codes, ids, nums=None, filename=None, problems=None):
+        """Constructor from arrays. key is "annotations" for ground truth and "hypotheses" for hypotheses.
+
+        problems are the boxes left out while importing, as list of (problem, frame index, id or None), see FrameStoreBuilder.addFrame"""
+
+        self.key_ = key
+        self.timestamps_ = numpy.asarray(timestamps, dtype=numpy.float64)
+        self.offsets_ = numpy.asarray(offsets, dtype=numpy.int64)
+        self.boxes_ = numpy.asarray(boxes, dtype=numpy.float64).reshape(-1, 4) # x, y, width, height
+        self.dco_ = numpy.asarray(dco, dtype=bool)
+        self.id_codes_ = numpy.asarray(id_codes, dtype=numpy.int32)
+        self.ids_ = list(ids) # id string of each id code
+
+        # Frame numbers, -1 for frames without number
+        if nums is None:
+            nums = -numpy.ones(len(self.timestamps_), dtype=numpy.int64)
+        self.nums_ = numpy.asarray(nums, dtype=numpy.int64)
+
+        self.filename_ = filename
+        self.problems_ = list(problems) if problems is not None else []
+
+        assert len(self.offsets_) == len(self.timestamps_) + 1
+        assert len(self.boxes_) == len(self.dco_) == len(self.id_codes_) == self.offsets_[-1]
+
+    @staticmethod
+    def fromDict(video, key):
+        """Create from dict of class video, see groundtruth.json and hypotheses.json for sample files.
+
+        key is "annotations" for ground truth and "hypotheses" for hypotheses."""
+
+        builder = FrameStoreBuilder(key, video.get("filename"))
+        for frame in video["frames"]:
+            builder.addFrame(frame)
+        return builder.build()
+
+    def toDict(self):
+        """Dict of class video, as read from json files"""
+
+        video = {
+            "class": "video",
+            "frames": [self.frame(k).toDict() for k in range(len(self))],
+        }
+        if self.filename_ is not None:
+            video["filename"] = self.filename_
+        return video
+
+    def __len__(self):
+        """Number of frames"""
+        return len(self.timestamps_)
+
+    def __iter__(self):
+        for k in range(len(self)):
+            yield self.frame(k)
+
+    def __getitem__(self, key):
+        """Dict-like access for callers expecting a dict of class video"""
+        if key == "class":
+            return "video"
+        if key == "filename":
+            return self.filename_
+        if key == "frames":
+            return list(self)
+        raise KeyError(key)
+
+    def numBoxes(self):
+        return len(self.boxes_)
+
+    def frame(self, k):
+        """View of frame k"""
+        begin, end = self.offsets_[k], self.offsets_[k + 1]
+        num = int(self.nums_[k])
+        return Frame(self.key_, float(self.timestamps_[k]), self.boxes_[begin:end], self.dco_[begin:end], self.id_codes_[begin:end], self.ids_, num if num >= 0 else None)
+
+    def emptyFrame(self, timestamp=None):
+        """Frame without boxes"""
+        return Frame(self.key_, timestamp, self.boxes_[:0], self.dco_[:0], self.id_codes_[:0], self.ids_)
+
+
+class FrameStoreBuilder:
+    """Incrementally build a FrameStore from frame dicts or box values"""
+
+    def __init__(self, key, filename=None):
+        self.key_ = key
+        self.filename_ = filename
+        self.timestamps_ = []
+        self.nums_ = []
+        self.counts_ = []
+        self.values_ = [] # x, y, width, height per box
+        self.dco_ = []
+        self.id_codes_ = []
+        self.codes_ = {} # id string -> id code
+        self.ids_ = []
+        self.problems_ = [] # (problem, frame index, id or None) of left out boxes
+
+    def idCode(self, id):
+        """Code of id string, new ids get the next code"""
+        code = self.codes_.get(id)
+        if code is None:
+            code = self.codes_[id] = len(self.ids_)
+            self.ids_.append(id)
+        return code
+
+    def addFrame(self, frame):
+        """Add frame dict with boxes as dicts with keys x, y, width, height, id and optionally dco.
+
+        Incomplete boxes, and hypotheses without id, are left out and listed in problems_, see formatchecker.FormatChecker"""
+
+        boxes = frame[self.key_]
+        complete = []
+        for box in boxes:
+            try:
+                values = (box["x"], box["y"], box["width"], box["height"])
+                if self.key_ != "annotations":
+                    box["id"]
+            except KeyError:
+                self.addProblems(box)
+                continue
+            self.values_.append(values)
+            self.dco_.append(box.get("dco", False))
+            complete.append(box)
+        boxes = complete
+
+        # Ground truths without id are considered for evaluation nonetheless
+        if self.key_ == "annotations":
+            self.id_codes_.extend(self.idCode(str(box.get("id", '__missing_id__'))) for box in boxes)
+        else:
+            self.id_codes_.extend(self.idCode(str(box["id"])) for box in boxes)
+
+        self.counts_.append(len(boxes))
+        self.timestamps_.append(frame["timestamp"])
+        self.nums_.append(frame.get("num", -1))
+
+    def addProblems(self, box):
+        """List missing keys of box in problems_"""
+        for key in ("x", "y", "width", "height"):
+            if key not in box:
+                self.problems_.append(("missing " + key, len(self.counts_), box.get("id")))
+        if self.key_ != "annotations" and "id" not in box:
+            self.problems_.append(("missing id", len(self.counts_), None))
+
+    def addBoxes(self, timestamp, values, dco, ids, num=-1):
+        """Add frame from lists of box values (x, y, width, height), dco flags and id strings"""
+
+        self.values_.extend(values)
+        self.dco_.extend(dco)
+        self.id_codes_.extend(self.idCode(id) for id in ids)
+        self.counts_.append(len(ids))
+        self.timestamps_.append(timestamp)
+        self.nums_.append(num)
+
+    def build(self):
+        offsets = numpy.zeros(len(self.counts_) + 1, dtype=numpy.int64)
+        numpy.cumsum(self.counts_, out=offsets[1:])
+        return FrameStore(self.key_, self.timestamps_, offsets, self.values_, self.dco_, self.id_codes_, self.ids_, self.nums_, self.filename_, self.problems_)
+
+
+class Frame:
+    """Boxes of a single frame, as views into the arrays of a FrameStore"""
+
+    def __init__(self, key, timestamp, boxes, dco, id_codes, ids, num=None, problems=()):
+        self.key_ = key
+        self.timestamp_ = timestamp
+        self.boxes_ = boxes
+        self.dco_ = dco
+        self.id_codes_ = id_codes
+        self.ids_ = ids # id string of each id code, shared with FrameStore
+        self.num_ = num
+        self.problems_ = problems # (problem, id or None) of boxes left out while importing
+
+    @staticmethod
+    def fromDict(frame, key):
+        """Create from frame dict. key is "annotations" for ground truth and "hypotheses" for hypotheses."""
+        builder = FrameStoreBuilder(key)
+        builder.addFrame(frame)
+        store = builder.build()
+        result = store.frame(0)
+        result.problems_ = [(problem, id) for problem, k, id in store.problems_]
+        return result
+
+    @staticmethod
+    def fromBoxes(key, timestamp, values, dco, ids, num=None):
+        """Create from lists of box values (x, y, width, height), dco flags and id strings"""
+        ids = list(ids)
+        return Frame(key, timestamp, numpy.asarray(values, dtype=numpy.float64).reshape(-1, 4), numpy.asarray(dco, dtype=bool), numpy.arange(len(ids), dtype=numpy.int32), ids, num)
+
+    @staticmethod
+    def empty(key, timestamp=None):
+        """Frame without boxes"""
+        return Frame.fromBoxes(key, timestamp, [], [], [])
+
+    def __len__(self):
+        """Number of boxes"""
+        return len(self.id_codes_)
+
+    def ids(self):
+        """List of id strings of all boxes"""
+        ids = self.ids_
+        return [ids[c] for c in self.id_codes_.tolist()]
+
+    def box(self, k):
+        """Dict of box k"""
+        return self.makeBox(self.boxes_[k].tolist(), self.ids_[self.id_codes_[k]], bool(self.dco_[k]))
+
+    def boxes(self):
+        """List of dicts of all boxes"""
+        ids = self.ids_
+        boxes = [{"x": x, "y": y, "width": width, "height": height, "id": ids[code]} for (x, y, width, height), code in zip(self.boxes_.tolist(), self.id_codes_.tolist())]
+        if self.key_ == "annotations":
+            for box, dco in zip(boxes, self.dco_.tolist()):
+                box["dco"] = dco
+        return boxes
+
+    def makeBox(self, values, id, dco):
+        x, y, width, height = values
+        box = {
+            "x": x,
+            "y": y,
+            "width": width,
+            "height": height,
+            "id": id,
+        }
+        if self.key_ == "annotations":
+            box["dco"] = dco
+        return box
+
+    def toDict(self):
+        frame = {
+            "class": "frame",
+            "timestamp": self.timestamp_,
+            self.key_: self.boxes(),
+        }
+        if self.num_ is not None:
+            frame["num"] = self.num_
+        return frame
+
+    def __getitem__(self, key):
+        """Dict-like access for callers expecting a frame dict"""
+        if key == "timestamp":
+            return self.timestamp_
+        if key == "class":
+            return "frame"
+        if key == "num" and self.num_ is not None:
+            return self.num_
+        if key == self.key_:
+            return self.boxes()
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        return key in ("timestamp", "class", self.key_) or (key == "num" and self.num_ is not None)
@@ -1,114 +1,409 @@
 #!/usr/bin/env python
 
+import re
+import json
+import time
+import numpy
+from itertools import chain
+from itertools import imap
+from operator import itemgetter
 from collections import deque
+from framestore import FrameStore
+from framestore import Frame
+from framecache import FrameCache
+import logging
+LOG = logging.getLogger(__name__)
 
-def MOT_hypo_import(lines):
-    
-    frames = []
-    
-    for line in lines:
-#        print line
-        s = deque(line.strip().split()) # any whitespace
 
-        # Skip empty lines
-        if len(s) < 1:
+# Version of the parsed representation. Increase, when importers change their results, to invalidate cached imports.
+IMPORTER_VERSION = 1
+
+
+def MOT_hypo_parse_line(line):
+    """Parse one line of hypotheses in MOT text format.
+
+    Returns timestamp, box values (x, y, width, height), dco flags and ids, or None for empty lines."""
+
+    s = deque(line.strip().split()) # any whitespace
+
+    # Skip empty lines
+    if len(s) < 1:
+        return None
+
+    ts = float(s.popleft())
+
+    # each hypothesis takes exactly 5 values
+    assert((len(s)) % 5 == 0)
+    nHypotheses = len(s) / 5
+
+    values = []
+    ids = []
+    for i in range(nHypotheses):
+        x = float(s[5*i + 1])
+        y = float(s[5*i + 2])
+        values.append((
+            x,
+            y,
+            float(s[5*i + 3]) - x, # x - tl_x
+            float(s[5*i + 4]) - y, # y - tl_y
+        ))
+        ids.append(s[5*i + 0])
+
+    return ts, values, [False] * nHypotheses, ids
+
+
+def MOT_groundtruth_parse_line(line):
+    """Parse one line of ground truth in MOT text format.
+
+    Returns timestamp, box values (x, y, width, height), dco flags and ids, or None for empty lines."""
+
+    s = deque(line.strip().split()) # any whitespace
+
+    # Skip empty lines
+    if len(s) < 1:
+        return None
+
+    ts = float(s.popleft())
+
+    # each annotation takes exactly 13 values
+    assert((len(s)) % 13 == 0)
+    nAnnotations = len(s) / 13
+
+    values = []
+    dcos = []
+    ids = []
+    for i in range(nAnnotations):
+        id = s[13*i + 0]
+        cx = float(s[13*i + 3])
+        cy = float(s[13*i + 4])
+        w  = float(s[13*i + 5])
+        h  = float(s[13*i + 6])
+
+        # Ignore annotations with negative center coordinates
+        if cx < 0 and cy < 0:
             continue
-        
-        ts = float(s.popleft())
-        
-        # each hypothesis takes exactly 5 values
-        assert((len(s)) % 5 == 0)
-        nHypotheses = len(s) / 5
-        
-        hypotheses = []
-        
-        for i in range(nHypotheses):
-            hypo = {
-                'id':     s[5*i + 0],
-                'x':      float(s[5*i + 1]),
-                'y':      float(s[5*i + 2]),
-                'width':  float(s[5*i + 3]) - float(s[5*i + 1]), # x - tl_x
-                'height': float(s[5*i + 4]) - float(s[5*i + 2]), # y - tl_y
-            }
-            hypotheses.append(hypo)
-    
-        frameitem = {
-            # no num
-            'class':      'frame',
-            'timestamp':  ts,
-            'hypotheses': hypotheses,
-        }
-        frames.append(frameitem)
-    
-    fileitem = {
-        'class': 'video',
-        'frames': frames,
-    }
-    
-    return fileitem
+
+        # Ground truth is considered a DCO object, if more than two features found
+        # Silly, but thats how the perl script seems to do it
+        nFeaturesGreaterThanZero = 0
+        for j in range(7, 13):
+            if float(s[13*i + j]) >= 0.0:
+                nFeaturesGreaterThanZero += 1
+
+        dco = True
+        if nFeaturesGreaterThanZero >= 2:
+            dco = False
+
+        values.append((cx - w/2, cy - h/2, w, h))
+        dcos.append(dco)
+        ids.append(id)
+
+    return ts, values, dcos, ids
+
+
+def MOT_tokenize(lines):
+    """Split all lines into tokens in one pass.
+
+    Returns list of all tokens, index of the first token and number of tokens of each non-empty line."""
+
+    rows = [line.split() for line in lines] # any whitespace
+    counts = numpy.fromiter((len(row) for row in rows), dtype=numpy.int64, count=len(rows))
+    tokens = list(chain.from_iterable(rows))
+
+    starts = numpy.zeros(len(counts), dtype=numpy.int64)
+    numpy.cumsum(counts[:-1], out=starts[1:])
+
+    # Skip empty lines
+    nonempty = counts > 0
+    return tokens, starts[nonempty], counts[nonempty]
+
+
+def MOT_take(tokens, indices):
+    """List of tokens at array of indices"""
+    indices = indices.ravel().tolist()
+    if len(indices) < 2:
+        return [tokens[i] for i in indices]
+    return list(itemgetter(*indices)(tokens))
+
+
+def MOT_floats(tokens, indices):
+    """Array of float values of tokens at array of indices, converted in one batch"""
+    return numpy.fromiter(imap(float, MOT_take(tokens, indices)), dtype=numpy.float64, count=indices.size).reshape(indices.shape)
+
+
+def MOT_box_tokens(starts, counts, values_per_box):
+    """Frame of each box and index of the first token of each box"""
+
+    # each box takes exactly values_per_box values after the timestamp
+    assert(numpy.all((counts - 1) % values_per_box == 0))
+    boxes_per_frame = (counts - 1) // values_per_box
+
+    frame_of_box = numpy.repeat(numpy.arange(len(counts)), boxes_per_frame)
+    first_box = numpy.cumsum(boxes_per_frame) - boxes_per_frame
+    rank_of_box = numpy.arange(len(frame_of_box)) - first_box[frame_of_box]
+
+    return frame_of_box, starts[frame_of_box] + 1 + values_per_box * rank_of_box
+
+
+def MOT_hypo_bulk_parse(tokens, starts, counts):
+    """Parse tokens of hypotheses in MOT text format. Returns frame of each box, box values, dco flags and ids."""
+
+    frame_of_box, first = MOT_box_tokens(starts, counts, 5)
+    ids = MOT_take(tokens, first)
+    tl_x, tl_y, br_x, br_y = MOT_floats(tokens, first[:, None] + numpy.arange(1, 5)).T
+
+    values = numpy.column_stack((tl_x, tl_y, br_x - tl_x, br_y - tl_y)) # x - tl_x, y - tl_y
+    return frame_of_box, values, numpy.zeros(len(ids), dtype=bool), ids
+
+
+def MOT_groundtruth_bulk_parse(tokens, starts, counts):
+    """Parse tokens of ground truth in MOT text format. Returns frame of each box, box values, dco flags and ids."""
+
+    frame_of_box, first = MOT_box_tokens(starts, counts, 13)
+    cx, cy, w, h = MOT_floats(tokens, first[:, None] + numpy.arange(3, 7)).T
+
+    # Ignore annotations with negative center coordinates
+    keep = numpy.logical_not((cx < 0) & (cy < 0))
+    frame_of_box, first, cx, cy, w, h = frame_of_box[keep], first[keep], cx[keep], cy[keep], w[keep], h[keep]
+
+    # Ground truth is considered a DCO object, unless at least two features found
+    # Silly, but thats how the perl script seems to do it
+    features = MOT_floats(tokens, first[:, None] + numpy.arange(7, 13))
+    dco = (features >= 0.0).sum(axis=1) < 2
+
+    values = numpy.column_stack((cx - w/2, cy - h/2, w, h))
+    return frame_of_box, values, dco, MOT_take(tokens, first)
+
+
+def MOT_import(lines, key, bulk_parse, columnar=False):
+    """Import lines in MOT text format. Returns a dict of class video or a FrameStore, if columnar.
+
+    Tokenizes all lines at once and converts numbers column by column. Logs the parse throughput."""
+
+    start = time.time()
+
+    tokens, starts, counts = MOT_tokenize(lines)
+    timestamps = MOT_floats(tokens, starts)
+    frame_of_box, values, dco, ids = bulk_parse(tokens, starts, counts)
+
+    offsets = numpy.zeros(len(timestamps) + 1, dtype=numpy.int64)
+    numpy.cumsum(numpy.bincount(frame_of_box, minlength=len(timestamps)), out=offsets[1:])
+
+    # Id codes in order of first occurence
+    codes = {}
+    id_codes = [codes.setdefault(id, len(codes)) for id in ids]
+    unique_ids = sorted(codes, key=codes.get)
+
+    store = FrameStore(key, timestamps, offsets, values, dco, id_codes, unique_ids)
+
+    duration = time.time() - start
+    size = sum(len(line) for line in lines)
+    LOG.info("Parsed %d frames, %d boxes, %d bytes in %.3fs (%.1f MB/s, %.0f boxes/s)" % (len(timestamps), len(ids), size, duration, size / 1e6 / max(duration, 1e-9), len(ids) / max(duration, 1e-9)))
+
+    if columnar:
+        return store
+
+    return store.toDict()
 
 
-def MOT_groundtruth_import(lines): # TODO rename, since we do not create json
-    
-    frames = []
-    
+def MOT_hypo_import(lines, columnar=False):
+    """Import hypotheses in MOT text format. Returns a dict of class video or a FrameStore, if columnar."""
+    return MOT_import(lines, "hypotheses", MOT_hypo_bulk_parse, columnar)
+
+
+def MOT_groundtruth_import(lines, columnar=False): # TODO rename, since we do not create json
+    """Import ground truth in MOT text format. Returns a dict of class video or a FrameStore, if columnar."""
+    return MOT_import(lines, "annotations", MOT_groundtruth_bulk_parse, columnar)
+
+
+def CLEAR_3d_bulk_parse(tokens, starts, counts):
+    """Parse tokens of 3D label files of CHIL CLEAR format, see 3d/GroundTruth_A.txt. Returns frame of each point, point values, dco flags and ids.
+
+    Each point is id, x, y and z in mm. Points are stored as boxes with values x, y, z and 0."""
+
+    frame_of_box, first = MOT_box_tokens(starts, counts, 4)
+
+    coordinates = MOT_floats(tokens, first[:, None] + numpy.arange(1, 4))
+    values = numpy.column_stack((coordinates, numpy.zeros(len(first))))
+    return frame_of_box, values, numpy.zeros(len(first), dtype=bool), MOT_take(tokens, first)
+
+
+def CLEAR_3d_import(lines, key, columnar=True):
+    """Import 3D label file lines of CHIL CLEAR format. key is "annotations" for ground truth and "hypotheses" for hypotheses.
+
+    Returns a FrameStore or a dict of class video, if not columnar."""
+    return MOT_import(lines, key, CLEAR_3d_bulk_parse, columnar)
+
+
+def MOT_hypo_frames(lines):
+    """Iterate over hypotheses frames in MOT text format, one line at a time"""
+    for line in lines:
+        parsed = MOT_hypo_parse_line(line)
+        if parsed is not None:
+            yield Frame.fromBoxes("hypotheses", *parsed)
+
+
+def MOT_groundtruth_frames(lines):
+    """Iterate over ground truth frames in MOT text format, one line at a time"""
     for line in lines:
-        s = deque(line.strip().split()) # any whitespace
-        
-        # Skip empty lines
-        if len(s) < 1:
+        parsed = MOT_groundtruth_parse_line(line)
+        if parsed is not None:
+            yield Frame.fromBoxes("annotations", *parsed)
+
+
+def JSON_groundtruth_import(fp, columnar=False):
+    """Import ground truth from json file object, see groundtruth.json. Returns a dict of class video or a FrameStore, if columnar."""
+
+    fileitem = json.load(fp)[0]
+    if columnar:
+        return FrameStore.fromDict(fileitem, "annotations")
+    return fileitem
+
+
+def JSON_hypo_import(fp, columnar=False):
+    """Import hypotheses from json file object, see hypotheses.json. Returns a dict of class video or a FrameStore, if columnar."""
+
+    fileitem = json.load(fp)[0]
+    if columnar:
+        return FrameStore.fromDict(fileitem, "hypotheses")
+    return fileitem
+
+
+def file_format(filename):
+    """Format of file by its name: "json" for .json files, "mot" otherwise"""
+    return "json" if filename.endswith(".json") else "mot"
+
+
+def groundtruth_import(filename, columnar=True, cache_dir=None):
+    """Import ground truth file. Assume MOT format, if non-json.
+
+    With cache_dir, columnar imports are cached there and memory-mapped by later imports of the same file content, see framecache.FrameCache."""
+
+    if cache_dir is not None and columnar:
+        return FrameCache(cache_dir, IMPORTER_VERSION).load(filename, "annotations", file_format(filename), groundtruth_import)
+
+    with open(filename) as fp:
+        if file_format(filename) == "json":
+            return JSON_groundtruth_import(fp, columnar)
+        return MOT_groundtruth_import(fp.readlines(), columnar)
+
+
+def hypo_import(filename, columnar=True, cache_dir=None):
+    """Import hypotheses file. Assume MOT format, if non-json.
+
+    With cache_dir, columnar imports are cached there and memory-mapped by later imports of the same file content, see framecache.FrameCache."""
+
+    if cache_dir is not None and columnar:
+        return FrameCache(cache_dir, IMPORTER_VERSION).load(filename, "hypotheses", file_format(filename), hypo_import)
+
+    with open(filename) as fp:
+        if file_format(filename) == "json":
+            return JSON_hypo_import(fp, columnar)
+        return MOT_hypo_import(fp.readlines(), columnar)
+
+
+def JSON_groundtruth_frames(fp):
+    """Iterate over ground truth frames of json file object, see groundtruth.json. Parses incrementally, one frame at a time."""
+    for frame in JSON_frame_dicts(fp):
+        yield Frame.fromDict(frame, "annotations")
+
+
+def JSON_hypo_frames(fp):
+    """Iterate over hypotheses frames of json file object, see hypotheses.json. Parses incrementally, one frame at a time."""
+    for frame in JSON_frame_dicts(fp):
+        yield Frame.fromDict(frame, "hypotheses")
+
+
+def JSON_frame_dicts(fp, chunk_size=1 << 16):
+    """Iterate over the frame dicts of the first video in json file object.
+
+    Only the frame currently parsed is held in memory, besides one chunk of the file."""
+
+    reader = JSONReader(fp, chunk_size)
+
+    # Find "frames" key of first video
+    depth = 0
+    while True:
+        c = reader.peek()
+        if c is None:
+            raise Exception, "No frames found in json file"
+
+        if c == '"':
+            value = reader.decode() # skip strings as a whole, they may contain brackets
+            if depth == 2 and value == "frames" and reader.peek() == ':':
+                reader.skip()
+                if reader.peek() != '[':
+                    raise Exception, "Frames in json file are not a list"
+                reader.skip()
+                break
             continue
 
-        ts = float(s.popleft())
-        
-        # each annotation takes exactly 13 values
-        assert((len(s)) % 13 == 0)
-        nAnnotations = len(s) / 13
-        
-        annotations = []
-        for i in range(nAnnotations):
-            id = s[13*i + 0]
-            cx = float(s[13*i + 3])
-            cy = float(s[13*i + 4])
-            w  = float(s[13*i + 5])
-            h  = float(s[13*i + 6])
-            
-            # Ignore annotations with negative center coordinates
-            if cx < 0 and cy < 0:
+        if c in "[{":
+            depth += 1
+        elif c in "]}":
+            depth -= 1
+            if depth < 2:
+                raise Exception, "No frames found in json file"
+        reader.skip()
+
+    # Decode one frame at a time
+    while True:
+        c = reader.peek()
+        if c is None:
+            raise Exception, "Unexpected end of json file"
+        if c == ']':
+            return
+        if c == ',':
+            reader.skip()
+            continue
+        yield reader.decode()
+
+
+class JSONReader:
+    """Read json values one at a time from a file object, holding only a chunk of the file in memory"""
+
+    WHITESPACE = re.compile(r'\s*')
+
+    def __init__(self, fp, chunk_size):
+        self.fp_ = fp
+        self.chunk_size_ = chunk_size
+        self.decoder_ = json.JSONDecoder()
+        self.buffer_ = ""
+        self.pos_ = 0
+
+    def fill(self):
+        """Drop consumed data and read next chunk. False at end of file."""
+        chunk = self.fp_.read(self.chunk_size_)
+        self.buffer_ = self.buffer_[self.pos_:] + chunk
+        self.pos_ = 0
+        return len(chunk) > 0
+
+    def peek(self):
+        """Next non-whitespace character, None at end of file"""
+        while True:
+            self.pos_ = self.WHITESPACE.match(self.buffer_, self.pos_).end()
+            if self.pos_ < len(self.buffer_):
+                return self.buffer_[self.pos_]
+            if not self.fill():
+                return None
+
+    def skip(self):
+        """Skip next character"""
+        self.pos_ += 1
+
+    def decode(self):
+        """Decode next json value"""
+        while True:
+            try:
+                value, end = self.decoder_.raw_decode(self.buffer_, self.pos_)
+            except ValueError:
+                if not self.fill():
+                    raise
                 continue
-            
-            # Ground truth is considered a DCO object, if more than two features found
-            # Silly, but thats how the perl script seems to do it
-            nFeaturesGreaterThanZero = 0
-            for j in range(7, 13):
-                if float(s[13*i + j]) >= 0.0:
-                    nFeaturesGreaterThanZero += 1
-            
-            dco = True
-            if nFeaturesGreaterThanZero >= 2:
-                dco = False
-            
-            annotation = {
-                'id':     id,
-                'x':      cx - w/2,
-                'y':      cy - h/2,
-                'width':  w,
-                'height': h,
-                'dco':    dco,                  
-            }
-            annotations.append(annotation)
-        
-        frameitem = {
-            # no num
-            'class': 'frame',
-            'timestamp': ts,
-            'annotations': annotations
-        }
-        frames.append(frameitem)
-        
-    fileitem = {
-        'class': 'video',
-        'frames': frames,
-    }
-    
-    return fileitem
+
+            # Numbers at the end of the buffer may continue in the next chunk
+            if end == len(self.buffer_) and self.fill():
+                continue
+
+            self.pos_ = end
+            return value
@@ -0,0 +1,182 @@
+#!/usr/bin/env python
+
+import numpy
+from rect import overlap_matrix
+from rect import overlap_pairs
+from rect import DENSE_PAIRS
+
+
+class CostKernel:
+    """Measure of ground truths and hypotheses, which decides which pairs may correspond and what their assignment costs.
+
+    Values are computed for all G ground truths and H hypotheses of a frame in one call, from arrays of box values (G, 4) and (H, 4).
+    Subclasses implement matrix, qualifies and costs. See MOTEvaluation.setCostKernel"""
+
+    default_threshold = None
+
+    missing = 0.0
+    """Value of pairs not returned by pairs"""
+
+    def matrix(self, a, b):
+        """Values of all pairs of a and b as array of shape (G, H)"""
+        raise NotImplementedError
+
+    def qualifies(self, values, threshold):
+        """Check, if pairs with values may correspond. Works on single values and arrays."""
+        raise NotImplementedError
+
+    def costs(self, values):
+        """Assignment costs of pairs with values, lower is better"""
+        raise NotImplementedError
+
+    def pairs(self, a, b, threshold=None):
+        """Arrays of rows, columns and values of the pairs of a and b, which may qualify for threshold (default: any threshold), sorted by row and column.
+
+        Pairs not listed have value missing, and do not qualify for threshold."""
+        values = self.matrix(a, b)
+        rows, columns = numpy.indices(values.shape)
+        rows, columns, values = rows.ravel(), columns.ravel(), values.ravel()
+        if threshold is not None:
+            return self.candidates(a, b, (rows, columns, values), threshold)
+        return rows, columns, values
+
+    def candidates(self, a, b, pairs, threshold):
+        """Arrays of rows, columns and values of pairs (as returned by pairs), which qualify for threshold"""
+        rows, columns, values = pairs
+        selected = self.qualifies(values, threshold)
+        return rows[selected], columns[selected], values[selected]
+
+    def loosest(self, thresholds):
+        """Threshold of thresholds, for which the most pairs qualify, see pairs"""
+        return None
+
+
+class IoUKernel(CostKernel):
+    """Intersection over union of bounding boxes. Pairs correspond with overlap >= threshold, cost is inverse overlap."""
+
+    default_threshold = 0.2
+
+    def matrix(self, a, b):
+        return overlap_matrix(a, b)
+
+    def qualifies(self, overlaps, threshold):
+        return overlaps >= threshold
+
+    def costs(self, overlaps):
+        return 1.0 / overlaps
+
+    def pairs(self, a, b, threshold=None):
+        """Overlapping pairs only, see rect.overlap_pairs. Pairs without overlap are handled by candidates."""
+        return overlap_pairs(a, b)
+
+    def loosest(self, thresholds):
+        return min(thresholds)
+
+    def candidates(self, a, b, pairs, threshold):
+        if threshold > 0:
+            return CostKernel.candidates(self, a, b, pairs, threshold)
+
+        # Pairs without overlap qualify, too
+        overlaps = overlap_matrix(a, b)
+        rows, columns = numpy.nonzero(overlaps >= threshold)
+        return rows, columns, overlaps[rows, columns]
+
+
+class DistanceKernel(CostKernel):
+    """Euclidean distance of points. Pairs correspond with distance <= threshold, cost is the distance."""
+
+    missing = numpy.inf
+
+    def points(self, boxes):
+        """Array of points of box values"""
+        raise NotImplementedError
+
+    def matrix(self, a, b):
+        differences = self.points(a)[:, None, :] - self.points(b)[None, :, :]
+        return numpy.sqrt((differences ** 2).sum(axis=2))
+
+    def qualifies(self, distances, threshold):
+        return distances <= threshold
+
+    def costs(self, distances):
+        return distances
+
+    def distances(self, a, b, rows, columns):
+        """Distances of the pairs rows, columns of a and b, bit-identical to matrix"""
+        differences = self.points(a)[rows] - self.points(b)[columns]
+        return numpy.sqrt((differences ** 2).sum(axis=1))
+
+    def pairs(self, a, b, threshold=None):
+        """Pairs within distance threshold only, found by sort and sweep in dense frames, see nearby_pairs"""
+        if threshold is None or len(a) * len(b) <= DENSE_PAIRS:
+            return CostKernel.pairs(self, a, b, threshold)
+
+        rows, columns = nearby_pairs(self.points(a), self.points(b), threshold)
+
+        # Sort by row and column
+        order = numpy.argsort(rows * len(b) + columns, kind="mergesort")
+        rows, columns = rows[order], columns[order]
+
+        distances = self.distances(a, b, rows, columns)
+        selected = distances <= threshold
+        return rows[selected], columns[selected], distances[selected]
+
+    def loosest(self, thresholds):
+        return max(thresholds)
+
+
+class CentroidDistanceKernel(DistanceKernel):
+    """Distance of the centres of bounding boxes, e.g. in pixels"""
+
+    def points(self, boxes):
+        return boxes[:, :2] + boxes[:, 2:] / 2
+
+
+class PointDistanceKernel(DistanceKernel):
+    """Distance of points stored as box values x, y, z, see importers.CLEAR_3d_import.
+
+    With dimensions 2, the distance is measured on the floor plane (x and y)."""
+
+    default_threshold = 500.0 # mm
+
+    def __init__(self, dimensions=3):
+        self.dimensions_ = dimensions
+
+    def points(self, boxes):
+        return boxes[:, :self.dimensions_]
+
+
+def nearby_pairs(a, b, distance):
+    """Superset of all pairs of points in arrays a (G, D) and b (H, D), whose first coordinates differ by at most distance, as arrays of rows and columns.
+
+    Sort and sweep like rect.intersecting_pairs: points b are sorted by their first coordinate, the range of each point of a is found by binary search."""
+
+    if len(a) == 0 or len(b) == 0:
+        return numpy.zeros(0, dtype=numpy.int64), numpy.zeros(0, dtype=numpy.int64)
+
+    order = numpy.argsort(b[:, 0], kind="mergesort")
+    sorted_x = b[order, 0]
+    ax = a[:, 0]
+
+    # Bounds with some slack for rounding, the exact test is done on the pairs
+    lower = ax - distance
+    lower -= 1e-9 * (numpy.abs(lower) + 1.0)
+    upper = ax + distance
+    upper += 1e-9 * (numpy.abs(upper) + 1.0)
+    begin = numpy.searchsorted(sorted_x, lower, side="left")
+    end = numpy.searchsorted(sorted_x, upper, side="right")
+    counts = numpy.maximum(end - begin, 0)
+
+    # Expand ranges begin..end of each row
+    rows = numpy.repeat(numpy.arange(len(a)), counts)
+    starts = numpy.cumsum(counts) - counts
+    positions = numpy.arange(counts.sum()) - numpy.repeat(starts - begin, counts)
+    return rows, order[positions]
+
+
+# Kernels by name, e.g. for command line options
+KERNELS = {
+    "iou": IoUKernel,
+    "centroid": CentroidDistanceKernel,
+    "point": PointDistanceKernel,
+}
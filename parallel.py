@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+
+from multiprocessing import Pool
+from timestampindex import TimestampIndex
+from framestore import Frame
+from kernels import IoUKernel
+
+
+# Ground truth and hypotheses FrameStores, sync delta, cost kernel and threshold of the evaluation, set in pool processes by shareFrameStores
+shared = None
+
+
+def shareFrameStores(groundtruth, hypotheses, sync_delta, kernel, threshold=None):
+    """Pool initializer. With fork, the FrameStores are inherited instead of being pickled."""
+    global shared
+    shared = (groundtruth, hypotheses, TimestampIndex(hypotheses.timestamps_.tolist()), sync_delta, kernel, threshold)
+
+
+def frameChunkGeometry(bounds):
+    """Matching hypotheses frames and geometry of ground truth frames begin..end-1, given as tuple bounds.
+
+    Returns list of (positions of hypotheses frames, pymot.FrameGeometry) per frame. Geometries are returned without their frames,
+    see FrameGeometry.attachFrames. Module level function, so it can be run by pool processes."""
+
+    from pymot import FrameGeometry # pymot imports this module
+
+    groundtruth, hypotheses, index, sync_delta, kernel, threshold = shared
+    begin, end = bounds
+
+    chunk = []
+    for k in range(begin, end):
+        frame = groundtruth.frame(k)
+        positions = index.find(frame.timestamp_, sync_delta)
+        if len(positions) > 1:
+            geometry = None # ambiguous hypotheses frame, raised by the sequential pass
+        else:
+            hypotheses_frame = hypotheses.frame(positions[0]) if positions else Frame.empty("hypotheses")
+            geometry = FrameGeometry(frame, hypotheses_frame, None, None, kernel, threshold)
+        chunk.append((positions, geometry))
+    return chunk
+
+
+# Evaluation, whose frames are evaluated in shards, set in pool processes by shareEvaluation
+shared_evaluation = None
+
+
+def shareEvaluation(evaluation):
+    """Pool initializer. With fork, the evaluation and its FrameStores are inherited instead of being pickled."""
+    global shared_evaluation
+    shared_evaluation = evaluation
+
+
+def evaluateShard(bounds):
+    """Evaluate frames begin..end-1 of the shared evaluation from an empty mapping, given as tuple bounds.
+
+    Returns dict of counters, mapping, yin-yang maps, track ids, unresolved lookups of the yin-yang maps and statistics of each frame. Module level function, so it can be run by pool processes."""
+
+    evaluation = shared_evaluation.fork()
+    evaluation.unresolved_ = []
+    evaluation.evaluateRange(*bounds)
+
+    return {
+        "counters": dict((attribute, getattr(evaluation, attribute)) for name, attribute in evaluation.FRAME_COUNTERS),
+        "mappings": evaluation.mappings_,
+        "gt_map": evaluation.gt_map_,
+        "hypo_map": evaluation.hypo_map_,
+        "groundtruth_ids": evaluation.groundtruth_ids_,
+        "hypothesis_ids": evaluation.hypothesis_ids_,
+        "unresolved": evaluation.unresolved_,
+        "begin": bounds[0],
+        "frame statistics": evaluation.frame_statistics_,
+    }
+
+
+class ShardPool:
+    """Pool of processes, which evaluate shards of frames speculatively, while the calling process continues"""
+
+    def __init__(self, evaluation, bounds, processes=None):
+        """Constructor from evaluation and list of (begin, end) of the shards. processes defaults to the number of cores.
+
+        All shards are submitted at once, the pool processes start from the state of evaluation at this point."""
+        self.pool_ = Pool(processes, shareEvaluation, (evaluation,))
+        self.results_ = self.pool_.imap(evaluateShard, bounds, chunksize=1)
+
+    def __iter__(self):
+        """Iterate over the results of the shards in order, see evaluateShard"""
+        return self.results_
+
+    def close(self):
+        """Stop processes, also if shards are left"""
+        self.pool_.terminate()
+        self.pool_.join()
+
+
+class FrameGeometryPool:
+    """Pool of processes, which compute frame matching and overlaps of chunks of frames ahead of the sequential evaluation"""
+
+    def __init__(self, groundtruth, hypotheses, sync_delta, processes=None, chunk_size=256, kernel=None, threshold=None):
+        """Constructor from ground truth and hypotheses FrameStores. processes defaults to the number of cores, kernel to IoU of boxes.
+        Only pairs, which may qualify for threshold (default: any threshold), are computed."""
+        if kernel is None:
+            kernel = IoUKernel()
+        self.groundtruth_ = groundtruth
+        self.chunk_size_ = chunk_size
+        self.pool_ = Pool(processes, shareFrameStores, (groundtruth, hypotheses, sync_delta, kernel, threshold))
+
+    def __iter__(self):
+        """Iterate over (positions of hypotheses frames, FrameGeometry without frames) of all ground truth frames in order"""
+        frames = len(self.groundtruth_)
+        chunks = [(begin, min(begin + self.chunk_size_, frames)) for begin in range(0, frames, self.chunk_size_)]
+        for chunk in self.pool_.imap(frameChunkGeometry, chunks):
+            for item in chunk:
+                yield item
+
+    def close(self):
+        """Stop processes, also if frames are left"""
+        self.pool_.terminate()
+        self.pool_.join()
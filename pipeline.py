@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+
+import sys
+import threading
+from Queue import Queue
+from importers import groundtruth_import
+from importers import hypo_import
+from importers import MOT_groundtruth_frames
+from importers import MOT_hypo_frames
+from importers import JSON_groundtruth_frames
+from importers import JSON_hypo_frames
+
+
+def prefetch(iterable, queue_size=16, batch_size=64):
+    """Iterate over iterable on a background thread, handing over items in batches through a bounded queue.
+
+    The thread runs at most queue_size batches ahead of the consumer. Exceptions are raised in the consumer."""
+
+    queue = Queue(queue_size)
+    done = object()
+
+    def produce():
+        try:
+            batch = []
+            for item in iterable:
+                batch.append(item)
+                if len(batch) >= batch_size:
+                    queue.put((batch, None))
+                    batch = []
+            queue.put((batch, None))
+            queue.put((done, None))
+        except:
+            queue.put((None, sys.exc_info()))
+
+    thread = threading.Thread(target=produce)
+    thread.daemon = True # do not wait for producers, if the consumer stops early
+    thread.start()
+
+    while True:
+        batch, error = queue.get()
+        if error is not None:
+            raise error[0], error[1], error[2]
+        if batch is done:
+            break
+        for item in batch:
+            yield item
+
+
+def readFrames(filename, frames):
+    """Iterate over frames of file, parsed by frames(file object). Closes the file at the end."""
+    with open(filename) as fp:
+        for frame in frames(fp):
+            yield frame
+
+
+def loadFiles(groundtruth_file, hypotheses_file, cache_dir=None):
+    """Import ground truth and hypotheses files concurrently. Returns FrameStores of both, see importers.groundtruth_import"""
+
+    results = {}
+
+    def load(key, function, filename):
+        try:
+            results[key] = function(filename, True, cache_dir)
+        except:
+            results[key + " error"] = sys.exc_info()
+
+    threads = [
+        threading.Thread(target=load, args=("groundtruth", groundtruth_import, groundtruth_file)),
+        threading.Thread(target=load, args=("hypotheses", hypo_import, hypotheses_file)),
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for key in ("groundtruth error", "hypotheses error"):
+        if key in results:
+            error = results[key]
+            raise error[0], error[1], error[2]
+
+    return results["groundtruth"], results["hypotheses"]
+
+
+def streamFiles(groundtruth_file, hypotheses_file, format_checker=None, queue_size=16):
+    """Iterables of ground truth and hypotheses frames of chronologically ordered files.
+
+    Both files are read and parsed on background threads, while the frames read so far are consumed, e.g. by MOTEvaluation.evaluate.
+    With format_checker (formatchecker.FormatChecker), frames are checked on the background threads, too."""
+
+    groundtruth = readFrames(groundtruth_file, JSON_groundtruth_frames if groundtruth_file.endswith(".json") else MOT_groundtruth_frames)
+    hypotheses = readFrames(hypotheses_file, JSON_hypo_frames if hypotheses_file.endswith(".json") else MOT_hypo_frames)
+    if format_checker is not None:
+        groundtruth = format_checker.checkedFrames(groundtruth, "annotations")
+        hypotheses = format_checker.checkedFrames(hypotheses, "hypotheses")
+    return prefetch(groundtruth, queue_size), prefetch(hypotheses, queue_size)
+
+
+def evaluateFiles(groundtruth_file, hypotheses_file, stream=False, cache_dir=None, solver="auto"):
+    """Evaluate hypotheses file against ground truth file. Returns the MOTEvaluation.
+
+    Both files are loaded concurrently. With stream, frames are evaluated while later frames are still read and parsed."""
+
+    if stream:
+        groundtruth, hypotheses = streamFiles(groundtruth_file, hypotheses_file)
+    else:
+        groundtruth, hypotheses = loadFiles(groundtruth_file, hypotheses_file, cache_dir)
+
+    # Imported here, since pymot imports this module for its command line
+    from pymot import MOTEvaluation
+    evaluator = MOTEvaluation(groundtruth, hypotheses, solver)
+    evaluator.evaluate()
+    return evaluator
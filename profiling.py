@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+
+import time
+
+
+# Phases of an evaluation, in order of execution per frame
+PHASES = [
+    "frame matching",
+    "overlaps",
+    "step 1",
+    "step 2",
+    "assignment",
+    "step 3",
+    "step 4",
+]
+
+
+class EvaluationProfile:
+    """Wall time per phase, candidate counts per frame and sizes of assignment matrices of an evaluation.
+
+    See MOTEvaluation.enableProfiling"""
+
+    def __init__(self):
+        self.seconds_ = dict((phase, 0.0) for phase in PHASES)
+        self.calls_ = dict((phase, 0) for phase in PHASES)
+        self.candidates_ = [] # number of candidate pairs per evaluated frame
+        self.matrix_sizes_ = {} # (rows, columns) of solved assignment components -> count
+        self.component_shapes_ = [] # shapes of components of the current frame, filled by assignment.solve_pairs
+
+    def call(self, phase, function, *args):
+        """Call function with args and add its wall time to phase"""
+        start = time.time()
+        result = function(*args)
+        self.seconds_[phase] += time.time() - start
+        self.calls_[phase] += 1
+        return result
+
+    def iterate(self, phase, iterable):
+        """Iterate over iterable, adding the time for getting each item to phase"""
+        iterator = iter(iterable)
+        while True:
+            start = time.time()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.seconds_[phase] += time.time() - start
+                return
+            self.seconds_[phase] += time.time() - start
+            self.calls_[phase] += 1
+            yield item
+
+    def addCandidates(self, count):
+        self.candidates_.append(count)
+
+    def addComponentShapes(self):
+        """Count shapes of components collected for the current frame"""
+        for shape in self.component_shapes_:
+            self.matrix_sizes_[shape] = self.matrix_sizes_.get(shape, 0) + 1
+        del self.component_shapes_[:]
+
+    def getProfile(self):
+        """Dict of seconds and calls per phase, candidate counts per frame and histogram of assignment matrix sizes"""
+
+        candidates = self.candidates_
+        return {
+            "seconds": dict(self.seconds_),
+            "calls": dict(self.calls_),
+            "candidates per frame": list(candidates),
+            "candidates": {
+                "frames": len(candidates),
+                "total": sum(candidates),
+                "max": max(candidates) if candidates else 0,
+                "mean": float(sum(candidates)) / len(candidates) if candidates else 0.0,
+            },
+            # json compatible keys "rowsxcolumns"
+            "assignment matrix sizes": dict(("%dx%d" % shape, count) for shape, count in self.matrix_sizes_.items()),
+        }
+
+    def printProfile(self, fp):
+        """Print table of phases and histogram of assignment matrix sizes"""
+
+        total = sum(self.seconds_.values())
+        fp.write("Phase                 Seconds     Share    Calls\n")
+        for phase in PHASES:
+            share = self.seconds_[phase] / total if total > 0 else 0.0
+            fp.write("%-18s %10.4f %8.1f%% %8d\n" % (phase, self.seconds_[phase], 100 * share, self.calls_[phase]))
+
+        profile = self.getProfile()
+        fp.write("Candidates per frame: total %(total)d, max %(max)d, mean %(mean).2f\n" % profile["candidates"])
+        fp.write("Assignment matrix sizes (rows x columns: count)\n")
+        for shape, count in sorted(self.matrix_sizes_.items()):
+            fp.write("    %dx%d: %d\n" % (shape[0], shape[1], count))
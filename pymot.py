@@ -1,73 +1,264 @@
 #!/usr/bin/env python2
 
 import sys
+import copy
 import json
 import argparse
-from munkres import Munkres
-from rect import Rect
-from importers import MOT_hypo_import
-from importers import MOT_groundtruth_import
+from array import array
+from itertools import izip
+import numpy
+from kernels import IoUKernel
+from kernels import KERNELS
+from framestore import FrameStore
+from framestore import Frame
+from framecache import default_cache_dir
 from formatchecker import FormatChecker
+from assignment import make_solver
+from assignment import solve_pairs
+from timestampindex import TimestampIndex
+from timestampindex import SyncWindow
+from tracing import TraceMultiplexer
+from tracing import DiffLogSink
+from visualdebug import VisualDebugCollector
+from visualdebug import VisualDebugWriter
+from profiling import EvaluationProfile
+from bootstrap import FRAME_STATISTICS
+from bootstrap import bootstrapIntervals
+from parallel import FrameGeometryPool
+from parallel import ShardPool
+from pipeline import loadFiles
+from pipeline import streamFiles
+from multiprocessing import cpu_count
 from utilities import write_stderr_red
 import logging
 LOG = logging.getLogger(__name__)
 
 
+# Default cost kernel
+IOU = IoUKernel()
+
+
+class FrameGeometry:
+    """Data of a pair of ground truth and hypotheses frames, which does not depend on the evaluation state"""
+
+    def __init__(self, groundtruths, hypotheses, groundtruth_geometry=None, pairs=None, kernel=None, threshold=None):
+        """Constructor from ground truth and hypotheses framestore.Frame.
+
+        The ground truth data of groundtruth_geometry, a FrameGeometry of the same ground truth frame, is reused if given.
+        kernel is the kernels.CostKernel of the pairs (default: IoU of boxes). Only pairs, which may qualify for threshold (default: any threshold), are kept.
+        pairs are the pairs of boxes as returned by the pairs method of the kernel, if already computed."""
+
+        if kernel is None:
+            kernel = IOU
+        self.kernel_ = kernel
+
+        self.timestamp_ = groundtruths.timestamp_
+        self.groundtruths_ = groundtruths
+        self.hypotheses_ = hypotheses
+        self.hypo_ids_ = hypotheses.ids()
+
+        if groundtruth_geometry is not None:
+            self.gt_ids_ = groundtruth_geometry.gt_ids_
+            self.gt_dco_ = groundtruth_geometry.gt_dco_
+            self.gt_indices_of_ = groundtruth_geometry.gt_indices_of_
+            self.dco_count_of_ = groundtruth_geometry.dco_count_of_
+        else:
+            self.gt_ids_ = groundtruths.ids()
+            self.gt_dco_ = groundtruths.dco_.tolist()
+
+            # Indexes of boxes by id, and number of DCO ground truths by id
+            self.gt_indices_of_ = {}
+            self.dco_count_of_ = {}
+            for i, gt_id in enumerate(self.gt_ids_):
+                self.gt_indices_of_.setdefault(gt_id, []).append(i)
+                if self.gt_dco_[i]:
+                    self.dco_count_of_[gt_id] = self.dco_count_of_.get(gt_id, 0) + 1
+
+        self.hypo_indices_of_ = {}
+        for j, hypo_id in enumerate(self.hypo_ids_):
+            self.hypo_indices_of_.setdefault(hypo_id, []).append(j)
+
+        # Pairs of ground truths and hypotheses with their kernel values (e.g. overlaps), used by both paper step 1 and step 2.
+        # For IoU, only boxes which intersect are listed, for distances only points within threshold, found by sort and sweep in dense frames.
+        self.shape_ = (len(self.gt_ids_), len(self.hypo_ids_))
+        if pairs is None:
+            pairs = kernel.pairs(groundtruths.boxes_, hypotheses.boxes_, threshold)
+        self.overlap_rows_, self.overlap_columns_, self.overlap_values_ = pairs
+
+        # Pairs are sorted by row and column, so their keys are sorted for binary search
+        self.overlap_keys_ = self.overlap_rows_ * self.shape_[1] + self.overlap_columns_
+
+
+    def __getstate__(self):
+        """Pickle without the frames, whose ids list all ids of their FrameStore. See attachFrames"""
+        state = self.__dict__.copy()
+        del state["groundtruths_"], state["hypotheses_"]
+        return state
+
+
+    def attachFrames(self, groundtruths, hypotheses):
+        """Attach the frames of an unpickled geometry"""
+        self.groundtruths_ = groundtruths
+        self.hypotheses_ = hypotheses
+
+
+    def overlaps(self, gt_indices, hypo_indices):
+        """Overlaps (kernel values) of ground truths and hypotheses given by lists of indices, as list"""
+
+        if len(self.overlap_keys_) == 0:
+            return [self.kernel_.missing] * len(gt_indices)
+        keys = numpy.array(gt_indices, dtype=numpy.int64) * self.shape_[1] + numpy.array(hypo_indices, dtype=numpy.int64)
+        positions = numpy.minimum(numpy.searchsorted(self.overlap_keys_, keys), len(self.overlap_keys_) - 1)
+        found = self.overlap_keys_[positions] == keys
+        return numpy.where(found, self.overlap_values_[positions], self.kernel_.missing).tolist()
+
+
+    def pairs(self, overlap_threshold):
+        """Arrays of rows, columns and overlaps of all pairs of ground truths and hypotheses, which qualify for overlap_threshold, sorted by row and column"""
+        return self.kernel_.candidates(self.groundtruths_.boxes_, self.hypotheses_.boxes_, (self.overlap_rows_, self.overlap_columns_, self.overlap_values_), overlap_threshold)
+
+
+class FrameResult:
+    """Correspondences of a frame and classes of its boxes for visual debugging"""
+
+    def __init__(self, geometry):
+        self.correspondences_ = {} # truth id -> hypothesis id
+        self.gt_classes_ = ["unevaluated"] * len(geometry.gt_ids_)
+        self.hypo_classes_ = ["unevaluated"] * len(geometry.hypo_ids_)
+        self.annotations_ = [] # list of (type, index) for visual debugging
+
+
 class MOTEvaluation:
 
-    def __init__(self, groundtruth, hypotheses):
-        """Constructor """
+    # Absolute statistics, which are counted per frame, and their attributes
+    FRAME_COUNTERS = [
+        ("ground truths", "total_groundtruths_"),
+        ("false positives", "false_positives_"),
+        ("misses", "misses_"),
+        ("mismatches", "mismatches_"),
+        ("recoverable mismatches", "recoverable_mismatches_"),
+        ("non-recoverable mismatches", "non_recoverable_mismatches_"),
+        ("correspondences", "total_correspondences_"),
+        ("total overlap", "total_overlap_"),
+    ]
+
+
+    def __init__(self, groundtruth=None, hypotheses=None, solver="auto"):
+        """Constructor. See assignment.make_solver for available assignment solvers.
+
+        Without ground truth and hypotheses, frames are evaluated online as they are passed to push."""
         
+        self.kernel_ = IOU
+        """Cost kernel, which decides which pairs of ground truths and hypotheses may correspond and what their assignment costs. See setCostKernel"""
+
         self.overlap_threshold_ = 0.2
-        """Bounding box overlap threshold"""
+        """Bounding box overlap threshold. Threshold of the kernel values for other kernels, e.g. maximum distance"""
     
-        self.munkres_inf_ = sys.maxsize
-        """Not quite infinite number for Munkres algorithm"""
+        self.solver_ = make_solver(solver)
+        """Solver for the assignment of ground truths to hypotheses"""
     
         self.sync_delta_ = 0.001
         """Maximum offset considered for a match of hypothesis and ground truth"""
 
         self.groundtruth_ = groundtruth
-        """Groundtruth. See groundtruth.json for a sample file"""
-        
-        if self.groundtruth_["class"] != "video":
-            raise Exception, "Ground truth is not of class \"video\""
+        """Groundtruth. Dict (see groundtruth.json for a sample file), framestore.FrameStore, iterable of chronologically ordered frames or None"""
         
         self.hypotheses_ = hypotheses
-        """Hypotheses. See hypotheses.json for a sample file"""
-        
-        if self.hypotheses_["class"] != "video":
-            raise Exception, "Hypotheses is not of class \"video\""
+        """Hypotheses. Dict (see hypotheses.json for a sample file), framestore.FrameStore, iterable of chronologically ordered frames or None"""
 
-        self.convertIDsToString()
+        # Store dicts in columnar format, keep iterables of frames as streams
+        if isinstance(self.groundtruth_, dict):
+            if self.groundtruth_["class"] != "video":
+                raise Exception, "Ground truth is not of class \"video\""
+            self.groundtruth_ = FrameStore.fromDict(self.groundtruth_, "annotations")
+
+        if isinstance(self.hypotheses_, dict):
+            if self.hypotheses_["class"] != "video":
+                raise Exception, "Hypotheses is not of class \"video\""
+            self.hypotheses_ = FrameStore.fromDict(self.hypotheses_, "hypotheses")
 
         self.resetStatistics()
 
-        # Set class and type for hypos and ground truths
-        for f in self.hypotheses_["frames"]:
-            for h in f["hypotheses"]:
-                h["type"] = "hypothesis"
-                h["class"] = "unevaluated"
+        # Timestamp index over stored hypotheses frames, or sync window over streamed hypotheses frames
+        if isinstance(self.hypotheses_, FrameStore):
+            self.hypotheses_index_ = TimestampIndex(self.hypotheses_.timestamps_.tolist())
+            self.hypotheses_window_ = None
+        elif self.hypotheses_ is None:
+            self.hypotheses_index_ = None
+            self.hypotheses_window_ = None
+        else:
+            self.hypotheses_index_ = None
+            self.hypotheses_window_ = SyncWindow(self.hypotheses_)
 
-        for f in self.groundtruth_["frames"]:
-            for g in f["annotations"]:
-                g["type"] = "groundtruth"
-                g["class"] = "unevaluated"
-            
-        # List of dicts, containing ground truths and hypotheses for visual debugging
-        self.visualDebugFrames_ = []
+        # Sink of trace events, see addTraceSink
+        self.trace_ = None
 
+        # Receiver of dicts, containing ground truths and hypotheses for visual debugging. Off unless enabled, see enableVisualDebug
+        self.visual_debug_ = None
+
+        # Per phase timings and counters. Off unless enabled, see enableProfiling
+        self.profile_ = None
+
+        # Lookups of the yin-yang maps, which found no entry, while evaluating a shard speculatively, see evaluateSharded
+        self.unresolved_ = None
+        self.frame_index_ = None
+
+
+    def setCostKernel(self, kernel, threshold=None):
+        """Match ground truths and hypotheses by kernel (kernels.CostKernel) with threshold (default: default threshold of kernel)"""
+
+        if threshold is None:
+            threshold = kernel.default_threshold
+        if threshold is None:
+            raise Exception, "No threshold given for cost kernel %s" % kernel.__class__.__name__
+        self.kernel_ = kernel
+        self.overlap_threshold_ = threshold
+
+
+    def makeGeometry(self, groundtruths, hypotheses, groundtruth_geometry=None, pairs=None, threshold=None):
+        """FrameGeometry of ground truth and hypotheses frame with the cost kernel of this evaluation, for threshold (default: overlap threshold)"""
+        if threshold is None:
+            threshold = self.overlap_threshold_
+        return FrameGeometry(groundtruths, hypotheses, groundtruth_geometry, pairs, self.kernel_, threshold)
+
+
+    def enableProfiling(self):
+        """Accumulate wall time per phase, candidate counts per frame and sizes of assignment matrices, see getProfile"""
+        self.profile_ = EvaluationProfile()
 
-    def get_hypotheses_frame(self, timestamp):
-        """Get list of hypotheses occuring chronologically close to ground truth timestamp, but at most with time difference self.sync_delta"""
-        
-        # Helper function for filter()
-        def hypothesis_frame_chronologically_close(hypothesis):
-            return abs(hypothesis["timestamp"] - timestamp) < self.sync_delta_
+
+    def enableVisualDebug(self, sink=None):
+        """Enable visual debug output of each frame, either to sink (e.g. visualdebug.VisualDebugWriter) or collected for getVisualDebug"""
+        if sink is None:
+            sink = VisualDebugCollector()
+        self.visual_debug_ = sink
+
+
+    def addTraceSink(self, sink):
+        """Attach a sink of evaluation events, see tracing.TraceSink"""
+        if self.trace_ is None:
+            self.trace_ = sink
+        elif isinstance(self.trace_, TraceMultiplexer):
+            self.trace_.sinks_.append(sink)
+        else:
+            self.trace_ = TraceMultiplexer([self.trace_, sink])
+
+
+    def get_hypotheses_frame(self, timestamp, merge_join=False):
+        """Get list of hypotheses occuring chronologically close to ground truth timestamp, but at most with time difference self.sync_delta
+
+        Use merge_join for chronologically ordered calls, e.g. when iterating over sorted ground truth frames."""
+
+        if self.hypotheses_ is None:
+            raise Exception, "No hypotheses to look up frames in. Pass hypotheses frames to push or evaluateFrame."
 
         # Hypotheses frames which are chronologically close to timestamp 
-        # Use binary search, if this is to slow for you :)P
-        hypotheses_frames = filter(hypothesis_frame_chronologically_close, self.hypotheses_["frames"])
+        if self.hypotheses_window_ is not None:
+            hypotheses_frames = self.hypotheses_window_.find(timestamp, self.sync_delta_)
+        elif merge_join:
+            hypotheses_frames = self.hypotheses_index_.seek(timestamp, self.sync_delta_)
+        else:
+            hypotheses_frames = self.hypotheses_index_.find(timestamp, self.sync_delta_)
         
         # We expect at most one hypotheses timestamp.
         if len(hypotheses_frames) > 1:
@@ -75,155 +266,439 @@ class MOTEvaluation:
 
         if len(hypotheses_frames) == 0:
 #            write_stderr_red("Warning:", "No hypothesis timestamp found for timestamp %f with sync delta %f" % (timestamp, self.sync_delta_))
-            return {"hypotheses": []} # empty list of hypos
+            return Frame.empty("hypotheses") # empty list of hypos
         
-        return hypotheses_frames[0] # return first and only element of list
+        if self.hypotheses_window_ is not None:
+            return hypotheses_frames[0]
+        return self.hypotheses_.frame(hypotheses_frames[0]) # return first and only element of list
+
 
+    def mergeJoin(self):
+        """Check, if ground truth and hypotheses frames can be merge joined, i.e. ground truth is chronologically ordered"""
 
-    def evaluate(self):
-        """Compute MOTA metric from ground truth and hypotheses for all frames."""
+        if self.groundtruth_ is None:
+            raise Exception, "No ground truth to evaluate. Pass frames to push for online evaluation."
         
-        frames = self.groundtruth_["frames"]
-        for frame in frames:
-            self.evaluateFrame(frame)
+        if isinstance(self.groundtruth_, FrameStore):
+            # Merge join ground truth and hypotheses frames, if ground truth is chronologically ordered
+            timestamps = self.groundtruth_.timestamps_
+            merge_join = bool(numpy.all(timestamps[1:] >= timestamps[:-1]))
+        else:
+            merge_join = True # streamed ground truth has to be chronologically ordered
+
+        if self.hypotheses_window_ is not None and not merge_join:
+            raise Exception, "Streamed hypotheses require chronologically ordered ground truth"
+
+        return merge_join
+
+
+    def framePairs(self):
+        """Iterate over pairs of ground truth frame and chronologically close hypotheses frame"""
+
+        merge_join = self.mergeJoin()
+        for frame in self.groundtruth_:
+            if not isinstance(frame, Frame):
+                frame = Frame.fromDict(frame, "annotations")
+            yield frame, self.get_hypotheses_frame(frame.timestamp_, merge_join)
+
+
+    def evaluate(self, processes=None):
+        """Compute MOTA metric from ground truth and hypotheses for all frames.
+
+        Streamed frames are evaluated as they are read, holding only the hypotheses frames of one sync window in memory.
+        With processes, frame matching and overlaps of stored frames are computed by a pool of processes (0: number of cores),
+        while the mapping is updated frame by frame in this process. Results are identical."""
+
+        if processes is not None:
+            self.evaluateTwoPhase(processes or None)
+            return
+
+        pairs = self.framePairs()
+        if self.profile_ is not None:
+            pairs = self.profile_.iterate("frame matching", pairs)
+
+        for frame, hypotheses_frame in pairs:
+            self.evaluateFrame(frame, hypotheses_frame)
+
+
+    def evaluateTwoPhase(self, processes=None):
+        """Evaluate all frames in two phases: frame matching and geometry in parallel, then the mapping in order. See evaluate."""
+
+        if not isinstance(self.groundtruth_, FrameStore) or not isinstance(self.hypotheses_, FrameStore):
+            raise Exception, "Parallel evaluation requires stored ground truth and hypotheses, not streams"
+
+        geometries = FrameGeometryPool(self.groundtruth_, self.hypotheses_, self.sync_delta_, processes, kernel=self.kernel_, threshold=self.overlap_threshold_)
+        try:
+            results = izip(self.groundtruth_, geometries)
+            if self.profile_ is not None:
+                results = self.profile_.iterate("overlaps", results) # waiting for the pool
+            for frame, (positions, geometry) in results:
+                if len(positions) > 1:
+                    raise Exception, "> 1 hypotheses timestamps found for timestamp %f with sync delta %f" % (frame.timestamp_, self.sync_delta_)
+                hypotheses_frame = self.hypotheses_.frame(positions[0]) if positions else Frame.empty("hypotheses")
+
+                geometry.attachFrames(frame, hypotheses_frame)
+                self.evaluateGeometry(geometry)
+        finally:
+            geometries.close()
+
+
+    def evaluateRange(self, begin, end):
+        """Evaluate stored ground truth frames begin..end-1"""
+
+        merge_join = self.mergeJoin()
+        for k in range(begin, end):
+            frame = self.groundtruth_.frame(k)
+            self.frame_index_ = k
+            self.evaluateFrame(frame, self.get_hypotheses_frame(frame.timestamp_, merge_join))
+
+
+    def evaluateSharded(self, shards=None, processes=None):
+        """Evaluate all frames in shards of consecutive frames concurrently, with the same counts as evaluate.
+
+        Each shard but the first is evaluated speculatively from an empty mapping by a pool of processes (default: number of cores),
+        while this process evaluates the first shard. Then, from the first shard on, the frames after each shard boundary are
+        evaluated again from the actual mapping, until mapping and yin-yang maps agree with the speculative evaluation.
+        The remaining frames of the shard are taken from the speculative evaluation. Lookups of the yin-yang maps, which found
+        nothing in the speculative evaluation, are resolved against the actual maps. The total overlap may differ in the last
+        digits due to summation order. With a single shard or process, all frames are evaluated in order by this process."""
+
+        if not isinstance(self.groundtruth_, FrameStore) or not isinstance(self.hypotheses_, FrameStore):
+            raise Exception, "Sharded evaluation requires stored ground truth and hypotheses, not streams"
+        if self.trace_ is not None or self.visual_debug_ is not None:
+            raise Exception, "Sharded evaluation does not support trace sinks and visual debug output"
+
+        frames = len(self.groundtruth_)
+        if shards is None:
+            shards = cpu_count()
+        shards = max(1, min(shards, frames))
+        bounds = [(frames * s // shards, frames * (s + 1) // shards) for s in range(shards)]
+
+        if shards == 1 or processes == 1:
+            self.evaluateRange(0, frames)
+            return
+
+        speculative = ShardPool(self, bounds[1:], processes)
+        try:
+            self.evaluateRange(*bounds[0])
+            for (begin, end), shard in izip(bounds[1:], speculative):
+                self.reconcileShard(begin, end, shard)
+        finally:
+            speculative.close()
+
+
+    def reconcileShard(self, begin, end, shard):
+        """Continue evaluation with frames begin..end-1, which have been evaluated speculatively as shard, see evaluateSharded"""
+
+        merge_join = self.mergeJoin()
+        replay = self.fork() # repeats the speculative evaluation
+
+        for k in range(begin, end):
+            frame = self.groundtruth_.frame(k)
+            geometry = self.makeGeometry(frame, self.get_hypotheses_frame(frame.timestamp_, merge_join))
+            self.evaluateGeometry(geometry)
+            replay.evaluateGeometry(geometry)
+
+            if self.agreesWith(replay):
+                LOG.debug("Shard %d..%d converged after %d frames", begin, end, k + 1 - begin)
+                self.mergeShard(replay, shard, k)
+                return
+
+        LOG.debug("Shard %d..%d did not converge", begin, end)
+
+
+    def agreesWith(self, other):
+        """Check, if other evaluation has the same mapping and its yin-yang maps agree with ours"""
+
+        if self.mappings_ != other.mappings_:
+            return False
+        for own, other_map in ((self.gt_map_, other.gt_map_), (self.hypo_map_, other.hypo_map_)):
+            for key, value in other_map.items():
+                if own.get(key) != value:
+                    return False
+        return True
+
+
+    def mergeShard(self, replay, shard, k):
+        """Add the rest of speculatively evaluated shard after frame k. replay is the speculative evaluation up to frame k."""
+
+        # Lookups, which found nothing in the speculative evaluation, would have found the entries of our maps
+        for kind, frame_index, key, value, gt_dco, dco_count_of in shard["unresolved"]:
+            if frame_index <= k:
+                continue
+            if kind == "recoverable":
+                if key in self.gt_map_ and self.gt_map_[key] != value and not gt_dco:
+                    self.recoverable_mismatches_ += 1
+            elif key in self.hypo_map_ and self.hypo_map_[key] != value:
+                if not (gt_dco and dco_count_of.get(self.hypo_map_[key], 0) == 1):
+                    self.non_recoverable_mismatches_ += 1
+
+        for name, attribute in self.FRAME_COUNTERS:
+            setattr(self, attribute, getattr(self, attribute) + shard["counters"][attribute] - getattr(replay, attribute))
+
+        self.mappings_ = {}
+        self.mapped_gt_ids_ = {}
+        for gt_id, hypo_id in shard["mappings"].items():
+            self.map(gt_id, hypo_id)
+        self.gt_map_.update(shard["gt_map"])
+        self.hypo_map_.update(shard["hypo_map"])
+        self.groundtruth_ids_ |= shard["groundtruth_ids"]
+        self.hypothesis_ids_ |= shard["hypothesis_ids"]
+        self.frame_statistics_.extend(shard["frame statistics"][len(FRAME_STATISTICS) * (k + 1 - shard["begin"]):])
+
+
+    def evaluateSweep(self, thresholds):
+        """Evaluate all frames for each of the overlap thresholds, in a single pass over the frames.
+
+        Returns one MOTEvaluation per threshold, with its own mapping state and statistics.
+        Frames are matched and overlaps are calculated only once per frame. Trace sinks, visual debug output and profiling are not attached to the returned evaluations."""
+
+        evaluations = [self.fork(threshold) for threshold in thresholds]
+        loosest = self.kernel_.loosest(thresholds)
+
+        for frame, hypotheses_frame in self.framePairs():
+            geometry = self.makeGeometry(frame, hypotheses_frame, threshold=loosest)
+            for evaluation in evaluations:
+                evaluation.evaluateGeometry(geometry)
+
+        return evaluations
+
+
+    def fork(self, overlap_threshold=None):
+        """Evaluation of the same ground truth and hypotheses with reset mapping and statistics, and optionally another overlap threshold"""
+
+        evaluation = copy.copy(self)
+        if overlap_threshold is not None:
+            evaluation.overlap_threshold_ = overlap_threshold
+        evaluation.trace_ = None
+        evaluation.visual_debug_ = None
+        evaluation.profile_ = None
+        evaluation.resetStatistics()
+        return evaluation
 
 
-    def evaluateFrame(self, frame):
-        """Update statistics by evaluating a new frame."""
+    def evaluateFrame(self, frame, hypotheses_frame=None):
+        """Update statistics by evaluating a new frame. Looks up the hypotheses frame, if not given.
 
-        timestamp = frame["timestamp"]
-        groundtruths = frame["annotations"]
-        hypotheses = self.get_hypotheses_frame(timestamp)["hypotheses"]
+        Frames are framestore.Frame instances or frame dicts."""
 
-        visualDebugAnnotations = []
+        if not isinstance(frame, Frame):
+            frame = Frame.fromDict(frame, "annotations")
+
+        profile = self.profile_
+
+        if hypotheses_frame is None:
+            if profile is not None:
+                hypotheses_frame = profile.call("frame matching", self.get_hypotheses_frame, frame.timestamp_)
+            else:
+                hypotheses_frame = self.get_hypotheses_frame(frame.timestamp_)
+        elif not isinstance(hypotheses_frame, Frame):
+            hypotheses_frame = Frame.fromDict(hypotheses_frame, "hypotheses")
+
+        if profile is not None:
+            geometry = profile.call("overlaps", self.makeGeometry, frame, hypotheses_frame)
+        else:
+            geometry = self.makeGeometry(frame, hypotheses_frame)
+
+        self.evaluateGeometry(geometry)
+
+
+    def push(self, frame, hypotheses_frame=None):
+        """Evaluate a single frame online and return its statistics.
+
+        frame is the ground truth frame, hypotheses_frame the matching hypotheses frame (framestore.Frame instances or frame dicts).
+        Without hypotheses frame, all ground truths of the frame are missed.
+        Returns dict with the changes of the absolute statistics counted per frame, e.g. "misses" and "mismatches",
+        and MOTA and MOTP of all frames evaluated so far (None if not defined yet)."""
+
+        if hypotheses_frame is None:
+            hypotheses_frame = Frame.empty("hypotheses")
+
+        before = [getattr(self, attribute) for name, attribute in self.FRAME_COUNTERS]
+        self.evaluateFrame(frame, hypotheses_frame)
+
+        delta = dict((name, getattr(self, attribute) - previous) for (name, attribute), previous in zip(self.FRAME_COUNTERS, before))
+        delta["timestamp"] = frame["timestamp"]
+        delta["MOTA"] = 1.0 - float(self.misses_ + self.false_positives_ + self.mismatches_) / self.total_groundtruths_ if self.total_groundtruths_ != 0 else None
+        delta["MOTP"] = self.total_overlap_ / self.total_correspondences_ if self.total_correspondences_ != 0 else None
+        return delta
+
+
+    def snapshot(self):
+        """Copy of mapping and statistics, e.g. to evaluate alternative continuations of a sequence. See restore."""
+
+        state = dict((attribute, getattr(self, attribute)) for name, attribute in self.FRAME_COUNTERS)
+        state["mappings_"] = dict(self.mappings_)
+        state["mapped_gt_ids_"] = dict((hypo_id, set(gt_ids)) for hypo_id, gt_ids in self.mapped_gt_ids_.items())
+        state["gt_map_"] = dict(self.gt_map_)
+        state["hypo_map_"] = dict(self.hypo_map_)
+        state["groundtruth_ids_"] = set(self.groundtruth_ids_)
+        state["hypothesis_ids_"] = set(self.hypothesis_ids_)
+        state["frame_statistics_"] = array("d", self.frame_statistics_)
+        return state
+
+
+    def restore(self, state):
+        """Reset mapping and statistics to a snapshot. The snapshot can be restored again."""
+
+        for name, attribute in self.FRAME_COUNTERS:
+            setattr(self, attribute, state[attribute])
+        self.mappings_ = dict(state["mappings_"])
+        self.mapped_gt_ids_ = dict((hypo_id, set(gt_ids)) for hypo_id, gt_ids in state["mapped_gt_ids_"].items())
+        self.gt_map_ = dict(state["gt_map_"])
+        self.hypo_map_ = dict(state["hypo_map_"])
+        self.groundtruth_ids_ = set(state["groundtruth_ids_"])
+        self.hypothesis_ids_ = set(state["hypothesis_ids_"])
+        self.frame_statistics_ = array("d", state["frame_statistics_"])
+
+
+    def evaluateGeometry(self, geometry):
+        """Update statistics by evaluating a new frame, given as FrameGeometry"""
+
+        result = FrameResult(geometry)
+        misses, false_positives, mismatches, total_overlap = self.misses_, self.false_positives_, self.mismatches_, self.total_overlap_
 
         # Save occuring ground truth ids
-        for g in groundtruths:
-            self.groundtruth_ids_.add(g["id"])
+        self.groundtruth_ids_.update(geometry.gt_ids_)
 
         # Save occuring hypothesis ids
-        for h in hypotheses:
-            self.hypothesis_ids_.add(h["id"])
-        
-        LOG.info("")
-        LOG.info("Timestamp: %s" % timestamp)
-        
-        LOG.info("DIFF")
-        LOG.info("DIFF Time %.2f" % timestamp)
-        
-        logstr = ["DIFF Mappings:"]
-        for gt_id in sorted(self.mappings_.keys()):
-            logstr.append("%s-%s" % (gt_id, self.mappings_[gt_id]))
-        LOG.info(" ".join(logstr))
+        self.hypothesis_ids_.update(geometry.hypo_ids_)
+
+        # Events are only generated, if a trace sink is attached
+        trace = self.trace_
+        if trace is not None:
+            trace.beginFrame(geometry.timestamp_, self.mappings_, geometry.groundtruths_, geometry.hypotheses_)
 
         # No need to evaluate this frame.
-        if len(groundtruths) == 0 and len(hypotheses) == 0:
-            LOG.info("No gt and hypos for this frame.")
+        if len(geometry.gt_ids_) == 0 and len(geometry.hypo_ids_) == 0:
+            self.frame_statistics_.extend((0, 0, 0, 0, 0, 0.0))
+            if trace is not None:
+                trace.endFrame(geometry.timestamp_)
             return
 
-        LOG.info("GTs:")
-        for groundtruth in groundtruths:
-            LOG.info(Rect(groundtruth))
+        profile = self.profile_
+        if profile is None:
+            self.keepCorrespondences(geometry, result)
+            rows, columns, costs = self.findCandidates(geometry, result)
+            indices = self.assign(geometry, rows, columns, costs)
+            self.updateMappings(geometry, result, indices)
+            self.countMissesAndFalsePositives(geometry, result)
+        else:
+            profile.call("step 1", self.keepCorrespondences, geometry, result)
+            rows, columns, costs = profile.call("step 2", self.findCandidates, geometry, result)
+            profile.addCandidates(len(rows))
+            indices = profile.call("assignment", self.assign, geometry, rows, columns, costs)
+            profile.addComponentShapes()
+            profile.call("step 3", self.updateMappings, geometry, result, indices)
+            profile.call("step 4", self.countMissesAndFalsePositives, geometry, result)
+
+        self.total_correspondences_ += len(result.correspondences_)
+        
+        self.total_groundtruths_ += len(geometry.gt_ids_) # Number of objects (ground truths) in current frame
+
+        self.frame_statistics_.extend((self.misses_ - misses, self.false_positives_ - false_positives, self.mismatches_ - mismatches,
+            len(geometry.gt_ids_), len(result.correspondences_), self.total_overlap_ - total_overlap))
+
+        if trace is not None:
+            trace.endFrame(geometry.timestamp_)
+
+        if self.visual_debug_ is not None:
+            self.addVisualDebugFrame(geometry, result)
 
-        LOG.info("Hypos:")
-        for hypothesis in hypotheses:
-            LOG.info(Rect(hypothesis))
-            
+
+    def keepCorrespondences(self, geometry, result):
+        """Paper step 1: Keep correspondences of mapping, if still overlapping"""
+
+        timestamp = geometry.timestamp_
+        trace = self.trace_
+        qualifies = geometry.kernel_.qualifies
 
         # PAPER STEP 1
-        # Valid mappings skip Munkres algorithm, if both ground truth and hypo are found in this frame
+        # Valid mappings skip assignment, if both ground truth and hypo are found in this frame
         # We call these pairs correspondences and fill the list each frame.
-        correspondences = {} # truth id -> hypothesis id
-        
-        listofprints = []
-        LOG.info("")
-        LOG.info("STEP 1: KEEP CORRESPONDENCE")
-#            print "DIFF Keep correspondence"
+        correspondences = result.correspondences_ # truth id -> hypothesis id
             
-        for gt_id in self.mappings_.keys():
-            groundtruth = filter(lambda g: g["id"] == gt_id, groundtruths) # Get ground truths with given ground truth id in current frame
-            if len(groundtruth) > 1:
-                LOG.warning("found %d > 1 ground truth tracks for id %s", len(groundtruth), gt_id)
-            elif len(groundtruth) < 1:
+        found = [] # (ground truth id, ground truth index, hypothesis index) in order of mapping
+        for gt_id, mapping_hypo_id in self.mappings_.items():
+            gt_indices = geometry.gt_indices_of_.get(gt_id) # Get ground truths with given ground truth id in current frame
+            if gt_indices is None:
                 continue
+            if len(gt_indices) > 1:
+                LOG.warning("found %d > 1 ground truth tracks for id %s", len(gt_indices), gt_id)
             
-            hypothesis = filter(lambda h: h["id"] == self.mappings_[gt_id], hypotheses) # Get hypothesis with hypothesis id according to mapping
-            assert len(hypothesis) <= 1
-            if len(hypothesis) != 1:
+            hypo_indices = geometry.hypo_indices_of_.get(mapping_hypo_id) # Get hypothesis with hypothesis id according to mapping
+            if hypo_indices is None:
                 continue
-            
-            # Hypothesis found for known mapping
-            # Check hypothesis for overlap
-            overlap = Rect(groundtruth[0]).overlap(Rect(hypothesis[0]))
-            if overlap >= self.overlap_threshold_:
-                LOG.info("Keeping correspondence between %s and %s" % (groundtruth[0]["id"], hypothesis[0]["id"]))
-#                    print "DIFF Keep corr %s %s %.2f" % (groundtruth[0]["id"], hypothesis[0]["id"], Rect(groundtruth[0]).overlap(Rect(hypothesis[0])))
-                listofprints.append("DIFF Keep corr %s %s %.2f" % (groundtruth[0]["id"], hypothesis[0]["id"], Rect(groundtruth[0]).overlap(Rect(hypothesis[0]))))
-                correspondences[gt_id] = hypothesis[0]["id"]
+            assert len(hypo_indices) == 1
+            found.append((gt_id, gt_indices[0], hypo_indices[0]))
+
+        # Hypotheses found for known mappings
+        # Check hypotheses for overlap, looked up at once
+        overlaps = geometry.overlaps([gt_index for gt_id, gt_index, hypo_index in found], [hypo_index for gt_id, gt_index, hypo_index in found])
+        for (gt_id, gt_index, hypo_index), overlap in zip(found, overlaps):
+            if qualifies(overlap, self.overlap_threshold_):
+                hypo_id = geometry.hypo_ids_[hypo_index]
+                if trace is not None:
+                    trace.keep(timestamp, gt_id, hypo_id, overlap)
+                correspondences[gt_id] = hypo_id
                 self.total_overlap_ += overlap
 
-        
-        for p in sorted(listofprints):
-            LOG.info(p)
 
-        # PAPER STEP 2
-        LOG.info("")
-        LOG.info("STEP 2: FIND CORRESPONDENCE")
-        
-        # Fill hungarian matrix with +inf
-        munkres_matrix = [ [ self.munkres_inf_ for i in range(len(hypotheses)) ] for j in range(len(groundtruths)) ] # TODO make square matrix
+    def findCandidates(self, geometry, result):
+        """Paper step 2: Candidate pairs of ground truths and hypotheses without correspondence, as arrays of rows, columns and costs"""
 
-        # Find correspondences
-        for i in range(len(groundtruths)):
-            groundtruth = groundtruths[i]
-            
-            # Skip groundtruth with correspondence from mapping
-            if groundtruth["id"] in correspondences.keys():
-                LOG.info("Groundtruth %s already in correspondence" % groundtruth["id"])
-                continue
-            
-            # Fill hungarian matrix with distance between gts and hypos
-            for j in range(len(hypotheses)):
-                hypothesis = hypotheses[j]
-                
-                # Skip hypotheses with correspondence from mapping
-                if hypothesis["id"] in correspondences.values():
-                    LOG.info("Hypothesis %s already in correspondence" % hypothesis["id"])
-                    continue
-                
-                rect_groundtruth = Rect(groundtruth)
-                rect_hypothesis = Rect(hypothesis)
-                overlap = rect_groundtruth.overlap(rect_hypothesis)
-                
-                if overlap >= self.overlap_threshold_:
-#                        print "Fill Hungarian", rect_groundtruth, rect_hypothesis, overlap
-                    munkres_matrix[i][j] = 1 / overlap
-                    LOG.info("DIFF candidate %s %s %.2f" % (groundtruth["id"], hypothesis["id"], overlap))
-        
-        # Do the Munkres
-        LOG.debug(munkres_matrix)
-        
-        # Only run munkres on non-empty matrix
-        if len(munkres_matrix) > 0:
-            m = Munkres()
-            indices = m.compute(munkres_matrix)
-        else:
-            LOG.info("No need to run Hungarian with %d ground truths and %d hypothesis." % (len(groundtruths), len(hypotheses)))
-            indices = []
-        LOG.info(indices)
-        
-        correspondencelist = []
-        mismatcheslist = []
-        
-        for gt_index, hypo_index in indices:
-            
-            # Skip invalid self.mappings_
-            # Check for max float distance matches (since Hungarian returns complete mapping)
-            if (munkres_matrix[gt_index][hypo_index] == self.munkres_inf_): # NO correspondence <=> overlap >= thresh
-                continue
+        trace = self.trace_
+
+        # PAPER STEP 2
+        # Candidates have sufficient overlap
+        rows, columns, overlaps = geometry.pairs(self.overlap_threshold_)
+
+        # Skip ground truths and hypotheses with correspondence from mapping
+        if result.correspondences_:
+            corresponding_hypo_ids = set(result.correspondences_.values())
+            gt_in_correspondence = numpy.array([g in result.correspondences_ for g in geometry.gt_ids_], dtype=bool)
+            hypo_in_correspondence = numpy.array([h in corresponding_hypo_ids for h in geometry.hypo_ids_], dtype=bool)
+            selected = ~(gt_in_correspondence[rows] | hypo_in_correspondence[columns])
+            rows, columns, overlaps = rows[selected], columns[selected], overlaps[selected]
+
+        if trace is not None:
+            for i, j, overlap in zip(rows.tolist(), columns.tolist(), overlaps.tolist()):
+                trace.candidate(geometry.timestamp_, geometry.gt_ids_[i], geometry.hypo_ids_[j], overlap)
+
+        return rows, columns, geometry.kernel_.costs(overlaps)
+
+
+    def assign(self, geometry, rows, columns, costs):
+        """Paper step 2: Assignment of candidates. Returns list of (ground truth index, hypothesis index)"""
+
+        # Only run assignment on candidates. Independent groups of overlapping boxes are solved separately, except by munkres.
+        if len(rows) > 0:
+            shapes = self.profile_.component_shapes_ if self.profile_ is not None else None
+            return solve_pairs(self.solver_, geometry.shape_, rows, columns, costs, shapes)
+        return []
+
+
+    def updateMappings(self, geometry, result, indices):
+        """Paper step 3: Add assigned correspondences, count mismatches and update mapping"""
+
+        timestamp = geometry.timestamp_
+        trace = self.trace_
+        gt_ids = geometry.gt_ids_
+        hypo_ids = geometry.hypo_ids_
+        gt_dco = geometry.gt_dco_
+        gt_indices_of = geometry.gt_indices_of_
+        dco_count_of = geometry.dco_count_of_
+        hypo_indices_of = geometry.hypo_indices_of_
+        correspondences = result.correspondences_
+        gt_classes = result.gt_classes_
+        hypo_classes = result.hypo_classes_
+        visualDebugAnnotations = result.annotations_
+
+        overlaps = geometry.overlaps([gt_index for gt_index, hypo_index in indices], [hypo_index for gt_index, hypo_index in indices])
+        for (gt_index, hypo_index), overlap in zip(indices, overlaps):
             
-            gt_id   = groundtruths[gt_index]["id"]
-            hypo_id = hypotheses[hypo_index]["id"]
+            gt_id   = gt_ids[gt_index]
+            hypo_id = hypo_ids[hypo_index]
             
             # Assert no known mappings have been added to hungarian, since keep correspondence should have considered this case.
             if gt_id in self.mappings_:
@@ -231,105 +706,109 @@ class MOTEvaluation:
             
             
             # Add to correspondences
-            LOG.info("Correspondence found: %s and %s (overlap: %f)" % (gt_id, hypo_id, 1.0 / munkres_matrix[gt_index][hypo_index]))
-#                correspondencelist.append("DIFF correspondence %s %s %.2f" % (gt_id, hypo_id, 1.0 / munkres_matrix[gt_index][hypo_index]))
-            correspondencelist.append("DIFF correspondence %s %s" % (gt_id, hypo_id))
+            if trace is not None:
+                trace.correspondence(timestamp, gt_id, hypo_id, overlap)
             correspondences[gt_id] = hypo_id
             self.total_overlap_ += overlap
             
 
             # Count "recoverable" and "non-recoverable" mismatches
             # "recoverable" mismatches
-            if gt_id in self.gt_map_ and self.gt_map_[gt_id] != hypo_id and not groundtruths[gt_index].get("dco",False):
-                LOG.info("Look ma! We got a recoverable mismatch over here! (%s-%s) -> (%s-%s)" % (gt_id, self.gt_map_[gt_id], gt_id, hypo_id))
-                self.recoverable_mismatches_ += 1
+            if gt_id in self.gt_map_:
+                if self.gt_map_[gt_id] != hypo_id and not gt_dco[gt_index]:
+                    self.recoverable_mismatches_ += 1
+            elif self.unresolved_ is not None:
+                self.unresolved_.append(("recoverable", self.frame_index_, gt_id, hypo_id, gt_dco[gt_index], None))
 
             # "non-recoverable" mismatches
-            if hypo_id in self.hypo_map_ and self.hypo_map_[hypo_id] != gt_id:
-                # Do not count non-recoverable mismatch, if both old ground truth and current ground truth are DCO.
-                old_gt_id = self.hypo_map_[hypo_id]
-                old_gt_dco = filter(lambda g: g["id"] == old_gt_id and g.get("dco",False), groundtruths)
-
-                assert len(old_gt_dco) <= 1;
-                if not (groundtruths[gt_index].get("dco",False) and len(old_gt_dco) == 1):
-                    LOG.info("Look ma! We got a non-recoverable mismatch over here! (%s-%s) -> (%s-%s)" % (self.hypo_map_[hypo_id], hypo_id, gt_id, hypo_id))
-                    self.non_recoverable_mismatches_ += 1
+            if hypo_id in self.hypo_map_:
+                if self.hypo_map_[hypo_id] != gt_id:
+                    # Do not count non-recoverable mismatch, if both old ground truth and current ground truth are DCO.
+                    old_gt_dco = dco_count_of.get(self.hypo_map_[hypo_id], 0)
+
+                    assert old_gt_dco <= 1;
+                    if not (gt_dco[gt_index] and old_gt_dco == 1):
+                        self.non_recoverable_mismatches_ += 1
+            elif self.unresolved_ is not None:
+                self.unresolved_.append(("non-recoverable", self.frame_index_, hypo_id, gt_id, gt_dco[gt_index], dco_count_of))
 
             # Update yin-yang maps                    
             self.gt_map_[gt_id] = hypo_id
             self.hypo_map_[hypo_id] = gt_id
 
             # Correspondence contradicts previous mapping. Mark and count as mismatch, if ground truth is not a DCO
-            # Iterate over all gt-hypo pairs of mapping, since we have to perform a two way check:
+            # We have to perform a two way check:
             # Correspondence: A-1
             # Mapping: A-2, B-1
             # We have to detect both forms of conflicts
-            for mapping_gt_id, mapping_hypo_id in self.mappings_.items():
+            # Conflicting mappings are the mapping of the ground truth and the mappings to the hypothesis.
+            # Several ground truths can be mapped to the same hypothesis, if they have been DCO.
+            conflicts = [gt_id] if gt_id in self.mappings_ else []
+            conflicts.extend(mapping_gt_id for mapping_gt_id in self.mapped_gt_ids_.get(hypo_id, ()) if mapping_gt_id != gt_id)
+
+            for mapping_gt_id in conflicts:
                 
                 # CAVE: Other than in perl script:
                 # Do not consider for mismatch, if both old gt and new gt are DCO
-                gt_with_mapping_gt_id_dco = filter(lambda g: g["id"] == mapping_gt_id and g.get("dco",False), groundtruths)
-                if len (gt_with_mapping_gt_id_dco) == 1 and groundtruths[gt_index].get("dco",False):
-                    LOG.info("Ground truths %s and %s are DCO. Not considering for mismatch." % (mapping_gt_id, gt_id))
-#                    print "DIFF DCO %s" % (gt_id), groundtruths[gt_index]
-                    
-                else:
+                if dco_count_of.get(mapping_gt_id) == 1 and gt_dco[gt_index]:
+                    continue
+
                 # Look ma, we got a conflict over here!
                 # New hypothesis for mapped ground truth found
-                    if (mapping_gt_id == gt_id and mapping_hypo_id != hypo_id)\
-                    or (mapping_gt_id != gt_id and mapping_hypo_id == hypo_id):
-                        LOG.info("Correspondence %s-%s contradicts mapping %s-%s. Counting as mismatch and updating mapping." % (gt_id, hypo_id, mapping_gt_id, mapping_hypo_id))
-                        mismatcheslist.append("DIFF Mismatch %s-%s -> %s-%s" % (mapping_gt_id, mapping_hypo_id, gt_id, hypo_id))
-                        self.mismatches_ = self.mismatches_ + 1
+                mapping_hypo_id = self.mappings_[mapping_gt_id]
+                if trace is not None:
+                    trace.mismatch(timestamp, mapping_gt_id, mapping_hypo_id, gt_id, hypo_id)
+                self.mismatches_ = self.mismatches_ + 1
 
-                        # find groundtruth and hypothesis with given ids
-                        g = filter(lambda g: g["id"] == gt_id, groundtruths)
-                        h = filter(lambda h: h["id"] == hypo_id, hypotheses)
+                # find groundtruth and hypothesis with given ids
+                g = gt_indices_of[gt_id]
+                h = hypo_indices_of[hypo_id]
 
-                        #assert(len(g) == 1)
-                        if len(g) != 1:
-                            LOG.warning('more than one gt: %s', str(g))
-                        assert(len(h) == 1)
+                #assert(len(g) == 1)
+                if len(g) != 1:
+                    LOG.warning('more than one gt: %s', str(g))
+                assert(len(h) == 1)
 
-                        g = g[0]
-                        h = h[0]
+                g = g[0]
+                h = h[0]
 
-                        g["class"] = "mismatch"
-                        h["class"] = "mismatch"
+                gt_classes[g] = "mismatch"
+                hypo_classes[h] = "mismatch"
 
-                        visualDebugAnnotations.append(g)
-                        visualDebugAnnotations.append(h)
+                visualDebugAnnotations.append(("groundtruth", g))
+                visualDebugAnnotations.append(("hypothesis", h))
 
-                        # mapping will be updated after loop
-                        del self.mappings_[mapping_gt_id]
-            
-#                print "YIN: %d %d" % (self.recoverable_mismatches_, self.non_recoverable_mismatches_)
-#                assert(self.recoverable_mismatches_ + self.non_recoverable_mismatches_ == self.mismatches_)
-            if(self.recoverable_mismatches_ + self.non_recoverable_mismatches_ != self.mismatches_):
-                LOG.info("Look, mismatches differ: g %d b %d  other %d" % (self.recoverable_mismatches_, self.non_recoverable_mismatches_, self.mismatches_))
-                LOG.info(self.gt_map_)
-                LOG.info(self.hypo_map_)
+                # mapping will be updated after loop
+                self.unmap(mapping_gt_id)
         
             # Save (overwrite) mapping even if ground truth is dco
-            self.mappings_[gt_id] = hypo_id # Update mapping
-        
-        # Sorted DIFF output
-        for c in sorted(correspondencelist):
-            LOG.info(c)
-            
-        for m in sorted(mismatcheslist):
-            LOG.info(m)
+            self.map(gt_id, hypo_id) # Update mapping
+
+
+    def countMissesAndFalsePositives(self, geometry, result):
+        """Paper step 4: Count ground truths and hypotheses without correspondence"""
+
+        timestamp = geometry.timestamp_
+        trace = self.trace_
+        gt_ids = geometry.gt_ids_
+        hypo_ids = geometry.hypo_ids_
+        gt_dco = geometry.gt_dco_
+        correspondences = result.correspondences_
+        gt_classes = result.gt_classes_
+        hypo_classes = result.hypo_classes_
+        visualDebugAnnotations = result.annotations_
 
         # Visual debug
-        for g in groundtruths:
-            if g["class"] != "mismatch" and g["id"] in correspondences.keys():
-                g["class"] = "correspondence"
-                visualDebugAnnotations.append(g)
+        for i, g in enumerate(gt_ids):
+            if gt_classes[i] != "mismatch" and g in correspondences:
+                gt_classes[i] = "correspondence"
+                visualDebugAnnotations.append(("groundtruth", i))
             
-        for h in hypotheses:
-            if h["class"] != "mismatch" and h["id"] in correspondences.values():
-                h["class"] = "correspondence"
-                visualDebugAnnotations.append(h)
+        corresponding_hypo_ids = set(correspondences.values())
+        for j, h in enumerate(hypo_ids):
+            if hypo_classes[j] != "mismatch" and h in corresponding_hypo_ids:
+                hypo_classes[j] = "correspondence"
+                visualDebugAnnotations.append(("hypothesis", j))
 
         
         # TODO get overlap ratio
@@ -339,38 +818,54 @@ class MOTEvaluation:
         
         # PAPER STEP 4
         # Count miss, when groundtruth has no correspondence and is not dco
-        for groundtruth in groundtruths:
-            LOG.info("DCO:", groundtruth)
-            if groundtruth["id"] not in correspondences.keys() and groundtruth.get("dco", False) != True:
-                LOG.info("Miss: %s" % groundtruth["id"])
-                LOG.info("DEBUGMISS: %.2f" % timestamp)
-                LOG.info("DIFF Miss %s" % groundtruth["id"])
-                groundtruth["class"] = "miss"
-                visualDebugAnnotations.append(groundtruth)
+        for i, gt_id in enumerate(gt_ids):
+            if gt_id not in correspondences and not gt_dco[i]:
+                if trace is not None:
+                    trace.miss(timestamp, gt_id)
+                gt_classes[i] = "miss"
+                visualDebugAnnotations.append(("groundtruth", i))
                 self.misses_ += 1
 
         # Count false positives
-        for hypothesis in hypotheses:
-            if hypothesis["id"] not in correspondences.values():
-                LOG.info("False positive: %s" % hypothesis["id"])
-                LOG.info("DIFF False positive %s" % hypothesis["id"])
+        for j, hypo_id in enumerate(hypo_ids):
+            if hypo_id not in corresponding_hypo_ids:
+                if trace is not None:
+                    trace.falsePositive(timestamp, hypo_id)
                 self.false_positives_ += 1
-                visualDebugAnnotations.append(hypothesis)
-                hypothesis["class"] = "false positive"
-        
-        self.total_correspondences_ += len(correspondences)
-        
-        self.total_groundtruths_ += len(groundtruths) # Number of objects (ground truths) in current frame
+                visualDebugAnnotations.append(("hypothesis", j))
+                hypo_classes[j] = "false positive"
+
+
+    def addVisualDebugFrame(self, geometry, result):
+        """Pass ground truths and hypotheses of evaluated frame with their classes to visual debug output"""
+
+        groundtruths = geometry.groundtruths_
+        hypotheses = geometry.hypotheses_
+        gt_classes = result.gt_classes_
+        hypo_classes = result.hypo_classes_
+        visualDebugAnnotations = result.annotations_
+
+        # Box dicts for visual debugging, one per box, even if listed multiple times
+        frames = {"groundtruth": groundtruths, "hypothesis": hypotheses}
+        classes = {"groundtruth": gt_classes, "hypothesis": hypo_classes}
+        boxes = {}
+        for annotation in visualDebugAnnotations:
+            if annotation not in boxes:
+                box_type, index = annotation
+                box = boxes[annotation] = frames[box_type].box(index)
+                box["type"] = box_type
+                box["class"] = classes[box_type][index]
 
         visualDebugFrame = {
-            "timestamp": timestamp,
-            "class": frame["class"],
-            "annotations": visualDebugAnnotations
+            "timestamp": geometry.timestamp_,
+            "class": "frame",
+            "annotations": [boxes[annotation] for annotation in visualDebugAnnotations]
         }
-        if "num" in frame:
-            visualDebugFrame["num"] = frame["num"]
+        if groundtruths.num_ is not None:
+            visualDebugFrame["num"] = groundtruths.num_
+
+        self.visual_debug_.addFrame(visualDebugFrame)
 
-        self.visualDebugFrames_.append(visualDebugFrame)
 
     @staticmethod
     def calcMOTA(abs_stats):
@@ -450,6 +945,27 @@ class MOTEvaluation:
         }
     
 
+    def getFrameStatistics(self):
+        """Dict of arrays of misses, false positives, mismatches, ground truths, correspondences and total overlap of each evaluated frame"""
+        values = numpy.frombuffer(self.frame_statistics_, dtype=numpy.float64).reshape(-1, len(FRAME_STATISTICS))
+        return dict((name, values[:, k].copy()) for k, name in enumerate(FRAME_STATISTICS))
+
+
+    def getConfidenceIntervals(self, samples=1000, block_length=None, confidence=0.95, seed=None):
+        """Bootstrap confidence intervals of MOTA and MOTP, as dict of (lower bound, upper bound).
+
+        Computed from the statistics of each frame by moving block bootstrap, without evaluating again. See bootstrap.bootstrapIntervals"""
+        values = numpy.frombuffer(self.frame_statistics_, dtype=numpy.float64).reshape(-1, len(FRAME_STATISTICS))
+        return bootstrapIntervals(values, samples, block_length, confidence, seed)
+
+
+    def getProfile(self):
+        """Wall time and calls per phase, candidate counts per frame and histogram of assignment matrix sizes, if enabled by enableProfiling. None otherwise."""
+        if self.profile_ is None:
+            return None
+        return self.profile_.getProfile()
+
+
     def getRelativeStatistics(self):
         gt = self.total_groundtruths_
         covered_ground_truths = self.groundtruth_ids_ & set(self.gt_map_.keys())
@@ -504,34 +1020,59 @@ class MOTEvaluation:
         print "ABS TOTALS: groundT %.0f\t corr %.0f\t failedCorr %.0f\t overlap_ratio %.2f\t miss %.0f\t falseP %.0f\t mismatch %0.f" % (self.total_groundtruths_, 0, 0, 0, self.misses_, self.false_positives_, self.mismatches_)
 
 
-    def convertIDsToString(self):
-        for f in self.groundtruth_["frames"]:
-            for g in f["annotations"]:
-                g["id"] = str(g.get("id", '__missing_id__'))
-
-        for f in self.hypotheses_["frames"]:
-            for h in f["hypotheses"]:
-                h["id"] = str(h["id"])
-
-
     def getVisualDebug(self):
+        """Visual debug frames collected after enableVisualDebug()"""
+        if not isinstance(self.visual_debug_, VisualDebugCollector):
+            write_stderr_red("Warning:", "Visual debug frames are only collected after enableVisualDebug().")
+
         fileitem = {
-            'filename': self.groundtruth_["filename"],
-            'class':    self.groundtruth_["class"],
+            'filename': getattr(self.groundtruth_, "filename_", None),
+            'class':    "video",
             'frames': self.visualDebugFrames_
         }
         return [fileitem]
 
 
+    @property
+    def visualDebugFrames_(self):
+        """Visual debug frames collected after enableVisualDebug(), empty otherwise. Kept for compatibility, see getVisualDebug"""
+        if isinstance(self.visual_debug_, VisualDebugCollector):
+            return self.visual_debug_.frames_
+        return []
+
+
+    def convertIDsToString(self):
+        """Kept for compatibility. Ids are already converted to strings, when ground truth and hypotheses frames are stored"""
+        pass
+
+
     def resetMapping(self):
         """Reset mapping. Useful for loading new ground truth and hypo and not counting shot-boundary caused mismatches."""
         self.mappings_ = {} # Mappings from ground truth id to hypothesis id, as described in paper: M_t (initial M_0 empty)
+        self.mapped_gt_ids_ = {} # Inverse of mappings_, from hypothesis id to set of ground truth ids
 
         # Helper dicts for "recoverable" and "non-recoverable" mismatch detection aka Yin Yang
         self.gt_map_ = {} # save most recent hypothesis id for each groundtruth id. Only updates, no deletions of keys
         self.hypo_map_ = {} # save move recent groundtruth id for each hypothesis id. Only updates, no deletions of keys.
 
 
+    def map(self, gt_id, hypo_id):
+        """Map ground truth to hypothesis, replacing previous mapping of ground truth"""
+        if gt_id in self.mappings_:
+            self.unmap(gt_id)
+        self.mappings_[gt_id] = hypo_id
+        self.mapped_gt_ids_.setdefault(hypo_id, set()).add(gt_id)
+
+
+    def unmap(self, gt_id):
+        """Remove mapping of ground truth"""
+        hypo_id = self.mappings_.pop(gt_id)
+        gt_ids = self.mapped_gt_ids_[hypo_id]
+        gt_ids.discard(gt_id)
+        if not gt_ids:
+            del self.mapped_gt_ids_[hypo_id]
+
+
     def resetStatistics(self):
         """Reset counters and mapping."""
         self.resetMapping()
@@ -551,58 +1092,146 @@ class MOTEvaluation:
         self.groundtruth_ids_ = set()
         self.hypothesis_ids_ = set()
 
+        # Values of bootstrap.FRAME_STATISTICS of each evaluated frame, row by row. See getFrameStatistics
+        self.frame_statistics_ = array("d")
+
 
 if __name__ == "__main__":
 
     parser = argparse.ArgumentParser()
     parser.add_argument('-a', '--groundtruth', required=True)
-    parser.add_argument('-b', '--hypothesis', required=True)
+    parser.add_argument('-b', '--hypothesis', required=True, nargs='+', help="Hypotheses file. With multiple files, each is evaluated against the ground truth and summarized")
     parser.add_argument('-c', '--check_format', action="store_true", default=True)
     parser.add_argument('-v', '--visual_debug_file')
+    parser.add_argument('-d', '--diff_log_file', help="Write DIFF style log of correspondences, mismatches, misses and false positives")
+    parser.add_argument('-t', '--thresholds', type=float, nargs='+', help="Evaluate for each of the overlap thresholds, in a single pass")
+    parser.add_argument('-s', '--stream', action="store_true", help="Evaluate frames while reading chronologically ordered input files")
+    parser.add_argument('--cache_dir', default=default_cache_dir(), help="Cache imported files in this directory and map them on later runs. Defaults to environment variable PYMOT_CACHE_DIR")
+    parser.add_argument('-p', '--profile', action="store_true", help="Print time per evaluation phase, candidate counts and assignment matrix sizes to stderr")
+    parser.add_argument('--processes', type=int, default=1, help="Number of processes. For a single hypotheses file, frame matching and overlaps are computed in parallel. Multiple hypotheses files are evaluated interleaved frame by frame with 1 process")
+    parser.add_argument('-k', '--kernel', choices=["iou", "centroid"], default="iou", help="Cost kernel: IoU of boxes or distance of box centres")
+    parser.add_argument('--threshold', type=float, help="Threshold of the cost kernel: minimum overlap for iou (default 0.2), maximum distance for centroid")
+    parser.add_argument('--bootstrap', type=int, metavar="SAMPLES", help="Print 95%% confidence intervals of MOTA and MOTP from this many block bootstrap samples of the frames")
+    parser.add_argument('--shards', type=int, help="Evaluate a single hypotheses file in this many shards of consecutive frames, speculatively in parallel with --processes (default: number of cores), with the same counts as the serial evaluation")
     args = parser.parse_args()
 
-    # Load ground truth according to format
-    # Assume MOT format, if non-json
-    gt = open(args.groundtruth) # gt file
-    if args.groundtruth.endswith(".json"):
-        groundtruth = json.load(gt)[0]
-    else:
-        groundtruth = MOT_groundtruth_import(gt.readlines())
-    gt.close()
+    kernel = KERNELS[args.kernel]()
+    if args.threshold is None and kernel.default_threshold is None:
+        parser.error("--threshold is required for kernel %s" % args.kernel)
+
+    # Multiple trackers: load and check ground truth once, print statistics of each tracker
+    if len(args.hypothesis) > 1:
+        # batch imports pymot, so this module is loaded a second time as pymot, besides running as __main__.
+        # Evaluations of both are the same, only their classes are distinct objects.
+        from batch import TrackerEvaluation
+
+        unsupported = [
+            ("-v", args.visual_debug_file),
+            ("-d", args.diff_log_file),
+            ("-t", args.thresholds),
+            ("-s", args.stream),
+            ("--shards", args.shards),
+            ("-p", args.profile),
+            ("--bootstrap", args.bootstrap),
+        ]
+        for option, value in unsupported:
+            if value:
+                parser.error("%s is not supported with multiple hypotheses files" % option)
+
+        trackers = TrackerEvaluation(args.groundtruth, args.hypothesis, args.processes, cache_dir=args.cache_dir, kernel=kernel, threshold=args.threshold)
+
+        problems = trackers.checkGroundTruth()["problems"]
+        if problems and args.check_format:
+            write_stderr_red("Error:", "Stopping. Fix ids first. Evaluating with broken data does not make sense!\n    File: %s, %s" % (args.groundtruth, json.dumps(problems, sort_keys=True)))
+            sys.exit()
 
-    # Load MOT format files
-    hypo = open(args.hypothesis) # hypo file
-    if args.hypothesis.endswith(".json"):
-        hypotheses = json.load(hypo)[0]
-    else:
-        hypotheses = MOT_hypo_import(hypo.readlines())
-    hypo.close()
+        trackers.evaluate()
 
+        statistics = {}
+        for hypotheses_file, abs_stats, report in trackers.getTrackerStatistics():
+            if report["problems"] and args.check_format:
+                write_stderr_red("Warning:", "Format errors in %s, %s. Results may be wrong!" % (hypotheses_file, json.dumps(report["problems"], sort_keys=True)))
+            print "%-40s MOTA %.4f  MOTP %.4f" % (hypotheses_file, MOTEvaluation.calcMOTA(abs_stats), MOTEvaluation.calcMOTP(abs_stats))
+            statistics[hypotheses_file] = abs_stats
 
-    evaluator = MOTEvaluation(groundtruth, hypotheses)
+        print
+        print "Absolute statistics"
+        print json.dumps(statistics, indent=4, sort_keys=True)
+        sys.exit()
+
+    args.hypothesis = args.hypothesis[0]
 
-    if(args.check_format):
-        formatChecker = FormatChecker(groundtruth, hypotheses)
-        success = formatChecker.checkForExistingIDs()
-        success |= formatChecker.checkForAmbiguousIDs()
-        success |= formatChecker.checkForCompleteness()
+    # Both files are loaded concurrently. Streamed files are read, parsed and checked on background threads, while evaluating.
+    if args.stream:
+        formatChecker = FormatChecker() if args.check_format else None
+        groundtruth, hypotheses = streamFiles(args.groundtruth, args.hypothesis, formatChecker)
+    else:
+        groundtruth, hypotheses = loadFiles(args.groundtruth, args.hypothesis, args.cache_dir)
+
+    evaluator = MOTEvaluation(groundtruth, hypotheses)
+    evaluator.setCostKernel(kernel, args.threshold)
 
-        if not success:
-            write_stderr_red("Error:", "Stopping. Fix ids first. Evaluating with broken data does not make sense!\n    File: %s" % args.groundtruth)
+    if(args.visual_debug_file):
+        visual_debug_file = open(args.visual_debug_file, 'w')
+        visual_debug = VisualDebugWriter(visual_debug_file, getattr(groundtruth, "filename_", None))
+        evaluator.enableVisualDebug(visual_debug)
+
+    if(args.diff_log_file):
+        diff_log = open(args.diff_log_file, 'w')
+        evaluator.addTraceSink(DiffLogSink(diff_log))
+
+    if args.profile:
+        evaluator.enableProfiling()
+
+    # Output files are finished on every exit, also when stopping early
+    try:
+        if args.check_format and not args.stream:
+            formatChecker = FormatChecker(groundtruth, hypotheses)
+            formatChecker.check()
+            formatChecker.printReport()
+
+            if not formatChecker.ok():
+                write_stderr_red("Error:", "Stopping. Fix ids first. Evaluating with broken data does not make sense!\n    File: %s" % args.groundtruth)
+                sys.exit()
+
+        if(args.thresholds):
+            for threshold, evaluation in zip(args.thresholds, evaluator.evaluateSweep(args.thresholds)):
+                print "Overlap threshold %.2f  MOTA %f  MOTP %f" % (threshold, evaluation.getMOTA(), evaluation.getMOTP())
             sys.exit()
 
-    evaluator.evaluate()
+        if args.shards and not args.stream:
+            evaluator.evaluateSharded(args.shards, args.processes if args.processes > 1 else None) # 1 process would evaluate serially
+        else:
+            evaluator.evaluate(args.processes if args.processes != 1 and not args.stream else None)
+    finally:
+        if(args.diff_log_file):
+            diff_log.close()
+        if(args.visual_debug_file):
+            visual_debug.close()
+            visual_debug_file.close()
+
+    if args.stream and args.check_format:
+        formatChecker.printReport()
+        if not formatChecker.ok():
+            write_stderr_red("Warning:", "Input files have format errors. Results may be wrong!")
+
+    if args.profile:
+        evaluator.profile_.printProfile(sys.stderr)
+
     print "Track statistics"
     evaluator.printTrackStatistics()
     print 
     print "Results"
     evaluator.printResults()
+
+    if args.bootstrap:
+        intervals = evaluator.getConfidenceIntervals(args.bootstrap)
+        print
+        print "95% confidence intervals"
+        for name in ("MOTA", "MOTP"):
+            print "%s [%s, %s]" % ((name,) + intervals[name])
 #    evaluator.printLegacyFormat()
 
 #    print json.dumps(evaluator.getAbsoluteStatistics(), indent=4, sort_keys=True)
 #    print json.dumps(evaluator.getRelativeStatistics(), indent=4, sort_keys=True)
 
-    if(args.visual_debug_file):
-        with open(args.visual_debug_file, 'w') as fp:
-            json.dump(evaluator.getVisualDebug(), fp, indent=4)
-
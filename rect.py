@@ -1,5 +1,8 @@
 #!/usr/bin/env python
 
+import numpy
+
+
 class Rect:
     """Common class for both ground truth objects and hypothesis objects"""
 
@@ -54,3 +57,108 @@ class Rect:
 
     def getID(self):
         return self.id_
+
+
+def assert_sizes(boxes):
+    """Assert width >= 0 and height >= 0 of all boxes in array (N, 4), as Rect does"""
+    assert (boxes[:, 2:4] >= 0).all(), "Boxes with negative width or height"
+
+
+def boxes_to_array(boxes):
+    """Array of shape (N, 4) with x, y, width and height of a list of N box dicts"""
+    array = numpy.array([(b["x"], b["y"], b["width"], b["height"]) for b in boxes], dtype=numpy.float64).reshape(-1, 4)
+    assert_sizes(array)
+    return array
+
+
+def overlap_matrix(a, b):
+    """Overlap of all pairs of boxes in arrays a (G, 4) and b (H, 4) as array of shape (G, H). Vectorized Rect.overlap."""
+
+    assert_sizes(a)
+    assert_sizes(b)
+
+    ax, ay, aw, ah = a[:, 0, None], a[:, 1, None], a[:, 2, None], a[:, 3, None]
+    bx, by, bw, bh = b[None, :, 0], b[None, :, 1], b[None, :, 2], b[None, :, 3]
+
+    # Same operations in the same order as Rect.intersect and Rect.overlap, so results are bit-identical
+    ix = numpy.maximum(ax, bx)
+    iy = numpy.maximum(ay, by)
+    iw = numpy.maximum(0, numpy.minimum(ax + aw, bx + bw) - ix)
+    ih = numpy.maximum(0, numpy.minimum(ay + ah, by + bh) - iy)
+    ia = iw * ih
+    union = aw * ah + bw * bh - ia
+
+    # Two empty rects do not overlap at all
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        overlap = ia / union
+    overlap[union == 0] = 0.0
+
+    return overlap
+
+
+# Frames with fewer pairs of boxes are handled by overlap_matrix, which is faster for small frames
+DENSE_PAIRS = 1024
+
+
+def intersecting_pairs(a, b):
+    """Superset of all pairs of boxes in arrays a (G, 4) and b (H, 4), whose x intervals intersect, as arrays of rows and columns.
+
+    Sort and sweep: boxes b are sorted by x. Each box of a can only intersect boxes of b, whose x lies in
+    (x - maximum width of b, x + width), found by binary search. Work grows with the number of pairs in these ranges, instead of G * H."""
+
+    assert_sizes(a)
+    assert_sizes(b)
+
+    if len(a) == 0 or len(b) == 0:
+        return numpy.zeros(0, dtype=numpy.int64), numpy.zeros(0, dtype=numpy.int64)
+
+    order = numpy.argsort(b[:, 0], kind="mergesort")
+    sorted_x = b[order, 0]
+    ax, aw = a[:, 0], a[:, 2]
+
+    # Lower bound with some slack for rounding, the exact test is done on the pairs
+    lower = ax - b[:, 2].max()
+    lower -= 1e-9 * (numpy.abs(lower) + 1.0)
+    begin = numpy.searchsorted(sorted_x, lower, side="left")
+    end = numpy.searchsorted(sorted_x, ax + aw, side="left")
+    counts = numpy.maximum(end - begin, 0)
+
+    # Expand ranges begin..end of each row
+    rows = numpy.repeat(numpy.arange(len(a)), counts)
+    starts = numpy.cumsum(counts) - counts
+    positions = numpy.arange(counts.sum()) - numpy.repeat(starts - begin, counts)
+    return rows, order[positions]
+
+
+def overlap_pairs(a, b):
+    """Overlapping pairs of boxes in arrays a (G, 4) and b (H, 4) as arrays of rows, columns and overlaps, sorted by row and column.
+
+    Overlaps are bit-identical to overlap_matrix, pairs not listed have overlap 0. Negative widths or heights are rejected by both."""
+
+    if len(a) * len(b) <= DENSE_PAIRS:
+        overlaps = overlap_matrix(a, b)
+        rows, columns = numpy.nonzero(overlaps > 0)
+        return rows, columns, overlaps[rows, columns]
+
+    rows, columns = intersecting_pairs(a, b)
+
+    # Sort by row and column
+    order = numpy.argsort(rows * len(b) + columns, kind="mergesort")
+    rows, columns = rows[order], columns[order]
+
+    # Same operations in the same order as overlap_matrix, on pairs only
+    ax, ay, aw, ah = a[rows, 0], a[rows, 1], a[rows, 2], a[rows, 3]
+    bx, by, bw, bh = b[columns, 0], b[columns, 1], b[columns, 2], b[columns, 3]
+    ix = numpy.maximum(ax, bx)
+    iy = numpy.maximum(ay, by)
+    iw = numpy.maximum(0, numpy.minimum(ax + aw, bx + bw) - ix)
+    ih = numpy.maximum(0, numpy.minimum(ay + ah, by + bh) - iy)
+    ia = iw * ih
+    union = aw * ah + bw * bh - ia
+
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        overlaps = ia / union
+    overlaps[union == 0] = 0.0
+
+    overlapping = overlaps > 0
+    return rows[overlapping], columns[overlapping], overlaps[overlapping]
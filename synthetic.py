@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+
+import math
+import random
+
+
+def generate(seed=0, frames=1000, objects=20, density=0.2, switch_rate=0.01, dco_fraction=0.1, jitter=0.0003, miss_rate=0.05, false_positive_rate=0.05, frame_rate=25.0):
+    """Seeded synthetic ground truth and hypotheses as dicts of class video, see groundtruth.json and hypotheses.json.
+
+    objects move linearly through a square scene, whose size is chosen such that boxes cover density of its area.
+    Higher density means more overlapping boxes. The tracker switches the hypothesis id of an object with probability switch_rate per frame,
+    misses an object with probability miss_rate and adds a false positive with probability false_positive_rate per object.
+    Ground truths are DCO with probability dco_fraction. Hypotheses timestamps deviate by at most jitter seconds."""
+
+    rnd = random.Random(seed)
+
+    mean_size = 40.0
+    side = math.sqrt(objects * mean_size * mean_size / density)
+
+    def newObject(gt_id, hypo_id):
+        return {
+            "id": gt_id,
+            "hypo_id": hypo_id,
+            "x": rnd.uniform(0, side),
+            "y": rnd.uniform(0, side),
+            "vx": rnd.uniform(-2, 2),
+            "vy": rnd.uniform(-2, 2),
+            "width": rnd.uniform(0.5, 1.5) * mean_size,
+            "height": rnd.uniform(0.5, 1.5) * mean_size,
+        }
+
+    tracks = [newObject("gt%d" % k, "hypo%d" % k) for k in range(objects)]
+    next_id = objects
+
+    gt_frames = []
+    hypo_frames = []
+
+    for num in range(frames):
+        timestamp = num / frame_rate
+        annotations = []
+        hypotheses = []
+
+        for track in tracks:
+            # Move, bounce off the scene borders
+            for axis, speed in (("x", "vx"), ("y", "vy")):
+                track[axis] += track[speed]
+                if not 0 <= track[axis] <= side:
+                    track[speed] = -track[speed]
+
+            annotation = {
+                "id": track["id"],
+                "x": track["x"],
+                "y": track["y"],
+                "width": track["width"],
+                "height": track["height"],
+            }
+            if rnd.random() < dco_fraction:
+                annotation["dco"] = True
+            annotations.append(annotation)
+
+            if rnd.random() < switch_rate:
+                track["hypo_id"] = "hypo%d" % next_id
+                next_id += 1
+
+            if rnd.random() >= miss_rate:
+                hypotheses.append({
+                    "id": track["hypo_id"],
+                    "x": track["x"] + rnd.gauss(0, 2),
+                    "y": track["y"] + rnd.gauss(0, 2),
+                    "width": track["width"] + rnd.gauss(0, 2),
+                    "height": track["height"] + rnd.gauss(0, 2),
+                })
+
+            if rnd.random() < false_positive_rate:
+                hypotheses.append({
+                    "id": "hypo%d" % next_id,
+                    "x": rnd.uniform(0, side),
+                    "y": rnd.uniform(0, side),
+                    "width": mean_size,
+                    "height": mean_size,
+                })
+                next_id += 1
+
+        gt_frames.append({"class": "frame", "timestamp": timestamp, "num": num, "annotations": annotations})
+        hypo_frames.append({"class": "frame", "timestamp": timestamp + rnd.uniform(-jitter, jitter), "num": num, "hypotheses": hypotheses})
+
+    groundtruth = {"class": "video", "filename": "synthetic-%d" % seed, "frames": gt_frames}
+    hypotheses = {"class": "video", "filename": "synthetic-%d" % seed, "frames": hypo_frames}
+    return groundtruth, hypotheses
+
+
+def MOT_groundtruth_lines(groundtruth):
+    """Ground truth in MOT text format, see importers.MOT_groundtruth_import"""
+
+    lines = []
+    for frame in groundtruth["frames"]:
+        values = ["%.6f" % frame["timestamp"]]
+        for annotation in frame["annotations"]:
+            width, height = annotation["width"], annotation["height"]
+            features = ["-1"] * 6 if annotation.get("dco", False) else ["1"] * 6 # DCO unless two features found
+            values.append("%s 0 0 %.6f %.6f %.6f %.6f %s" % (annotation["id"], annotation["x"] + width / 2, annotation["y"] + height / 2, width, height, " ".join(features)))
+        lines.append(" ".join(values) + "\n")
+    return lines
+
+
+def MOT_hypo_lines(hypotheses):
+    """Hypotheses in MOT text format, see importers.MOT_hypo_import"""
+
+    lines = []
+    for frame in hypotheses["frames"]:
+        values = ["%.6f" % frame["timestamp"]]
+        for hypothesis in frame["hypotheses"]:
+            values.append("%s %.6f %.6f %.6f %.6f" % (hypothesis["id"], hypothesis["x"], hypothesis["y"], hypothesis["x"] + hypothesis["width"], hypothesis["y"] + hypothesis["height"]))
+        lines.append(" ".join(values) + "\n")
+    return lines
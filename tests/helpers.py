@@ -0,0 +1,36 @@
+import os
+import sys
+import json
+
+# Tests import the modules of the repository root
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+sys.path.insert(0, ROOT)
+
+import synthetic
+from framestore import FrameStore
+
+
+def sample_dicts():
+    """Ground truth and hypotheses dicts of the bundled sample files"""
+    groundtruth = json.load(open(os.path.join(ROOT, "groundtruth.json")))[0]
+    hypotheses = json.load(open(os.path.join(ROOT, "hypotheses.json")))[0]
+    return groundtruth, hypotheses
+
+
+def sample_stores():
+    """Ground truth and hypotheses FrameStores of the bundled sample files"""
+    groundtruth, hypotheses = sample_dicts()
+    return FrameStore.fromDict(groundtruth, "annotations"), FrameStore.fromDict(hypotheses, "hypotheses")
+
+
+def synthetic_dicts(frames=300, objects=20, **workload):
+    """Seeded synthetic ground truth and hypotheses dicts with dense boxes and frequent id switches, see synthetic.generate"""
+    workload.setdefault("density", 0.3)
+    workload.setdefault("switch_rate", 0.05)
+    return synthetic.generate(frames=frames, objects=objects, **workload)
+
+
+def synthetic_stores(frames=300, objects=20, **workload):
+    """FrameStores of synthetic_dicts"""
+    groundtruth, hypotheses = synthetic_dicts(frames, objects, **workload)
+    return FrameStore.fromDict(groundtruth, "annotations"), FrameStore.fromDict(hypotheses, "hypotheses")
@@ -0,0 +1,52 @@
+import unittest
+
+from helpers import synthetic_dicts
+from pymot import MOTEvaluation
+
+
+COUNTS = ["misses", "false positives", "mismatches", "recoverable mismatches", "non-recoverable mismatches", "correspondences"]
+
+# Counts of previous versions of pymot (munkres package on the dense cost matrix of each frame)
+# for synthetic_dicts(200, seed=seed, density=0.2, switch_rate=0.01)
+PREVIOUS_COUNTS = {
+    4: [181, 197, 43, 43, 2, 3789],
+    22: [199, 192, 37, 37, 2, 3779],
+    25: [200, 217, 41, 41, 3, 3773],
+}
+
+# Counts of the optimal assignments for the same sequences
+OPTIMAL_COUNTS = {
+    4: [181, 197, 42, 42, 0, 3789],
+    22: [198, 191, 34, 34, 0, 3780],
+    25: [200, 217, 39, 39, 0, 3773],
+}
+
+
+def counts(seed, solver):
+    groundtruth, hypotheses = synthetic_dicts(200, seed=seed, density=0.2, switch_rate=0.01)
+    evaluation = MOTEvaluation(groundtruth, hypotheses, solver)
+    evaluation.evaluate()
+    statistics = evaluation.getAbsoluteStatistics()
+    return [statistics[name] for name in COUNTS]
+
+
+class MunkresTest(unittest.TestCase):
+    """The munkres solver gives the counts of previous versions"""
+
+    def testPreviousCounts(self):
+        for seed, expected in sorted(PREVIOUS_COUNTS.items()):
+            self.assertEqual(counts(seed, "munkres"), expected)
+
+
+class OptimalSolverTest(unittest.TestCase):
+    """The other solvers find optimal assignments, where munkres does not, and thus give other counts than previous versions"""
+
+    def testOptimalCounts(self):
+        for solver in ("auto", "jv", "scipy"):
+            for seed, expected in sorted(OPTIMAL_COUNTS.items()):
+                self.assertNotEqual(expected, PREVIOUS_COUNTS[seed])
+                self.assertEqual(counts(seed, solver), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import os
+import json
+import shutil
+import tempfile
+import unittest
+
+from helpers import synthetic_dicts
+from batch import BatchEvaluation
+from batch import TrackerEvaluation
+from batch import findSequences
+from pymot import MOTEvaluation
+
+
+def statistics(groundtruth, hypotheses):
+    evaluation = MOTEvaluation(groundtruth, hypotheses)
+    evaluation.evaluate()
+    return evaluation.getAbsoluteStatistics()
+
+
+class BatchTest(unittest.TestCase):
+    """Sequences and trackers evaluated in batches give the statistics of separate evaluations"""
+
+    def setUp(self):
+        self.directory_ = tempfile.mkdtemp()
+        self.groundtruth_dir_ = os.path.join(self.directory_, "groundtruth")
+        self.hypotheses_dir_ = os.path.join(self.directory_, "hypotheses")
+        os.mkdir(self.groundtruth_dir_)
+        os.mkdir(self.hypotheses_dir_)
+
+        # Sequences and their separately evaluated statistics
+        self.expected_ = []
+        for seed in range(3):
+            name = "sequence%d.json" % seed
+            groundtruth, hypotheses = synthetic_dicts(100, seed=seed)
+            json.dump([groundtruth], open(os.path.join(self.groundtruth_dir_, name), "w"))
+            json.dump([hypotheses], open(os.path.join(self.hypotheses_dir_, name), "w"))
+            self.expected_.append((name, statistics(groundtruth, hypotheses)))
+
+        # Hypotheses without ground truth are left out
+        json.dump([hypotheses], open(os.path.join(self.hypotheses_dir_, "unknown.json"), "w"))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory_)
+
+    def testFindSequences(self):
+        sequences = findSequences(self.groundtruth_dir_, self.hypotheses_dir_)
+        self.assertEqual([name for name, groundtruth_file, hypotheses_file in sequences], [name for name, abs_stats in self.expected_])
+        for name, groundtruth_file, hypotheses_file in sequences:
+            self.assertEqual(groundtruth_file, os.path.join(self.groundtruth_dir_, name))
+            self.assertEqual(hypotheses_file, os.path.join(self.hypotheses_dir_, name))
+
+    def testSequences(self):
+        for processes in (1, 2):
+            batch = BatchEvaluation(findSequences(self.groundtruth_dir_, self.hypotheses_dir_), processes)
+            batch.evaluate()
+            self.assertEqual(batch.getSequenceStatistics(), self.expected_)
+
+            total = batch.getAbsoluteStatistics()
+            for key in ("ground truths", "misses", "false positives", "mismatches", "correspondences"):
+                self.assertEqual(total[key], sum(abs_stats[key] for name, abs_stats in self.expected_))
+
+    def testTrackers(self):
+        # Each hypotheses file as a tracker of the first ground truth
+        groundtruth_file = os.path.join(self.groundtruth_dir_, self.expected_[0][0])
+        hypotheses_files = [os.path.join(self.hypotheses_dir_, name) for name, abs_stats in self.expected_]
+        groundtruth = json.load(open(groundtruth_file))[0]
+        expected = [statistics(groundtruth, json.load(open(hypotheses_file))[0]) for hypotheses_file in hypotheses_files]
+
+        for processes in (1, 2):
+            trackers = TrackerEvaluation(groundtruth_file, hypotheses_files, processes)
+            self.assertEqual(trackers.checkGroundTruth()["problems"], {})
+            trackers.evaluate()
+            self.assertEqual([(hypotheses_file, abs_stats) for hypotheses_file, abs_stats, report in trackers.getTrackerStatistics()], zip(hypotheses_files, expected))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+
+import numpy
+
+from helpers import synthetic_dicts
+from bootstrap import FRAME_STATISTICS
+from bootstrap import blockBootstrap
+from bootstrap import bootstrapIntervals
+from pymot import MOTEvaluation
+
+
+def resample(frame_statistics, samples, block_length, seed):
+    """Sums of resampled sequences of blockBootstrap, drawn block by block"""
+    frames = len(frame_statistics)
+    blocks = -(-frames // block_length)
+    lengths = [block_length] * (blocks - 1) + [frames - (blocks - 1) * block_length]
+
+    random = numpy.random.RandomState(seed)
+    positions = random.random_sample((samples, blocks))
+    sums = numpy.zeros((samples, frame_statistics.shape[1]))
+    for s in range(samples):
+        for b, length in enumerate(lengths):
+            start = int(positions[s, b] * (frames - length + 1))
+            sums[s] += frame_statistics[start:start + length].sum(axis=0)
+    return sums
+
+
+class BootstrapTest(unittest.TestCase):
+    """Confidence intervals from per-frame statistics"""
+
+    def setUp(self):
+        self.evaluation_ = MOTEvaluation(*synthetic_dicts())
+        self.evaluation_.evaluate()
+
+    def testFrameStatistics(self):
+        statistics = self.evaluation_.getFrameStatistics()
+        absolute = self.evaluation_.getAbsoluteStatistics()
+        for name in FRAME_STATISTICS:
+            self.assertAlmostEqual(statistics[name].sum(), absolute[name], places=6)
+
+    def testBlocks(self):
+        statistics = self.evaluation_.getFrameStatistics()
+        values = numpy.column_stack([statistics[name] for name in FRAME_STATISTICS])
+        for block_length in (1, 7, 300):
+            self.assertTrue(numpy.allclose(blockBootstrap(values, 50, block_length, seed=3), resample(values, 50, block_length, 3)))
+
+    def testIntervals(self):
+        intervals = self.evaluation_.getConfidenceIntervals(500, seed=1)
+        self.assertEqual(intervals, self.evaluation_.getConfidenceIntervals(500, seed=1))
+        for name, value in (("MOTA", self.evaluation_.getMOTA()), ("MOTP", self.evaluation_.getMOTP())):
+            lower, upper = intervals[name]
+            self.assertTrue(lower < value < upper)
+
+        # A single block is the whole sequence
+        for name, value in (("MOTA", self.evaluation_.getMOTA()), ("MOTP", self.evaluation_.getMOTP())):
+            lower, upper = self.evaluation_.getConfidenceIntervals(10, block_length=300, seed=1)[name]
+            self.assertAlmostEqual(lower, value, places=9)
+            self.assertAlmostEqual(upper, value, places=9)
+
+    def testNoCorrespondences(self):
+        values = numpy.zeros((10, len(FRAME_STATISTICS)))
+        values[:, FRAME_STATISTICS.index("ground truths")] = 2
+        values[:, FRAME_STATISTICS.index("misses")] = 1
+        intervals = bootstrapIntervals(values, 20, seed=0)
+        self.assertEqual(intervals["MOTA"], (0.5, 0.5))
+        self.assertEqual(intervals["MOTP"], (None, None))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import os
+import unittest
+
+from helpers import ROOT
+from importers import CLEAR_3d_import
+from clear3d import CLEAR3dEvaluation
+
+
+def sample_lines(name):
+    with open(os.path.join(ROOT, "3d", name)) as fp:
+        return fp.readlines()
+
+
+def statistics(groundtruth_lines, hypotheses_lines):
+    """Absolute statistics of clear3d, with the total distance rounded like MOTscore.pl prints it"""
+    evaluation = CLEAR3dEvaluation(CLEAR_3d_import(groundtruth_lines, "annotations"), CLEAR_3d_import(hypotheses_lines, "hypotheses"))
+    evaluation.evaluate()
+    absolute = evaluation.getAbsoluteStatistics()
+    absolute["total distance"] = int(round(absolute["total distance"]))
+    return absolute
+
+
+def totals(ground_truths, correspondences, failed_correspondences, distance, misses, false_positives, mismatches):
+    """Absolute statistics from the ABS TOTALS line of MOTscore.pl"""
+    return {
+        "ground truths": ground_truths,
+        "correspondences": correspondences,
+        "failed correspondences": failed_correspondences,
+        "total distance": distance,
+        "misses": misses,
+        "false positives": false_positives,
+        "mismatches": mismatches,
+    }
+
+
+def end_line(lines):
+    """Line without hypotheses after the last line, see testSample"""
+    return "%.6f\n" % (float(lines[-1].split()[0]) + 100.0)
+
+
+class MOTscoreTest(unittest.TestCase):
+    """clear3d gives the ABS TOTALS of MOTscore.pl (perl -I. MOTscore.pl GroundTruth_A.txt HYPOTHESES no)"""
+
+    def testSample(self):
+        groundtruth, hypotheses = sample_lines("GroundTruth_A.txt"), sample_lines("Hypos_A.txt")
+
+        # MOTscore.pl never matches the last hypotheses line, and counts corr 218, miss 14 for Hypos_A.txt.
+        # With an empty line appended, it matches all lines of Hypos_A.txt.
+        expected = totals(232, 220, 12, 51132, 12, 12, 0)
+        self.assertEqual(statistics(groundtruth, hypotheses + [end_line(hypotheses)]), expected)
+        self.assertEqual(statistics(groundtruth, hypotheses), expected)
+
+    def testClosestHypothesesFrame(self):
+        groundtruth, hypotheses = sample_lines("GroundTruth_A.txt"), sample_lines("Hypos_A.txt")
+
+        # Two hypotheses frames per second: each frame 0.2s early, and 0.1s late with other ids, moved by 300mm
+        frequent = []
+        for line in hypotheses:
+            fields = line.split()
+            timestamp = float(fields[0])
+            objects = [fields[k:k + 4] for k in range(1, len(fields), 4)]
+            moved = [["h" + id, "%.6f" % (float(x) + 300.0), y, z] for id, x, y, z in objects]
+            frequent.append(" ".join(["%.6f" % (timestamp - 0.2)] + sum(objects, [])) + "\n")
+            frequent.append(" ".join(["%.6f" % (timestamp + 0.1)] + sum(moved, [])) + "\n")
+        frequent.append(end_line(frequent))
+
+        self.assertEqual(statistics(groundtruth, frequent), totals(232, 171, 61, 51949, 61, 61, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+import os
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+import subprocess
+from StringIO import StringIO
+
+from helpers import ROOT
+from helpers import sample_dicts
+from pymot import MOTEvaluation
+from tracing import DiffLogSink
+
+
+def pymot(*options):
+    """Exit code, stdout and stderr of pymot.py with options"""
+    process = subprocess.Popen([sys.executable, os.path.join(ROOT, "pymot.py")] + list(options), stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    out, err = process.communicate()
+    return process.returncode, out, err
+
+
+class OutputFilesTest(unittest.TestCase):
+    """Output files are complete, also if pymot.py stops early"""
+
+    def setUp(self):
+        self.directory_ = tempfile.mkdtemp()
+        self.options_ = ["-a", os.path.join(ROOT, "groundtruth.json"), "-b", os.path.join(ROOT, "hypotheses.json")]
+
+    def tearDown(self):
+        shutil.rmtree(self.directory_)
+
+    def testVisualDebug(self):
+        evaluation = MOTEvaluation(*sample_dicts())
+        evaluation.enableVisualDebug()
+        evaluation.evaluate()
+        expected = json.loads(json.dumps(evaluation.getVisualDebug()))[0]["frames"]
+
+        visual_debug_file = os.path.join(self.directory_, "visual_debug.json")
+        code, out, err = pymot(*(self.options_ + ["-v", visual_debug_file]))
+        self.assertEqual(code, 0, err)
+        self.assertEqual(json.load(open(visual_debug_file))[0]["frames"], expected)
+
+    def testVisualDebugThresholds(self):
+        # Threshold sweeps exit early and write no frames
+        visual_debug_file = os.path.join(self.directory_, "visual_debug.json")
+        code, out, err = pymot(*(self.options_ + ["-t", "0.2", "0.5", "-v", visual_debug_file]))
+        self.assertEqual(code, 0, err)
+        self.assertIn("Overlap threshold 0.50", out)
+        self.assertEqual(json.load(open(visual_debug_file))[0]["frames"], [])
+
+    def testDiffLog(self):
+        evaluation = MOTEvaluation(*sample_dicts())
+        expected = StringIO()
+        evaluation.addTraceSink(DiffLogSink(expected))
+        evaluation.evaluate()
+
+        diff_log_file = os.path.join(self.directory_, "diff.log")
+        for options in ([], ["-s"]):
+            code, out, err = pymot(*(self.options_ + options + ["-d", diff_log_file]))
+            self.assertEqual(code, 0, err)
+            self.assertEqual(open(diff_log_file).read(), expected.getvalue())
+
+    def testDiffLogThresholds(self):
+        # Threshold sweeps exit early and trace no events
+        diff_log_file = os.path.join(self.directory_, "diff.log")
+        code, out, err = pymot(*(self.options_ + ["-t", "0.2", "0.5", "-d", diff_log_file]))
+        self.assertEqual(code, 0, err)
+        self.assertEqual(open(diff_log_file).read(), "")
+
+
+class MultipleTrackersTest(unittest.TestCase):
+    """Several hypotheses files are each evaluated against the ground truth"""
+
+    def setUp(self):
+        self.directory_ = tempfile.mkdtemp()
+        self.groundtruth_file_ = os.path.join(ROOT, "groundtruth.json")
+        self.hypotheses_files_ = []
+        for name in ("tracker1.json", "tracker2.json"):
+            self.hypotheses_files_.append(os.path.join(self.directory_, name))
+            shutil.copy(os.path.join(ROOT, "hypotheses.json"), self.hypotheses_files_[-1])
+
+    def tearDown(self):
+        shutil.rmtree(self.directory_)
+
+    def testStatistics(self):
+        evaluation = MOTEvaluation(*sample_dicts())
+        evaluation.evaluate()
+        expected = evaluation.getAbsoluteStatistics()
+
+        code, out, err = pymot("-a", self.groundtruth_file_, "-b", *self.hypotheses_files_)
+        self.assertEqual(code, 0, err)
+        statistics = json.loads(out.split("Absolute statistics\n", 1)[1])
+        self.assertEqual(sorted(statistics), sorted(self.hypotheses_files_))
+        for found in statistics.values():
+            self.assertAlmostEqual(found.pop("total overlap"), expected["total overlap"], places=6)
+            self.assertEqual(found, dict((name, value) for name, value in expected.items() if name != "total overlap"))
+
+    def testUnsupportedOptions(self):
+        for options in (["-v", "debug.json"], ["-d", "diff.log"], ["-t", "0.2", "0.5"], ["-s"], ["--shards", "2"], ["-p"], ["--bootstrap", "10"]):
+            code, out, err = pymot(*(["-a", self.groundtruth_file_, "-b"] + self.hypotheses_files_ + options))
+            self.assertEqual(code, 2)
+            self.assertIn("%s is not supported with multiple hypotheses files" % options[0], err)
+            self.assertEqual(out, "")
+
+    def testBrokenGroundTruth(self):
+        groundtruth = json.load(open(self.groundtruth_file_))
+        groundtruth[0]["frames"][1]["annotations"][0]["id"] = groundtruth[0]["frames"][1]["annotations"][1]["id"]
+        self.groundtruth_file_ = os.path.join(self.directory_, "groundtruth.json")
+        json.dump(groundtruth, open(self.groundtruth_file_, "w"))
+
+        # Ground truth is checked before any hypotheses file is read
+        code, out, err = pymot("-a", self.groundtruth_file_, "-b", self.hypotheses_files_[0], os.path.join(self.directory_, "missing.json"))
+        self.assertNotIn("Traceback", err)
+        self.assertIn("Stopping", err)
+        self.assertNotIn("Absolute statistics", out)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import os
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+import subprocess
+
+from helpers import ROOT
+from formatchecker import FormatChecker
+from importers import groundtruth_import
+from importers import hypo_import
+
+
+class IncompleteBoxesTest(unittest.TestCase):
+    """Incomplete boxes of json files are reported, not raised while importing"""
+
+    def setUp(self):
+        self.directory_ = tempfile.mkdtemp()
+
+        groundtruth = json.load(open(os.path.join(ROOT, "groundtruth.json")))
+        del groundtruth[0]["frames"][1]["annotations"][0]["width"]
+        self.groundtruth_file_ = os.path.join(self.directory_, "groundtruth.json")
+        json.dump(groundtruth, open(self.groundtruth_file_, "w"))
+
+        hypotheses = json.load(open(os.path.join(ROOT, "hypotheses.json")))
+        frame = [frame for frame in hypotheses[0]["frames"] if frame["hypotheses"]][1]
+        del frame["hypotheses"][0]["id"]
+        self.hypotheses_file_ = os.path.join(self.directory_, "hypotheses.json")
+        json.dump(hypotheses, open(self.hypotheses_file_, "w"))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory_)
+
+    def testFrameStores(self):
+        checker = FormatChecker(groundtruth_import(self.groundtruth_file_), hypo_import(self.hypotheses_file_))
+        report = checker.check()
+        self.assertEqual(report["groundtruth"]["problems"], {"missing width": 1})
+        self.assertEqual(report["hypotheses"]["problems"], {"missing id": 1})
+        self.assertFalse(checker.ok())
+
+    def testCommandLine(self):
+        for options in ([], ["-s"], ["--cache_dir", os.path.join(self.directory_, "cache")]):
+            process = subprocess.Popen([sys.executable, os.path.join(ROOT, "pymot.py"), "-a", self.groundtruth_file_, "-b", self.hypotheses_file_] + options, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            out, err = process.communicate()
+            self.assertNotIn("Traceback", err)
+            self.assertIn("1 boxes with missing width in ground truth", err)
+            self.assertIn("1 boxes with missing id in hypotheses", err)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from helpers import ROOT
+from framecache import ARRAYS
+from framecache import FrameCache
+from importers import IMPORTER_VERSION
+from importers import groundtruth_import
+from importers import hypo_import
+
+
+# Hypotheses in MOT text format: timestamp, then id and corners of each box
+MOT_HYPOTHESES = "0.0 1 10 10 20 20 2 30 30 40 40\n1.0 1 11 11 21 21\n"
+
+
+class FrameCacheTest(unittest.TestCase):
+    """Cached imports equal uncached imports, and changed files, formats and importers miss the cache"""
+
+    def setUp(self):
+        self.directory_ = tempfile.mkdtemp()
+        self.cache_dir_ = os.path.join(self.directory_, "cache")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory_)
+
+    def write(self, name, content):
+        filename = os.path.join(self.directory_, name)
+        with open(filename, "w") as fp:
+            fp.write(content)
+        return filename
+
+    def entries(self):
+        return sorted(name for name in os.listdir(self.cache_dir_) if not name.startswith("."))
+
+    def assertSameStore(self, found, expected):
+        self.assertEqual(found.key_, expected.key_)
+        for name in ARRAYS:
+            self.assertEqual(getattr(found, name + "_").tolist(), getattr(expected, name + "_").tolist())
+        self.assertEqual(found.ids_, expected.ids_)
+        self.assertEqual(found.filename_, expected.filename_)
+        self.assertEqual(found.problems_, expected.problems_)
+
+    def testHit(self):
+        for importer, filename in ((groundtruth_import, os.path.join(ROOT, "groundtruth.json")), (hypo_import, os.path.join(ROOT, "hypotheses.json")), (hypo_import, self.write("hypotheses.txt", MOT_HYPOTHESES))):
+            expected = importer(filename)
+            self.assertSameStore(importer(filename, cache_dir=self.cache_dir_), expected) # miss
+            self.assertSameStore(importer(filename, cache_dir=self.cache_dir_), expected) # hit
+        self.assertEqual(len(self.entries()), 3)
+
+    def testSameContent(self):
+        # Copies of a file share one entry
+        content = open(os.path.join(ROOT, "hypotheses.json")).read()
+        for name in ("a.json", "b.json"):
+            filename = self.write(name, content)
+            self.assertSameStore(hypo_import(filename, cache_dir=self.cache_dir_), hypo_import(filename))
+        self.assertEqual(len(self.entries()), 1)
+
+    def testFormat(self):
+        # The same content is imported by the importer of each file name
+        hypo_import(self.write("hypotheses.txt", MOT_HYPOTHESES), cache_dir=self.cache_dir_)
+        filename = self.write("hypotheses.json", MOT_HYPOTHESES)
+        self.assertRaises(ValueError, hypo_import, filename)
+        self.assertRaises(ValueError, hypo_import, filename, cache_dir=self.cache_dir_)
+
+    def testChangedFile(self):
+        filename = self.write("hypotheses.txt", MOT_HYPOTHESES)
+        hypo_import(filename, cache_dir=self.cache_dir_)
+
+        self.write("hypotheses.txt", MOT_HYPOTHESES + "2.0 1 12 12 22 22\n")
+        store = hypo_import(filename, cache_dir=self.cache_dir_)
+        self.assertEqual(store.timestamps_.tolist(), [0.0, 1.0, 2.0])
+        self.assertEqual(len(self.entries()), 2)
+
+    def testEntryPath(self):
+        filename = self.write("hypotheses.txt", MOT_HYPOTHESES)
+        cache = FrameCache(self.cache_dir_, IMPORTER_VERSION)
+        path = cache.entryPath(filename, "hypotheses", "mot")
+        self.assertNotEqual(path, cache.entryPath(filename, "annotations", "mot"))
+        self.assertNotEqual(path, cache.entryPath(filename, "hypotheses", "json"))
+        self.assertNotEqual(path, FrameCache(self.cache_dir_, IMPORTER_VERSION + 1).entryPath(filename, "hypotheses", "mot"))
+
+
+if __name__ == "__main__":
+    unittest.main()
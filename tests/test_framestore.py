@@ -0,0 +1,59 @@
+import unittest
+
+from helpers import sample_dicts
+from framestore import FrameStore
+from pymot import MOTEvaluation
+
+
+def box_values(box, key):
+    """Values of a box dict, which are stored by FrameStore, with the id as string"""
+    values = (box["x"], box["y"], box["width"], box["height"], str(box["id"]))
+    if key == "annotations":
+        values += (box.get("dco", False),)
+    return values
+
+
+class FrameStoreTest(unittest.TestCase):
+    """FrameStores keep the frames and boxes of dicts, with ids converted to strings"""
+
+    def testFromDict(self):
+        for video, key in zip(sample_dicts(), ("annotations", "hypotheses")):
+            video["frames"][0][key][0]["id"] = 42 # integer ids are converted to strings
+            store = FrameStore.fromDict(video, key)
+
+            self.assertEqual(len(store), len(video["frames"]))
+            self.assertEqual(store["filename"], video.get("filename"))
+            for frame, stored in zip(video["frames"], store["frames"]):
+                self.assertEqual(stored["timestamp"], frame["timestamp"])
+                self.assertEqual([box_values(box, key) for box in stored[key]], [box_values(box, key) for box in frame[key]])
+
+            # Dicts again
+            for frame, stored in zip(video["frames"], store.toDict()["frames"]):
+                self.assertEqual([box_values(box, key) for box in stored[key]], [box_values(box, key) for box in frame[key]])
+
+    def testEvaluation(self):
+        groundtruth, hypotheses = sample_dicts()
+        expected = MOTEvaluation(groundtruth, hypotheses)
+        expected.evaluate()
+
+        evaluation = MOTEvaluation(FrameStore.fromDict(groundtruth, "annotations"), FrameStore.fromDict(hypotheses, "hypotheses"))
+        evaluation.evaluate()
+        self.assertEqual(evaluation.getAbsoluteStatistics(), expected.getAbsoluteStatistics())
+
+
+class CompatibilityTest(unittest.TestCase):
+    """Attributes and methods of previous versions, which are kept for compatibility"""
+
+    def testVisualDebugFrames(self):
+        evaluation = MOTEvaluation(*sample_dicts())
+        self.assertEqual(evaluation.visualDebugFrames_, [])
+
+        evaluation.enableVisualDebug()
+        evaluation.convertIDsToString()
+        evaluation.evaluate()
+        self.assertTrue(len(evaluation.visualDebugFrames_) > 0)
+        self.assertEqual(evaluation.visualDebugFrames_, evaluation.getVisualDebug()[0]["frames"])
+
+
+if __name__ == "__main__":
+    unittest.main()
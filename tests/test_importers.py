@@ -0,0 +1,63 @@
+import random
+import unittest
+
+from importers import MOT_groundtruth_import
+from importers import MOT_hypo_import
+from importers import MOT_groundtruth_frames
+from importers import MOT_hypo_frames
+
+
+def mot_lines(seed, frames=50, objects=8):
+    """Seeded ground truth and hypotheses lines in MOT text format, with empty lines, frames without boxes and ignored annotations"""
+
+    generator = random.Random(seed)
+    groundtruth, hypotheses = [], []
+    for k in range(frames):
+        g, h = ["%.2f" % (k * 0.04)], ["%.2f" % (k * 0.04)]
+        for o in range(generator.randint(0, objects)):
+            cx, cy, w, height = generator.uniform(-20, 600), generator.uniform(-20, 400), generator.uniform(10, 80), generator.uniform(10, 80)
+            if generator.random() < 0.05:
+                cx, cy = -1, -1
+            features = [generator.choice([-1, 1.5]) for f in range(6)]
+            g += [str(o), "0", "0", "%.6f" % cx, "%.6f" % cy, "%.6f" % w, "%.6f" % height] + [repr(v) for v in features]
+            x, y = cx - w / 2 + generator.gauss(0, 3), cy - height / 2 + generator.gauss(0, 3)
+            h += [str(o + 100), "%.6f" % x, "%.6f" % y, "%.6f" % (x + w), "%.6f" % (y + height)]
+        groundtruth.append(" ".join(g) + "\n")
+        hypotheses.append("\t".join(h) + "\n")
+        if k % 10 == 0:
+            groundtruth.append("\n")
+            hypotheses.append("  \n")
+    return groundtruth, hypotheses
+
+
+class MOTImportTest(unittest.TestCase):
+    """Bulk parsed MOT files give the same frames as parsing line by line"""
+
+    def assertSameFrames(self, store, frames):
+        frames = list(frames)
+        self.assertEqual(len(store), len(frames))
+        for k, frame in enumerate(frames):
+            self.assertEqual(store.frame(k).timestamp_, frame.timestamp_)
+            self.assertEqual(store.frame(k).boxes(), frame.boxes())
+
+    def testGroundTruth(self):
+        for seed in range(5):
+            groundtruth, hypotheses = mot_lines(seed)
+            self.assertSameFrames(MOT_groundtruth_import(groundtruth, columnar=True), MOT_groundtruth_frames(groundtruth))
+            self.assertEqual(MOT_groundtruth_import(groundtruth), MOT_groundtruth_import(groundtruth, columnar=True).toDict())
+
+    def testHypotheses(self):
+        for seed in range(5):
+            groundtruth, hypotheses = mot_lines(seed)
+            self.assertSameFrames(MOT_hypo_import(hypotheses, columnar=True), MOT_hypo_frames(hypotheses))
+            self.assertEqual(MOT_hypo_import(hypotheses), MOT_hypo_import(hypotheses, columnar=True).toDict())
+
+    def testMalformed(self):
+        groundtruth, hypotheses = mot_lines(0)
+        hypotheses[2] = hypotheses[2].rstrip() + " 1.0\n"
+        self.assertRaises(AssertionError, MOT_hypo_import, hypotheses)
+        self.assertRaises(AssertionError, list, MOT_hypo_frames(hypotheses))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import math
+import unittest
+
+from helpers import sample_dicts
+from helpers import synthetic_stores
+from rect import Rect
+from kernels import CostKernel
+from kernels import IoUKernel
+from kernels import CentroidDistanceKernel
+from kernels import PointDistanceKernel
+from pymot import MOTEvaluation
+
+
+def rect(box):
+    return Rect({"x": box[0], "y": box[1], "width": box[2], "height": box[3], "id": ""})
+
+
+def centre(box):
+    return (box[0] + box[2] / 2, box[1] + box[3] / 2)
+
+
+def distance(a, b):
+    return math.sqrt(sum((u - v) ** 2 for u, v in zip(a, b)))
+
+
+# Per-pair value of the kernels, as computed before kernels were vectorized
+PAIR_VALUES = [
+    (IoUKernel(), lambda a, b: rect(a).overlap(rect(b)), [0.05, 0.2, 0.5]),
+    (CentroidDistanceKernel(), lambda a, b: distance(centre(a), centre(b)), [5.0, 50.0, 400.0]),
+    (PointDistanceKernel(2), lambda a, b: distance(a[:2], b[:2]), [5.0, 50.0, 400.0]),
+]
+
+
+class DenseKernel(CostKernel):
+    """Kernel, which lists all pairs of a frame, regardless of the threshold"""
+
+    def __init__(self, kernel):
+        self.kernel_ = kernel
+        self.default_threshold = kernel.default_threshold
+        self.missing = kernel.missing
+
+    def matrix(self, a, b):
+        return self.kernel_.matrix(a, b)
+
+    def qualifies(self, values, threshold):
+        return self.kernel_.qualifies(values, threshold)
+
+    def costs(self, values):
+        return self.kernel_.costs(values)
+
+    def pairs(self, a, b, threshold=None):
+        return CostKernel.pairs(self, a, b)
+
+
+class KernelPairsTest(unittest.TestCase):
+    """Candidate pairs of the kernels equal the pairs, which qualify by their per-pair values"""
+
+    def testDenseFrames(self):
+        groundtruth, hypotheses = synthetic_stores(5, 60)
+        for k in range(len(groundtruth)):
+            a, b = groundtruth.frame(k).boxes_, hypotheses.frame(k).boxes_
+            self.assertTrue(len(a) * len(b) > 1024) # sort and sweep
+
+            for kernel, value, thresholds in PAIR_VALUES:
+                for threshold in thresholds:
+                    expected = {}
+                    for i in range(len(a)):
+                        for j in range(len(b)):
+                            v = value(a[i].tolist(), b[j].tolist())
+                            if kernel.qualifies(v, threshold):
+                                expected[(i, j)] = v
+
+                    pairs = kernel.pairs(a, b, threshold)
+                    rows, columns, values = kernel.candidates(a, b, pairs, threshold)
+                    found = dict(zip(zip(rows.tolist(), columns.tolist()), values.tolist()))
+                    self.assertEqual(sorted(found), sorted(expected))
+                    for pair, v in expected.items():
+                        self.assertAlmostEqual(found[pair], v, places=9)
+
+                    # Sorted by row and column, and values identical to the matrix
+                    keys = (rows * len(b) + columns).tolist()
+                    self.assertEqual(keys, sorted(keys))
+                    self.assertEqual(values.tolist(), kernel.matrix(a, b)[rows, columns].tolist())
+
+
+class KernelEvaluationTest(unittest.TestCase):
+    """Evaluations with the kernels give the same statistics as with all pairs of each frame"""
+
+    def assertSameStatistics(self, groundtruth, hypotheses):
+        for kernel, value, thresholds in PAIR_VALUES:
+            for threshold in thresholds:
+                evaluation = MOTEvaluation(groundtruth, hypotheses)
+                evaluation.setCostKernel(kernel, threshold)
+                evaluation.evaluate()
+
+                dense = MOTEvaluation(groundtruth, hypotheses)
+                dense.setCostKernel(DenseKernel(kernel), threshold)
+                dense.evaluate()
+
+                self.assertEqual(evaluation.getAbsoluteStatistics(), dense.getAbsoluteStatistics())
+
+    def testSample(self):
+        self.assertSameStatistics(*sample_dicts())
+
+    def testSynthetic(self):
+        self.assertSameStatistics(*synthetic_stores(20, 60))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+
+from helpers import synthetic_dicts
+from pymot import MOTEvaluation
+
+
+# Counts of previous versions of pymot for synthetic_dicts(seed=seed), with frequent id switches:
+# misses, false positives, mismatches, recoverable and non-recoverable mismatches, correspondences
+PREVIOUS_COUNTS = {
+    0: [266, 300, 273, 273, 5, 5706],
+    1: [241, 295, 287, 287, 2, 5724],
+}
+
+
+def inverse(mappings):
+    """Set of ground truth ids of each hypothesis id"""
+    result = {}
+    for gt_id, hypo_id in mappings.items():
+        result.setdefault(hypo_id, set()).add(gt_id)
+    return result
+
+
+class MappingTest(unittest.TestCase):
+    """The inverse mapping is kept up to date, and mismatches are counted as by previous versions"""
+
+    def testMapUnmap(self):
+        evaluation = MOTEvaluation()
+        evaluation.map("a", "1")
+        evaluation.map("b", "1")
+        evaluation.map("a", "2") # replaces mapping of a
+        self.assertEqual(evaluation.mappings_, {"a": "2", "b": "1"})
+        self.assertEqual(evaluation.mapped_gt_ids_, {"1": set(["b"]), "2": set(["a"])})
+
+        evaluation.unmap("b")
+        self.assertEqual(evaluation.mappings_, {"a": "2"})
+        self.assertEqual(evaluation.mapped_gt_ids_, {"2": set(["a"])})
+
+    def testCounts(self):
+        for seed, expected in sorted(PREVIOUS_COUNTS.items()):
+            evaluation = MOTEvaluation(*synthetic_dicts(seed=seed), solver="munkres")
+            evaluation.evaluate()
+            statistics = evaluation.getAbsoluteStatistics()
+            counts = [statistics[name] for name in ("misses", "false positives", "mismatches", "recoverable mismatches", "non-recoverable mismatches", "correspondences")]
+            self.assertEqual(counts, expected)
+            self.assertEqual(evaluation.mapped_gt_ids_, inverse(evaluation.mappings_))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+from StringIO import StringIO
+
+from helpers import sample_stores
+from helpers import synthetic_stores
+from kernels import CentroidDistanceKernel
+from pymot import MOTEvaluation
+from tracing import DiffLogSink
+
+
+def evaluation(groundtruth, hypotheses, kernel=None):
+    """Evaluation and its diff log"""
+    evaluation = MOTEvaluation(groundtruth, hypotheses)
+    if kernel is not None:
+        evaluation.setCostKernel(kernel, 30.0)
+    diff_log = StringIO()
+    evaluation.addTraceSink(DiffLogSink(diff_log))
+    return evaluation, diff_log
+
+
+class TwoPhaseTest(unittest.TestCase):
+    """Evaluation with frame geometry computed by a pool of processes gives the same results as serial evaluation"""
+
+    def assertSameResults(self, groundtruth, hypotheses, kernel=None):
+        serial, serial_log = evaluation(groundtruth, hypotheses, kernel)
+        serial.evaluate()
+
+        parallel, parallel_log = evaluation(groundtruth, hypotheses, kernel)
+        parallel.evaluate(2)
+
+        self.assertEqual(parallel.getAbsoluteStatistics(), serial.getAbsoluteStatistics())
+        self.assertEqual(parallel_log.getvalue(), serial_log.getvalue())
+
+    def testSample(self):
+        self.assertSameResults(*sample_stores())
+
+    def testSynthetic(self):
+        self.assertSameResults(*synthetic_stores())
+
+    def testDistanceKernel(self):
+        groundtruth, hypotheses = synthetic_stores()
+        self.assertSameResults(groundtruth, hypotheses, CentroidDistanceKernel())
+
+
+class ShardedTest(unittest.TestCase):
+    """Sharded evaluation gives the same counts, mapping and yin-yang maps as serial evaluation"""
+
+    def assertSameResults(self, groundtruth, hypotheses, shards):
+        serial = MOTEvaluation(groundtruth, hypotheses)
+        serial.evaluate()
+
+        sharded = MOTEvaluation(groundtruth, hypotheses)
+        sharded.evaluateSharded(shards, 2)
+
+        expected, found = serial.getAbsoluteStatistics(), sharded.getAbsoluteStatistics()
+        self.assertAlmostEqual(found.pop("total overlap"), expected.pop("total overlap"), places=6)
+        self.assertEqual(found, expected)
+        self.assertEqual(sharded.mappings_, serial.mappings_)
+        self.assertEqual(sharded.gt_map_, serial.gt_map_)
+        self.assertEqual(sharded.hypo_map_, serial.hypo_map_)
+
+        expected, found = serial.getFrameStatistics(), sharded.getFrameStatistics()
+        for name in ("misses", "false positives", "mismatches", "ground truths", "correspondences"):
+            self.assertEqual(found[name].tolist(), expected[name].tolist())
+
+    def testSample(self):
+        self.assertSameResults(*(sample_stores() + (3,)))
+
+    def testSynthetic(self):
+        groundtruth, hypotheses = synthetic_stores()
+        for shards in (2, 7, 50):
+            self.assertSameResults(groundtruth, hypotheses, shards)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+
+from helpers import sample_dicts
+from helpers import synthetic_dicts
+from pymot import MOTEvaluation
+
+
+def frame_pairs(groundtruth, hypotheses):
+    """Ground truth frames with their hypotheses frames (None, if there is none), as a running tracker would provide them"""
+    lookup = MOTEvaluation(groundtruth, hypotheses)
+    pairs = []
+    for frame in groundtruth["frames"]:
+        hypotheses_frame = lookup.get_hypotheses_frame(frame["timestamp"])
+        pairs.append((frame, hypotheses_frame if len(hypotheses_frame) > 0 else None))
+    return pairs
+
+
+class PushTest(unittest.TestCase):
+    """Frames pushed one at a time give the statistics of evaluating all frames"""
+
+    def assertSameStatistics(self, groundtruth, hypotheses):
+        expected = MOTEvaluation(groundtruth, hypotheses)
+        expected.evaluate()
+
+        evaluation = MOTEvaluation()
+        totals = {}
+        for frame, hypotheses_frame in frame_pairs(groundtruth, hypotheses):
+            delta = evaluation.push(frame, hypotheses_frame)
+            self.assertEqual(delta["timestamp"], frame["timestamp"])
+            self.assertEqual(delta["MOTA"], evaluation.getMOTA() if evaluation.total_groundtruths_ else None)
+            for name, attribute in MOTEvaluation.FRAME_COUNTERS:
+                totals[name] = totals.get(name, 0) + delta[name]
+
+        self.assertEqual(evaluation.getAbsoluteStatistics(), expected.getAbsoluteStatistics())
+        for name, attribute in MOTEvaluation.FRAME_COUNTERS:
+            self.assertAlmostEqual(totals[name], getattr(expected, attribute), places=6)
+
+    def testSample(self):
+        self.assertSameStatistics(*sample_dicts())
+
+    def testSynthetic(self):
+        self.assertSameStatistics(*synthetic_dicts())
+
+    def testSnapshot(self):
+        groundtruth, hypotheses = synthetic_dicts()
+        pairs = frame_pairs(groundtruth, hypotheses)
+
+        evaluation = MOTEvaluation()
+        for frame, hypotheses_frame in pairs[:150]:
+            evaluation.push(frame, hypotheses_frame)
+        state = evaluation.snapshot()
+
+        # An alternative continuation without hypotheses, then the actual one
+        for frame, hypotheses_frame in pairs[150:]:
+            evaluation.push(frame)
+        evaluation.restore(state)
+        for frame, hypotheses_frame in pairs[150:]:
+            evaluation.push(frame, hypotheses_frame)
+
+        expected = MOTEvaluation(groundtruth, hypotheses)
+        expected.evaluate()
+        self.assertEqual(evaluation.getAbsoluteStatistics(), expected.getAbsoluteStatistics())
+
+
+if __name__ == "__main__":
+    unittest.main()
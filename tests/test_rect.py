@@ -0,0 +1,59 @@
+import unittest
+
+import numpy
+
+from helpers import sample_dicts
+from rect import Rect
+from rect import boxes_to_array
+from rect import overlap_matrix
+from rect import overlap_pairs
+from rect import intersecting_pairs
+from pymot import MOTEvaluation
+
+
+def negative_sizes():
+    """Boxes of a frame with a negative width and a negative height"""
+    return [
+        {"x": 10.0, "y": 10.0, "width": -5.0, "height": 20.0, "id": "a"},
+        {"x": 10.0, "y": 10.0, "width": 5.0, "height": -20.0, "id": "b"},
+    ]
+
+
+class NegativeSizeTest(unittest.TestCase):
+    """Boxes with negative width or height are rejected like by Rect"""
+
+    def testRect(self):
+        for box in negative_sizes():
+            self.assertRaises(AssertionError, Rect, box)
+
+    def testBoxesToArray(self):
+        for box in negative_sizes():
+            self.assertRaises(AssertionError, boxes_to_array, [box])
+        self.assertEqual(boxes_to_array([dict(box, width=0.0, height=0.0) for box in negative_sizes()]).shape, (2, 4))
+
+    def testOverlapMatrix(self):
+        valid = numpy.array([[10.0, 10.0, 5.0, 20.0]])
+        for box in negative_sizes():
+            invalid = numpy.array([[box["x"], box["y"], box["width"], box["height"]]])
+            self.assertRaises(AssertionError, overlap_matrix, invalid, valid)
+            self.assertRaises(AssertionError, overlap_matrix, valid, invalid)
+
+    def testPairs(self):
+        # Enough boxes for sort and sweep, with one invalid box in either array
+        valid = numpy.array([[10.0 * k, 10.0, 5.0, 20.0] for k in range(40)])
+        for box in negative_sizes():
+            invalid = valid.copy()
+            invalid[17] = (box["x"], box["y"], box["width"], box["height"])
+            for function in (intersecting_pairs, overlap_pairs):
+                self.assertRaises(AssertionError, function, invalid, valid)
+                self.assertRaises(AssertionError, function, valid, invalid)
+
+    def testEvaluation(self):
+        groundtruth, hypotheses = sample_dicts()
+        groundtruth["frames"][1]["annotations"][0]["width"] = -1.0
+        evaluation = MOTEvaluation(groundtruth, hypotheses)
+        self.assertRaises(AssertionError, evaluation.evaluate)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import os
+import json
+import shutil
+import tempfile
+import unittest
+from StringIO import StringIO
+
+from helpers import ROOT
+from helpers import sample_dicts
+from helpers import synthetic_dicts
+from importers import JSON_frame_dicts
+from importers import JSON_groundtruth_frames
+from importers import JSON_hypo_frames
+from framestore import Frame
+from pipeline import evaluateFiles
+from pymot import MOTEvaluation
+from tracing import DiffLogSink
+
+
+def evaluate(groundtruth, hypotheses):
+    """Absolute statistics and diff log of an evaluation"""
+    evaluation = MOTEvaluation(groundtruth, hypotheses)
+    diff_log = StringIO()
+    evaluation.addTraceSink(DiffLogSink(diff_log))
+    evaluation.evaluate()
+    return evaluation.getAbsoluteStatistics(), diff_log.getvalue()
+
+
+class JSONFramesTest(unittest.TestCase):
+    """The incremental json parser yields the frames of json.load"""
+
+    def testChunks(self):
+        for name in ("groundtruth.json", "hypotheses.json"):
+            expected = json.load(open(os.path.join(ROOT, name)))[0]["frames"]
+            for chunk_size in (1, 7, 1 << 16):
+                self.assertEqual(list(JSON_frame_dicts(open(os.path.join(ROOT, name)), chunk_size)), expected)
+
+
+class StreamingTest(unittest.TestCase):
+    """Evaluation of streamed frames gives the same statistics and diff log as evaluation of stored frames"""
+
+    def setUp(self):
+        self.directory_ = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory_)
+
+    def write(self, groundtruth, hypotheses):
+        files = []
+        for name, video in (("groundtruth.json", groundtruth), ("hypotheses.json", hypotheses)):
+            files.append(os.path.join(self.directory_, name))
+            json.dump([video], open(files[-1], "w"))
+        return files
+
+    def assertSameResults(self, groundtruth, hypotheses):
+        expected = evaluate(groundtruth, hypotheses)
+
+        # Iterables of frames
+        groundtruth_frames = (Frame.fromDict(frame, "annotations") for frame in groundtruth["frames"])
+        hypotheses_frames = (Frame.fromDict(frame, "hypotheses") for frame in hypotheses["frames"])
+        self.assertEqual(evaluate(groundtruth_frames, hypotheses_frames), expected)
+
+        # Frames parsed incrementally from files
+        groundtruth_file, hypotheses_file = self.write(groundtruth, hypotheses)
+        self.assertEqual(evaluate(JSON_groundtruth_frames(open(groundtruth_file)), JSON_hypo_frames(open(hypotheses_file))), expected)
+
+        # Files read on background threads
+        streamed = evaluateFiles(groundtruth_file, hypotheses_file, stream=True)
+        self.assertEqual(streamed.getAbsoluteStatistics(), expected[0])
+
+    def testSample(self):
+        self.assertSameResults(*sample_dicts())
+
+    def testSynthetic(self):
+        self.assertSameResults(*synthetic_dicts())
+
+    def testUnordered(self):
+        groundtruth, hypotheses = synthetic_dicts(20)
+        hypotheses["frames"][3], hypotheses["frames"][4] = hypotheses["frames"][4], hypotheses["frames"][3]
+        hypotheses_frames = (Frame.fromDict(frame, "hypotheses") for frame in hypotheses["frames"])
+        evaluation = MOTEvaluation(groundtruth, hypotheses_frames)
+        self.assertRaises(Exception, evaluation.evaluate)
+
+
+if __name__ == "__main__":
+    unittest.main()
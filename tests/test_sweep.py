@@ -0,0 +1,37 @@
+import unittest
+
+from helpers import sample_dicts
+from helpers import synthetic_stores
+from kernels import IoUKernel
+from kernels import CentroidDistanceKernel
+from pymot import MOTEvaluation
+
+
+class SweepTest(unittest.TestCase):
+    """A threshold sweep gives the statistics of separate evaluations with each threshold"""
+
+    def assertSameStatistics(self, groundtruth, hypotheses, kernel, thresholds):
+        sweep = MOTEvaluation(groundtruth, hypotheses)
+        sweep.setCostKernel(kernel, thresholds[0])
+        evaluations = sweep.evaluateSweep(thresholds)
+        self.assertEqual(len(evaluations), len(thresholds))
+
+        for threshold, evaluation in zip(thresholds, evaluations):
+            expected = MOTEvaluation(groundtruth, hypotheses)
+            expected.setCostKernel(kernel, threshold)
+            expected.evaluate()
+            self.assertEqual(evaluation.getAbsoluteStatistics(), expected.getAbsoluteStatistics())
+            self.assertEqual(evaluation.mappings_, expected.mappings_)
+
+    def testSample(self):
+        groundtruth, hypotheses = sample_dicts()
+        self.assertSameStatistics(groundtruth, hypotheses, IoUKernel(), [0.1, 0.2, 0.5, 0.8])
+
+    def testSynthetic(self):
+        groundtruth, hypotheses = synthetic_stores()
+        self.assertSameStatistics(groundtruth, hypotheses, IoUKernel(), [0.5, 0.05, 0.2])
+        self.assertSameStatistics(groundtruth, hypotheses, CentroidDistanceKernel(), [5.0, 50.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
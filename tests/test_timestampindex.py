@@ -0,0 +1,60 @@
+import random
+import unittest
+
+from helpers import sample_dicts
+from timestampindex import TimestampIndex
+from pymot import MOTEvaluation
+
+
+def close_positions(timestamps, timestamp, sync_delta):
+    """Positions of chronologically close timestamps by linear search, as get_hypotheses_frame did before the index"""
+    return [k for k, t in enumerate(timestamps) if abs(t - timestamp) < sync_delta]
+
+
+class TimestampIndexTest(unittest.TestCase):
+    """Lookups of the index give the same positions as a linear search"""
+
+    def setUp(self):
+        generator = random.Random(1)
+        self.timestamps_ = [generator.randint(0, 200) * 0.05 for k in range(300)] # unordered, with duplicates
+        self.queries_ = [generator.uniform(-1.0, 11.0) for k in range(500)] + self.timestamps_
+
+    def assertSamePositions(self, lookup, queries):
+        for sync_delta in (0.001, 0.04, 0.3):
+            for timestamp in queries:
+                self.assertEqual(sorted(lookup(timestamp, sync_delta)), close_positions(self.timestamps_, timestamp, sync_delta))
+
+    def testFind(self):
+        self.assertSamePositions(TimestampIndex(self.timestamps_).find, self.queries_)
+
+    def testSeek(self):
+        # Ordered queries are merge joined, others fall back to binary search
+        self.assertSamePositions(TimestampIndex(self.timestamps_).seek, sorted(self.queries_))
+        self.assertSamePositions(TimestampIndex(self.timestamps_).seek, self.queries_)
+
+    def testEqualTimestamps(self):
+        # File order of equal timestamps is kept
+        self.assertEqual(TimestampIndex([1.0, 0.0, 1.0, 1.0]).find(1.0, 0.001), [0, 2, 3])
+
+
+class HypothesesFrameTest(unittest.TestCase):
+    """get_hypotheses_frame finds the chronologically close hypotheses frame"""
+
+    def testSample(self):
+        groundtruth, hypotheses = sample_dicts()
+        evaluation = MOTEvaluation(groundtruth, hypotheses)
+        for merge_join in (False, True):
+            for frame in groundtruth["frames"]:
+                expected = [h for h in hypotheses["frames"] if abs(h["timestamp"] - frame["timestamp"]) < evaluation.sync_delta_]
+                found = evaluation.get_hypotheses_frame(frame["timestamp"], merge_join)
+                self.assertEqual(found.ids(), [str(h["id"]) for f in expected for h in f["hypotheses"]])
+
+    def testAmbiguous(self):
+        groundtruth, hypotheses = sample_dicts()
+        hypotheses["frames"].append(dict(hypotheses["frames"][0]))
+        evaluation = MOTEvaluation(groundtruth, hypotheses)
+        self.assertRaises(Exception, evaluation.get_hypotheses_frame, hypotheses["frames"][0]["timestamp"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+import logging
+import unittest
+from StringIO import StringIO
+
+from helpers import sample_dicts
+from helpers import synthetic_dicts
+from pymot import MOTEvaluation
+from tracing import TraceSink
+from tracing import DiffLogSink
+
+
+class RecordingSink(TraceSink):
+    """Record all events as tuples of event name and arguments"""
+
+    def __init__(self):
+        self.events_ = []
+
+    def beginFrame(self, timestamp, mappings, groundtruths, hypotheses):
+        self.events_.append(("beginFrame", timestamp, dict(mappings), groundtruths.ids(), hypotheses.ids()))
+
+    def keep(self, *args):
+        self.events_.append(("keep",) + args)
+
+    def candidate(self, *args):
+        self.events_.append(("candidate",) + args)
+
+    def correspondence(self, *args):
+        self.events_.append(("correspondence",) + args)
+
+    def mismatch(self, *args):
+        self.events_.append(("mismatch",) + args)
+
+    def miss(self, *args):
+        self.events_.append(("miss",) + args)
+
+    def falsePositive(self, *args):
+        self.events_.append(("falsePositive",) + args)
+
+    def endFrame(self, *args):
+        self.events_.append(("endFrame",) + args)
+
+    def count(self, name):
+        return len([event for event in self.events_ if event[0] == name])
+
+
+class ListHandler(logging.Handler):
+    """Keep messages of log records"""
+
+    def __init__(self):
+        logging.Handler.__init__(self)
+        self.messages_ = []
+
+    def emit(self, record):
+        self.messages_.append(record.getMessage())
+
+
+class TraceSinkTest(unittest.TestCase):
+    """Trace events agree with the statistics and are passed to all sinks"""
+
+    def testEvents(self):
+        for groundtruth, hypotheses in (sample_dicts(), synthetic_dicts()):
+            evaluation = MOTEvaluation(groundtruth, hypotheses)
+            sinks = [RecordingSink(), RecordingSink(), RecordingSink()]
+            for sink in sinks:
+                evaluation.addTraceSink(sink)
+            evaluation.evaluate()
+
+            sink = sinks[0]
+            self.assertEqual(sink.count("beginFrame"), len(groundtruth["frames"]))
+            self.assertEqual(sink.count("endFrame"), len(groundtruth["frames"]))
+            self.assertEqual(sink.count("miss"), evaluation.misses_)
+            self.assertEqual(sink.count("falsePositive"), evaluation.false_positives_)
+            self.assertEqual(sink.count("mismatch"), evaluation.mismatches_)
+            self.assertEqual(sink.count("keep") + sink.count("correspondence"), evaluation.total_correspondences_)
+            for other in sinks[1:]:
+                self.assertEqual(other.events_, sink.events_)
+
+    def testSameStatistics(self):
+        groundtruth, hypotheses = synthetic_dicts()
+        expected = MOTEvaluation(groundtruth, hypotheses)
+        expected.evaluate()
+
+        evaluation = MOTEvaluation(groundtruth, hypotheses)
+        evaluation.addTraceSink(RecordingSink())
+        evaluation.evaluate()
+        self.assertEqual(evaluation.getAbsoluteStatistics(), expected.getAbsoluteStatistics())
+
+    def testDiffLogToLogger(self):
+        # Without stream, lines are logged at level INFO
+        groundtruth, hypotheses = sample_dicts()
+        stream = StringIO()
+        evaluation = MOTEvaluation(groundtruth, hypotheses)
+        evaluation.addTraceSink(DiffLogSink(stream))
+        evaluation.addTraceSink(DiffLogSink())
+
+        logger = logging.getLogger("tracing")
+        handler = ListHandler()
+        level = logger.level
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        try:
+            evaluation.evaluate()
+        finally:
+            logger.removeHandler(handler)
+            logger.setLevel(level)
+
+        self.assertTrue(len(handler.messages_) > 0)
+        self.assertEqual(handler.messages_, stream.getvalue().splitlines())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+import json
+import unittest
+from StringIO import StringIO
+
+from helpers import sample_dicts
+from helpers import synthetic_stores
+from framestore import Frame
+from visualdebug import VisualDebugWriter
+from pymot import MOTEvaluation
+
+
+class VisualDebugWriterTest(unittest.TestCase):
+    """Visual debug frames written while evaluating equal the collected frames"""
+
+    def assertSameOutput(self, groundtruth, hypotheses, streamed_groundtruth=None):
+        collected = MOTEvaluation(groundtruth, hypotheses)
+        collected.enableVisualDebug()
+        collected.evaluate()
+        expected = json.loads(json.dumps(collected.getVisualDebug()))
+
+        fp = StringIO()
+        writer = VisualDebugWriter(fp, expected[0]["filename"])
+        evaluation = MOTEvaluation(streamed_groundtruth if streamed_groundtruth is not None else groundtruth, hypotheses)
+        evaluation.enableVisualDebug(writer)
+        evaluation.evaluate()
+        writer.close()
+
+        self.assertEqual(json.loads(fp.getvalue()), expected)
+        self.assertEqual(evaluation.visualDebugFrames_, []) # nothing held in memory
+
+    def testSample(self):
+        self.assertSameOutput(*sample_dicts())
+
+    def testSynthetic(self):
+        self.assertSameOutput(*synthetic_stores(50))
+
+    def testStreamed(self):
+        groundtruth, hypotheses = sample_dicts()
+        self.assertSameOutput(groundtruth, hypotheses, (Frame.fromDict(frame, "annotations") for frame in groundtruth["frames"]))
+
+    def testEmpty(self):
+        fp = StringIO()
+        VisualDebugWriter(fp, "video.avi").close()
+        self.assertEqual(json.loads(fp.getvalue()), [{"class": "video", "filename": "video.avi", "frames": []}])
+
+
+if __name__ == "__main__":
+    unittest.main()
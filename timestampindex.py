@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+
+from bisect import bisect_left
+from collections import deque
+
+
+class TimestampIndex:
+    """Sorted index over a list of frame timestamps"""
+
+    def __init__(self, timestamps):
+        """Constructor from list of timestamps"""
+
+        # Positions in chronological order. Stable, so equal timestamps keep their file order.
+        self.positions_ = sorted(range(len(timestamps)), key=lambda k: timestamps[k])
+        self.timestamps_ = [timestamps[k] for k in self.positions_]
+
+        # Position of the last merge join lookup
+        self.cursor_ = 0
+
+    def __len__(self):
+        return len(self.timestamps_)
+
+    def find(self, timestamp, sync_delta):
+        """List of positions of timestamps with time difference less than sync_delta to timestamp. Binary search, O(log n)."""
+        return self._collect(timestamp, sync_delta, bisect_left(self.timestamps_, timestamp))
+
+    def seek(self, timestamp, sync_delta):
+        """Same as find, but for chronologically ordered queries (merge join). Amortised O(1).
+
+        Falls back to binary search, if timestamp is before the previous query."""
+
+        timestamps = self.timestamps_
+        cursor = self.cursor_
+
+        if cursor > 0 and timestamps[cursor - 1] >= timestamp:
+            cursor = bisect_left(timestamps, timestamp)
+        else:
+            while cursor < len(timestamps) and timestamps[cursor] < timestamp:
+                cursor += 1
+
+        self.cursor_ = cursor
+        return self._collect(timestamp, sync_delta, cursor)
+
+    def _collect(self, timestamp, sync_delta, position):
+        """Collect all positions around insertion position, which are chronologically close to timestamp"""
+
+        # abs(t - timestamp) is monotonic on both sides of the insertion position,
+        # so the matching timestamps form a contiguous range around it.
+        timestamps = self.timestamps_
+
+        begin = position
+        while begin > 0 and abs(timestamps[begin - 1] - timestamp) < sync_delta:
+            begin -= 1
+
+        end = position
+        while end < len(timestamps) and abs(timestamps[end] - timestamp) < sync_delta:
+            end += 1
+
+        return self.positions_[begin:end]
+
+
+class SyncWindow:
+    """Chronologically close frames of a stream of chronologically ordered frames.
+
+    Only frames within sync delta of the most recent query are held in memory."""
+
+    def __init__(self, frames):
+        """Constructor from iterable of frames with key "timestamp" """
+        self.frames_ = iter(frames)
+        self.window_ = deque()
+        self.next_ = None # next frame of stream, not yet in window
+        self.last_ = None # timestamp of last frame read from stream
+        self.previous_ = None # timestamp of previous query
+
+    def find(self, timestamp, sync_delta):
+        """List of frames with time difference less than sync_delta to timestamp.
+
+        Queries have to be chronologically ordered, too."""
+
+        if self.previous_ is not None and timestamp < self.previous_:
+            raise Exception, "Frames are not in chronological order (timestamp %f after %f)" % (timestamp, self.previous_)
+        self.previous_ = timestamp
+
+        window = self.window_
+
+        # Drop frames, which are too early for this and all later queries
+        while window and timestamp - window[0]["timestamp"] >= sync_delta:
+            window.popleft()
+
+        # Read frames, which are early enough for this query
+        while True:
+            if self.next_ is None:
+                self.next_ = next(self.frames_, None)
+                if self.next_ is None:
+                    break
+                if self.last_ is not None and self.next_["timestamp"] < self.last_:
+                    raise Exception, "Frames are not in chronological order (timestamp %f after %f)" % (self.next_["timestamp"], self.last_)
+                self.last_ = self.next_["timestamp"]
+
+            if self.next_["timestamp"] - timestamp >= sync_delta:
+                break
+
+            if timestamp - self.next_["timestamp"] < sync_delta:
+                window.append(self.next_)
+            self.next_ = None
+
+        return [frame for frame in window if abs(frame["timestamp"] - timestamp) < sync_delta]
@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+
+import logging
+LOG = logging.getLogger(__name__)
+
+
+class TraceSink:
+    """Receives structured events of MOTEvaluation.evaluateFrame. Override the events of interest.
+
+    Events are only generated if a sink is attached, see MOTEvaluation.addTraceSink."""
+
+    def beginFrame(self, timestamp, mappings, groundtruths, hypotheses):
+        """Start of frame evaluation with mapping from ground truth id to hypothesis id and frames (framestore.Frame)"""
+        pass
+
+    def keep(self, timestamp, gt_id, hypo_id, overlap):
+        """Correspondence kept from mapping (paper step 1)"""
+        pass
+
+    def candidate(self, timestamp, gt_id, hypo_id, overlap):
+        """Candidate pair for assignment (paper step 2)"""
+        pass
+
+    def correspondence(self, timestamp, gt_id, hypo_id, overlap):
+        """Correspondence found by assignment (paper step 2)"""
+        pass
+
+    def mismatch(self, timestamp, mapping_gt_id, mapping_hypo_id, gt_id, hypo_id):
+        """Correspondence contradicts mapping (paper step 3)"""
+        pass
+
+    def miss(self, timestamp, gt_id):
+        """Ground truth without correspondence (paper step 4)"""
+        pass
+
+    def falsePositive(self, timestamp, hypo_id):
+        """Hypothesis without correspondence (paper step 4)"""
+        pass
+
+    def endFrame(self, timestamp):
+        """End of frame evaluation"""
+        pass
+
+
+class TraceMultiplexer(TraceSink):
+    """Forward events to multiple sinks"""
+
+    def __init__(self, sinks):
+        self.sinks_ = list(sinks)
+
+    def beginFrame(self, timestamp, mappings, groundtruths, hypotheses):
+        for sink in self.sinks_:
+            sink.beginFrame(timestamp, mappings, groundtruths, hypotheses)
+
+    def keep(self, timestamp, gt_id, hypo_id, overlap):
+        for sink in self.sinks_:
+            sink.keep(timestamp, gt_id, hypo_id, overlap)
+
+    def candidate(self, timestamp, gt_id, hypo_id, overlap):
+        for sink in self.sinks_:
+            sink.candidate(timestamp, gt_id, hypo_id, overlap)
+
+    def correspondence(self, timestamp, gt_id, hypo_id, overlap):
+        for sink in self.sinks_:
+            sink.correspondence(timestamp, gt_id, hypo_id, overlap)
+
+    def mismatch(self, timestamp, mapping_gt_id, mapping_hypo_id, gt_id, hypo_id):
+        for sink in self.sinks_:
+            sink.mismatch(timestamp, mapping_gt_id, mapping_hypo_id, gt_id, hypo_id)
+
+    def miss(self, timestamp, gt_id):
+        for sink in self.sinks_:
+            sink.miss(timestamp, gt_id)
+
+    def falsePositive(self, timestamp, hypo_id):
+        for sink in self.sinks_:
+            sink.falsePositive(timestamp, hypo_id)
+
+    def endFrame(self, timestamp):
+        for sink in self.sinks_:
+            sink.endFrame(timestamp)
+
+
+class DiffLogSink(TraceSink):
+    """DIFF style log, comparable to the output of the perl script.
+
+    Writes lines to stream, or logs them at level INFO, if no stream is given."""
+
+    def __init__(self, stream=None):
+        self.stream_ = stream
+        self.reset()
+
+    def reset(self):
+        """Clear lines of current frame"""
+        self.header_ = []
+        self.keeps_ = []
+        self.candidates_ = []
+        self.correspondences_ = []
+        self.mismatches_ = []
+        self.unmatched_ = [] # misses and false positives
+
+    def write(self, line):
+        if self.stream_ is None:
+            LOG.info(line)
+        else:
+            self.stream_.write(line + "\n")
+
+    def beginFrame(self, timestamp, mappings, groundtruths, hypotheses):
+        logstr = ["DIFF Mappings:"]
+        for gt_id in sorted(mappings.keys()):
+            logstr.append("%s-%s" % (gt_id, mappings[gt_id]))
+
+        self.header_ = ["DIFF", "DIFF Time %.2f" % timestamp, " ".join(logstr)]
+
+    def keep(self, timestamp, gt_id, hypo_id, overlap):
+        self.keeps_.append("DIFF Keep corr %s %s %.2f" % (gt_id, hypo_id, overlap))
+
+    def candidate(self, timestamp, gt_id, hypo_id, overlap):
+        self.candidates_.append("DIFF candidate %s %s %.2f" % (gt_id, hypo_id, overlap))
+
+    def correspondence(self, timestamp, gt_id, hypo_id, overlap):
+        self.correspondences_.append("DIFF correspondence %s %s" % (gt_id, hypo_id))
+
+    def mismatch(self, timestamp, mapping_gt_id, mapping_hypo_id, gt_id, hypo_id):
+        self.mismatches_.append("DIFF Mismatch %s-%s -> %s-%s" % (mapping_gt_id, mapping_hypo_id, gt_id, hypo_id))
+
+    def miss(self, timestamp, gt_id):
+        self.unmatched_.append("DIFF Miss %s" % gt_id)
+
+    def falsePositive(self, timestamp, hypo_id):
+        self.unmatched_.append("DIFF False positive %s" % hypo_id)
+
+    def endFrame(self, timestamp):
+        # Keeps, correspondences and mismatches are sorted
+        lines = self.header_ + sorted(self.keeps_) + self.candidates_ + sorted(self.correspondences_) + sorted(self.mismatches_) + self.unmatched_
+        for line in lines:
+            self.write(line)
+
+        self.reset()
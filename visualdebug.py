@@ -0,0 +1,39 @@
+#!/usr/bin/env python
+
+import json
+
+
+class VisualDebugCollector:
+    """Collect visual debug frames in memory, see MOTEvaluation.getVisualDebug"""
+
+    def __init__(self):
+        self.frames_ = []
+
+    def addFrame(self, frame):
+        self.frames_.append(frame)
+
+    def close(self):
+        pass
+
+
+class VisualDebugWriter:
+    """Write visual debug frames to a json file object as soon as they are evaluated.
+
+    The file has the same format as the output of MOTEvaluation.getVisualDebug. Call close at the end."""
+
+    def __init__(self, fp, filename=None):
+        self.fp_ = fp
+        self.count_ = 0
+
+        self.fp_.write('[\n    {\n        "class": "video", \n        "filename": %s, \n        "frames": [' % json.dumps(filename))
+
+    def addFrame(self, frame):
+        if self.count_ > 0:
+            self.fp_.write(",")
+        self.fp_.write("\n            ")
+        self.fp_.write(json.dumps(frame, sort_keys=True))
+        self.count_ += 1
+
+    def close(self):
+        """Finish json document"""
+        self.fp_.write("\n        ]\n    }\n]\n")